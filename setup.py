@@ -13,6 +13,11 @@ setup(
     install_requires=[
         "pymongo",
     ],
+    extras_require={
+        "parquet": ["pyarrow"],
+        "numpy": ["numpy"],
+        "pandas": ["pandas"],
+    },
     entry_points={
         "console_scripts": [
             "generate-test-data=large_test_data_generator.cli:main",
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+In-process Python API for Large Test Data Generator.
+
+``iter_batches`` generates the rows described by a parameter dictionary (or
+parameter file) batch by batch in memory, as lists, NumPy arrays, pandas
+DataFrames or Arrow record batches, so test fixtures and notebooks do not
+have to write a CSV file and parse it back.
+"""
+from typing import Dict, List, Any, Iterator, Optional, Union
+from .config import Config, load_config
+from .data_generator import INT64_DIGITS, ColumnDefinition, create_columns, get_column_names
+from .warm_start import prepare_run
+from .logger import logger
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover - optional dependency
+    pd = None
+
+BATCH_FORMATS = ("lists", "numpy", "pandas", "arrow")
+
+
+def to_numpy(column_definitions: List[ColumnDefinition],
+             columns: Dict[str, Any]) -> Dict[str, "np.ndarray"]:
+    """
+    Convert a columnar batch into NumPy arrays.
+
+    Numbers are ``int64`` (``object`` beyond 18 digits), dates
+    ``datetime64[us]`` and everything else an ``object`` array. Columns that are already arrays are not copied.
+
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        columns (Dict[str, Any]): Batch returned by ``create_columns``.
+
+    Returns:
+        Dict[str, np.ndarray]: Column name to array.
+
+    Raises:
+        ImportError: If NumPy is not installed.
+    """
+    if np is None:
+        raise ImportError("NumPy batches require numpy. Install it with 'pip install numpy'.")
+    arrays = {}
+    for name, x in zip(get_column_names(column_definitions), column_definitions):
+        if x["datatype"] == "number" and int(x["max_range"]) <= INT64_DIGITS:
+            arrays[name] = np.asarray(columns[name], dtype=np.int64)
+        elif x["datatype"] == "xdate":
+            arrays[name] = np.asarray(columns[name], dtype="datetime64[us]")
+        else:
+            arrays[name] = np.asarray(columns[name], dtype=object)
+    return arrays
+
+
+def to_batch(column_definitions: List[ColumnDefinition], columns: Dict[str, Any],
+             batch_format: str, schema: Any = None) -> Any:
+    """
+    Convert a columnar batch into the requested format.
+
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        columns (Dict[str, Any]): Batch returned by ``create_columns``.
+        batch_format (str): One of ``BATCH_FORMATS``.
+        schema (Any): Arrow schema of the batch for the ``arrow`` format.
+
+    Returns:
+        Any: A dictionary of lists or arrays, a ``pandas.DataFrame`` or a
+        ``pyarrow.RecordBatch``.
+
+    Raises:
+        ValueError: If the format is not supported.
+        ImportError: If the library of the format is not installed.
+    """
+    if batch_format == "lists":
+        return {name: values if isinstance(values, list) else values.tolist()
+                for name, values in columns.items()}
+    if batch_format == "numpy":
+        return to_numpy(column_definitions, columns)
+    if batch_format == "pandas":
+        if pd is None:
+            raise ImportError("DataFrame batches require pandas. Install it with 'pip install pandas'.")
+        return pd.DataFrame(to_numpy(column_definitions, columns), copy=False)
+    if batch_format == "arrow":
+        from .parquet_writer import arrow_schema, to_record_batch
+        return to_record_batch(columns, schema if schema is not None else arrow_schema(column_definitions))
+    raise ValueError(f"Unsupported batch format '{batch_format}', expected one of {', '.join(BATCH_FORMATS)}")
+
+
+def iter_batches(config: Union[Dict[str, Any], str], batch_size: int = 10000,
+                 batch_format: str = "lists", row_count: Optional[int] = None,
+                 country_array: Optional[List[str]] = None,
+                 phone_array: Optional[List[Dict[str, Any]]] = None) -> Iterator[Any]:
+    """
+    Generate the rows described by a configuration in batches, in memory.
+
+    Only ``columns`` is required in a configuration dictionary; ``filename``,
+    ``separator`` and the output options are ignored. Number columns of
+    unseeded runs are handed over in the NumPy arrays they were sampled into,
+    so the ``numpy``, ``pandas`` and ``arrow`` formats do not copy them.
+
+    Args:
+        config (Union[Dict[str, Any], str]): Parameters as a dictionary, or the
+            path of a parameter file.
+        batch_size (int): Maximum number of rows per batch.
+        batch_format (str): ``lists`` (column name to list), ``numpy`` (column name
+            to array), ``pandas`` (DataFrame) or ``arrow`` (RecordBatch).
+        row_count (Optional[int]): Number of rows, ``number_of_rows`` by default.
+        country_array (Optional[List[str]]): Country codes to use instead of
+            loading them from MongoDB.
+        phone_array (Optional[List[Dict[str, Any]]]): Phone information to use
+            instead of loading it from MongoDB.
+
+    Yields:
+        Any: One batch per ``batch_size`` rows, in the requested format.
+    """
+    if batch_format not in BATCH_FORMATS:
+        raise ValueError(f"Unsupported batch format '{batch_format}', expected one of {', '.join(BATCH_FORMATS)}")
+    if batch_size <= 0:
+        raise ValueError("batch_size must be a positive integer")
+    if isinstance(config, str):
+        config = load_config(config)
+    else:
+        config = Config.from_dict(config, required_fields=("columns",))
+
+    seed = config.get_seed()
+    columns, country_array, phone_array, my_file = prepare_run(config, country_array, phone_array)
+    if row_count is None:
+        row_count = config.get_row_count()
+
+    schema = None
+    if batch_format == "arrow":
+        from .parquet_writer import arrow_schema
+        schema = arrow_schema(columns)
+
+    as_arrays = batch_format != "lists"
+    logger.debug(f"Generating {row_count} rows in batches of {batch_size} as {batch_format}")
+    for start in range(0, row_count, batch_size):
+        batch = create_columns(columns, min(batch_size, row_count - start), country_array,
+                               phone_array, my_file, seed=seed, start_index=start,
+                               as_arrays=as_arrays)
+        yield to_batch(columns, batch, batch_format, schema)
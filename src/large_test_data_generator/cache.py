@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Reference data cache for Large Test Data Generator.
+
+Reference sources (file contents, credit card BIN lists, addresses) are kept
+in a ``ReferenceCache`` instead of a plain dictionary. Every source is sized
+when it is stored, and once the configured memory budget is exceeded the least
+recently used sources that can be reloaded are evicted. Sources that are
+consumed while generating (``unique_values`` pools, MongoDB addresses) cannot
+be reloaded and are never evicted. A source that keeps being reloaded after
+eviction is part of a working set that does not fit the budget; it is pinned
+instead, so the cache goes over budget rather than reading it again and again.
+"""
+from collections import OrderedDict
+from typing import Dict, Any, Hashable, Iterator, MutableMapping, Optional
+import sys
+from .logger import logger
+
+# Reloads of an evicted source after which it is pinned in the cache
+PIN_AFTER_RELOADS = 2
+
+
+def estimate_size(value: Any) -> int:
+    """
+    Estimate the memory used by a reference source.
+
+    Containers are measured one level deep, which covers the lists of strings
+    and lists of dictionaries used as reference data; memory-mapped string
+    lists are measured by the size of their mapping.
+
+    Args:
+        value (Any): The reference source.
+
+    Returns:
+        int: Approximate size in bytes.
+    """
+    from .warm_start import MappedStrings
+    size = sys.getsizeof(value)
+    if isinstance(value, MappedStrings):
+        return size + value.nbytes
+    if isinstance(value, dict):
+        return size + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        for item in value:
+            size += sys.getsizeof(item)
+            if isinstance(item, dict):
+                size += sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in item.items())
+    return size
+
+
+class ReferenceCache(MutableMapping):
+    """Dictionary of reference sources with a memory budget and LRU eviction."""
+
+    def __init__(self, memory_budget: Optional[int] = None):
+        """
+        Initialize the cache.
+
+        Args:
+            memory_budget (Optional[int]): Memory budget in bytes, or None for no limit.
+        """
+        self.memory_budget = memory_budget
+        self.total_size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reloads = 0
+        self.reloaded_bytes = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._sizes: Dict[Hashable, int] = {}
+        self._pinned = set()
+        self._hot = set()
+        self._evicted = set()
+        self._reload_counts: Dict[Hashable, int] = {}
+        self._over_budget_logged = False
+
+    def set(self, key: Hashable, value: Any, reloadable: bool = True) -> None:
+        """
+        Store a reference source.
+
+        Args:
+            key (Hashable): Source key.
+            value (Any): Source data.
+            reloadable (bool): Whether the source can be evicted and loaded again.
+        """
+        if key in self._entries:
+            self._remove(key)
+        size = estimate_size(value)
+        self._entries[key] = value
+        self._sizes[key] = size
+        self.total_size += size
+        if not reloadable:
+            self._pinned.add(key)
+        logger.debug(f"Cached reference source {key!r} ({size} bytes, reloadable={reloadable})")
+        if key in self._evicted:
+            self._evicted.discard(key)
+            self._record_reload(key, size)
+        self._enforce_budget(key)
+
+    def _record_reload(self, key: Hashable, size: int) -> None:
+        self.reloads += 1
+        self.reloaded_bytes += size
+        self._reload_counts[key] = self._reload_counts.get(key, 0) + 1
+        # A source evicted and reloaded again and again is part of a working set
+        # that does not fit the budget; keeping it is cheaper than reading it each time
+        if self._reload_counts[key] >= PIN_AFTER_RELOADS and key not in self._hot:
+            self._hot.add(key)
+            logger.warning(
+                f"Reference source {key!r} was reloaded {self._reload_counts[key]} times; "
+                f"keeping it in memory although the working set does not fit the memory "
+                f"budget of {self.memory_budget} bytes"
+            )
+
+    def _remove(self, key: Hashable) -> None:
+        del self._entries[key]
+        self.total_size -= self._sizes.pop(key)
+        self._pinned.discard(key)
+
+    def _enforce_budget(self, keep: Hashable) -> None:
+        if self.memory_budget is None or self.total_size <= self.memory_budget:
+            return
+        for key in list(self._entries):
+            if self.total_size <= self.memory_budget:
+                return
+            if key == keep or key in self._pinned or key in self._hot:
+                continue
+            size = self._sizes[key]
+            self._remove(key)
+            self._evicted.add(key)
+            self.evictions += 1
+            logger.debug(f"Evicted reference source {key!r} ({size} bytes) from cache")
+        if self.total_size > self.memory_budget and not self._over_budget_logged:
+            self._over_budget_logged = True
+            logger.warning(
+                f"Reference data uses {self.total_size} bytes, above the memory budget "
+                f"of {self.memory_budget} bytes, and cannot be evicted further"
+            )
+
+    def __contains__(self, key: object) -> bool:
+        if key in self._entries:
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return True
+        self.misses += 1
+        logger.debug(f"Cache miss for reference source {key!r}")
+        return False
+
+    def __getitem__(self, key: Hashable) -> Any:
+        return self._entries[key]
+
+    def __setitem__(self, key: Hashable, value: Any) -> None:
+        self.set(key, value)
+
+    def __delitem__(self, key: Hashable) -> None:
+        self._remove(key)
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def source_sizes(self) -> Dict[Hashable, int]:
+        """
+        Get the size of every cached source.
+
+        Returns:
+            Dict[Hashable, int]: Source key to size in bytes.
+        """
+        return dict(self._sizes)
+
+    def log_stats(self) -> None:
+        """Log cache hits, misses, evictions, reloads and the size of every source."""
+        logger.info(
+            f"Reference cache: {self.hits} hits, {self.misses} misses, "
+            f"{self.evictions} evictions, {self.reloads} reloads ({self.reloaded_bytes} bytes), "
+            f"{self.total_size} bytes in {len(self)} sources"
+        )
+        for key, size in self._sizes.items():
+            logger.debug(f"Reference source {key!r}: {size} bytes")
+
+
+def store_source(my_file: MutableMapping, key: Hashable, value: Any, reloadable: bool = True) -> None:
+    """
+    Store a reference source in a cache or a plain dictionary.
+
+    Args:
+        my_file (MutableMapping): Dictionary storing various data.
+        key (Hashable): Source key.
+        value (Any): Source data.
+        reloadable (bool): Whether the source can be evicted and loaded again.
+    """
+    if isinstance(my_file, ReferenceCache):
+        my_file.set(key, value, reloadable=reloadable)
+    else:
+        my_file[key] = value
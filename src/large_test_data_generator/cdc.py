@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Change-data-capture streams for Large Test Data Generator.
+
+A CDC run takes the base dataset described by a seeded parameter file and
+emits inserts, updates and deletes against it. Rows of the base dataset are
+regenerated from their row index whenever an operation touches them, so the
+base table is neither read back nor held in memory; only the rows changed by
+the stream itself are tracked.
+"""
+from typing import Dict, List, Any, Iterator, Optional, Set, Tuple
+import random
+from .data_generator import (
+    ColumnDefinition, apply_derived, format_value, generate_row_values, generate_value,
+    get_column_names
+)
+from .distributions import build_distribution, clip_integer
+from .seeding import mix_seed, permute_index, row_rng, stream_id
+from .warm_start import prepare_run
+from .logger import logger
+
+INSERT = "I"
+UPDATE = "U"
+DELETE = "D"
+
+# Stream identifiers of the random number generators used by a CDC run
+OPERATIONS_STREAM = stream_id("cdc.operations")
+UPDATES_STREAM = stream_id("cdc.updates")
+KEYS_STREAM = stream_id("cdc.keys")
+
+# Datatypes left out of the default update columns because they identify a row
+KEY_DATATYPES = ("unique_values", "uuid")
+
+# Attempts to find a row that has not been deleted before falling back to an insert
+MAX_PICK_ATTEMPTS = 16
+
+
+class ChangeStream:
+    """Generate a stream of operations against a seeded base dataset."""
+
+    def __init__(self, column_definitions: List[ColumnDefinition], seed: int, row_count: int,
+                 cdc: Dict[str, Any], country_array: List[str],
+                 phone_array: List[Dict[str, Any]], my_file: Dict[str, Any]):
+        """
+        Initialize the change stream.
+
+        Args:
+            column_definitions (List[ColumnDefinition]): Prepared column definitions.
+            seed (int): Seed of the base dataset.
+            row_count (int): Number of rows of the base dataset.
+            cdc (Dict[str, Any]): The ``cdc`` options of the parameter file.
+            country_array (List[str]): List of country codes.
+            phone_array (List[Dict[str, Any]]): List of phone information.
+            my_file (Dict[str, Any]): Dictionary storing various data.
+        """
+        self.column_definitions = column_definitions
+        self.seed = seed
+        self.row_count = row_count
+        self.country_array = country_array
+        self.phone_array = phone_array
+        self.my_file = my_file
+
+        ratios = [float(cdc.get(f"{name}_ratio", default))
+                  for name, default in (("insert", 0.2), ("update", 0.7), ("delete", 0.1))]
+        total = sum(ratios)
+        if total <= 0:
+            raise ValueError("CDC operation ratios must add up to a positive number")
+        self.insert_ratio = ratios[0] / total
+        self.update_ratio = ratios[1] / total
+
+        names = get_column_names(column_definitions)
+        key_column = cdc.get("key_column")
+        datatypes = {name: x["datatype"] for name, x in zip(names, column_definitions)}
+        update_columns = cdc.get("update_columns")
+        if update_columns is None:
+            # Keys stay as they are unless update_columns asks otherwise
+            update_columns = [name for name in names
+                              if name != key_column and datatypes[name] not in KEY_DATATYPES
+                              and datatypes[name] != "derived"]
+        unknown = set(update_columns) - set(names)
+        if unknown:
+            raise ValueError(f"Unknown update columns: {', '.join(sorted(unknown))}")
+        # Columns of a group are updated together, so they keep describing one record
+        groups = {x["group"] for name, x in zip(names, column_definitions)
+                  if name in update_columns and "group" in x}
+        update_columns = list(update_columns) + [
+            name for name, x in zip(names, column_definitions)
+            if x.get("group") in groups and name not in update_columns
+        ]
+        if key_column is not None and key_column in update_columns:
+            raise ValueError(f"Key column '{key_column}' cannot be updated")
+        derived = [name for name in update_columns if datatypes[name] == "derived"]
+        if derived:
+            # They follow the columns they are computed from instead
+            raise ValueError(f"derived columns cannot be updated: {', '.join(derived)}")
+        unique = [name for name in update_columns if datatypes[name] == "unique_values"]
+        if unique:
+            # A new pool entry would duplicate the value of another row
+            raise ValueError(f"unique_values columns cannot be updated: {', '.join(unique)}")
+        self.update_indexes = [names.index(name) for name in update_columns]
+
+        self.key_distribution = None
+        if "key_distribution" in cdc:
+            self.key_distribution = build_distribution(cdc["key_distribution"])
+
+        self.cdc_seed = cdc.get("seed", mix_seed(seed, OPERATIONS_STREAM))
+        self.rng = random.Random(self.cdc_seed)
+        self.next_index = row_count
+        self.versions: Dict[int, int] = {}
+        self.deleted: Set[int] = set()
+
+    def regenerate_row(self, row_index: int) -> List[Any]:
+        """
+        Regenerate the current values of a row from its row index.
+
+        Args:
+            row_index (int): Index of the row.
+
+        Returns:
+            List[Any]: One value per column, including the latest update of the row.
+        """
+        values = generate_row_values(
+            self.column_definitions, self.country_array, self.phone_array, self.my_file,
+            row_rng(self.seed, row_index), row_index,
+        )
+        version = self.versions.get(row_index)
+        if version is not None:
+            country = row_rng(self.seed, row_index).choice(self.country_array)
+            rng = row_rng(self.seed, row_index, UPDATES_STREAM, version)
+            records = {}
+            for i in self.update_indexes:
+                values[i] = generate_value(
+                    self.column_definitions[i], country, self.phone_array, self.my_file, rng,
+                    records=records,
+                )
+            apply_derived(self.column_definitions, values)
+        return values
+
+    def pick_row(self) -> Optional[int]:
+        """
+        Pick an existing row, following the key distribution if one is configured.
+
+        Returns:
+            Optional[int]: Index of a row that has not been deleted, or None if none was found.
+        """
+        for _ in range(MAX_PICK_ATTEMPTS):
+            if self.next_index == 0:
+                return None
+            if self.key_distribution is None:
+                row_index = self.rng.randrange(self.next_index)
+            else:
+                # Ranks are spread over the base rows so that hot keys are not clustered
+                rank = clip_integer(self.key_distribution.sample(self.rng), 1, self.next_index + 1) - 1
+                if rank < self.row_count:
+                    row_index = permute_index(rank, self.row_count, mix_seed(self.cdc_seed, KEYS_STREAM))
+                else:
+                    row_index = rank
+            if row_index not in self.deleted:
+                return row_index
+        return None
+
+    def operations(self, count: int) -> Iterator[Tuple[str, int, List[Any]]]:
+        """
+        Generate operations.
+
+        Inserts carry the new row, updates the row after the change and
+        deletes the row as it was before being deleted.
+
+        Args:
+            count (int): Number of operations.
+
+        Yields:
+            Tuple[str, int, List[Any]]: Operation, row index and row values.
+        """
+        for sequence in range(count):
+            r = self.rng.random()
+            row_index = None
+            if r >= self.insert_ratio:
+                row_index = self.pick_row()
+
+            if row_index is None:
+                row_index = self.next_index
+                self.next_index += 1
+                yield INSERT, row_index, self.regenerate_row(row_index)
+            elif r < self.insert_ratio + self.update_ratio:
+                self.versions[row_index] = sequence
+                yield UPDATE, row_index, self.regenerate_row(row_index)
+            else:
+                values = self.regenerate_row(row_index)
+                self.versions.pop(row_index, None)
+                self.deleted.add(row_index)
+                yield DELETE, row_index, values
+
+
+def write_changes(filename: str, stream: ChangeStream, count: int, separator: str) -> Dict[str, int]:
+    """
+    Write a change stream to a CSV file.
+
+    Every line starts with the operation (``I``, ``U`` or ``D``) and the
+    sequence number of the operation, followed by the row.
+
+    Args:
+        filename (str): Path of the output file.
+        stream (ChangeStream): The change stream.
+        count (int): Number of operations.
+        separator (str): Separator between values.
+
+    Returns:
+        Dict[str, int]: Number of operations of every kind.
+    """
+    counts = {INSERT: 0, UPDATE: 0, DELETE: 0}
+    columns = stream.column_definitions
+    with open(filename, 'w', encoding="utf8") as f:
+        for sequence, (operation, _, values) in enumerate(stream.operations(count)):
+            if sequence > 0 and sequence % 1000 == 0:
+                logger.info(f"Generated {sequence} operations...")
+            counts[operation] += 1
+            fields = [f'"{operation}"', f'"{sequence}"']
+            fields.extend(format_value(x, value) for x, value in zip(columns, values))
+            print(separator.join(fields), file=f)
+    return counts
+
+
+def generate_changes(parameter_file: str) -> None:
+    """
+    Generate a change stream against the dataset described by a parameter file.
+
+    Args:
+        parameter_file (str): Path to the parameter JSON file.
+    """
+    from .config import load_config
+
+    logger.info(f"Starting change stream generation using parameters from '{parameter_file}'")
+    config = load_config(parameter_file)
+    cdc = config.get_cdc()
+    seed = config.get_seed()
+    if not cdc:
+        raise ValueError("Parameter file has no 'cdc' section")
+    if seed is None:
+        raise ValueError("CDC mode requires a 'seed' so that base rows can be regenerated")
+
+    definitions = config.get_column_definitions()
+    if any(x["datatype"] == "mongo_address" for x in definitions):
+        logger.warning("mongo_address values cannot be regenerated and will not match the base dataset")
+    columns, country_array, phone_array, my_file = prepare_run(config)
+
+    stream = ChangeStream(columns, seed, config.get_row_count(), cdc,
+                          country_array, phone_array, my_file)
+    filename = cdc.get("filename", "changes.csv")
+    count = cdc.get("number_of_operations", 1000)
+    counts = write_changes(filename, stream, count, config.get_separator())
+    logger.info(
+        f"Wrote {count} operations to '{filename}' "
+        f"({counts[INSERT]} inserts, {counts[UPDATE]} updates, {counts[DELETE]} deletes)"
+    )
+    my_file.log_stats()
@@ -7,9 +7,37 @@ import argparse
 import sys
 import os
 from large_test_data_generator.data_generator import generate_data
+from large_test_data_generator.cdc import generate_changes
+from large_test_data_generator.distributed import (
+    DEFAULT_PORT, DEFAULT_RANGE_ROWS, coordinate, run_worker
+)
+from large_test_data_generator.estimate import estimate
+from large_test_data_generator.streaming import stream_data
 from large_test_data_generator.logger import logger
 
 
+def add_common_arguments(parser: argparse.ArgumentParser, subcommand: bool = False) -> None:
+    """
+    Add the arguments shared by the main command and its subcommands.
+    
+    Args:
+        parser (argparse.ArgumentParser): Parser to add the arguments to.
+        subcommand (bool): Whether the parser belongs to a subcommand, in which
+            case its defaults do not override values given before the subcommand.
+    """
+    parser.add_argument(
+        "-p", "--parameters",
+        help="Path to the parameter JSON file.",
+        default=argparse.SUPPRESS if subcommand else "customer_master_parameters.json"
+    )
+    parser.add_argument(
+        "-v", "--verbose",
+        help="Enable verbose logging",
+        action="store_true",
+        default=argparse.SUPPRESS if subcommand else False
+    )
+
+
 def main():
     """
     Main function for the command-line interface.
@@ -17,16 +45,107 @@ def main():
     parser = argparse.ArgumentParser(
         description="Generate test data based on parameters in a JSON file."
     )
+    add_common_arguments(parser)
     parser.add_argument(
-        "-p", "--parameters",
-        help="Path to the parameter JSON file.",
-        default="customer_master_parameters.json"
+        "--cdc",
+        help="Generate a change stream against the dataset described by the parameter file",
+        action="store_true"
     )
     parser.add_argument(
-        "-v", "--verbose",
-        help="Enable verbose logging",
+        "--estimate",
+        help="Estimate output size, duration and reference memory from a sample instead of generating",
+        action="store_true"
+    )
+    parser.add_argument(
+        "--sample-rows",
+        help="Rows generated for --estimate (default: 1000)",
+        type=int,
+        default=1000
+    )
+    parser.add_argument(
+        "--workers",
+        help="Worker processes assumed by --estimate (default: 1)",
+        type=int,
+        default=1
+    )
+    subparsers = parser.add_subparsers(dest="command")
+    stream_parser = subparsers.add_parser(
+        "stream", help="Stream rows continuously at a target rate"
+    )
+    add_common_arguments(stream_parser, subcommand=True)
+    stream_parser.add_argument(
+        "-o", "--output",
+        help="'-' for stdout (default), tcp://host:port, or the path of a named pipe or file",
+        default="-"
+    )
+    stream_parser.add_argument(
+        "-r", "--rate",
+        help="Target rows per second (default: as fast as possible)",
+        type=float
+    )
+    stream_parser.add_argument(
+        "--forever",
+        help="Ignore number_of_rows and stream until interrupted",
         action="store_true"
     )
+    stream_parser.add_argument(
+        "--batch-size",
+        help="Maximum rows per write (default: 1000)",
+        type=int,
+        default=1000
+    )
+    stream_parser.add_argument(
+        "--report-interval",
+        help="Seconds between throughput reports (default: 10)",
+        type=float,
+        default=10.0
+    )
+    coordinate_parser = subparsers.add_parser(
+        "coordinate", help="Hand out row ranges of a seeded run to distributed workers"
+    )
+    add_common_arguments(coordinate_parser, subcommand=True)
+    coordinate_parser.add_argument(
+        "--listen",
+        help=f"host:port to listen on (default: 0.0.0.0:{DEFAULT_PORT})",
+        default=f"0.0.0.0:{DEFAULT_PORT}"
+    )
+    coordinate_parser.add_argument(
+        "--range-rows",
+        help=f"Rows per range (default: {DEFAULT_RANGE_ROWS})",
+        type=int,
+        default=DEFAULT_RANGE_ROWS
+    )
+    coordinate_parser.add_argument(
+        "--max-attempts",
+        help="Attempts per range before the run fails (default: 3)",
+        type=int,
+        default=3
+    )
+    coordinate_parser.add_argument(
+        "--task-timeout",
+        help="Seconds a worker may take for a range before it is retried elsewhere (default: no limit)",
+        type=float
+    )
+    coordinate_parser.add_argument(
+        "--output-dir",
+        help="Output directory (default: partitioning.directory or filename without extension)"
+    )
+    worker_parser = subparsers.add_parser(
+        "worker", help="Generate row ranges handed out by a coordinator"
+    )
+    worker_parser.add_argument(
+        "--connect",
+        help="host:port of the coordinator",
+        required=True
+    )
+    worker_parser.add_argument(
+        "--output-dir",
+        help="Output directory (default: the directory of the coordinator)"
+    )
+    worker_parser.add_argument(
+        "--name",
+        help="Name reported to the coordinator (default: host name and process id)"
+    )
     args = parser.parse_args()
 
     # Set logging level based on verbosity
@@ -37,12 +156,32 @@ def main():
             handler.setLevel(logging.DEBUG)
         logger.debug("Verbose logging enabled")
 
-    if not os.path.exists(args.parameters):
+    # Workers receive their configuration from the coordinator
+    if args.command != "worker" and not os.path.exists(args.parameters):
         logger.error(f"Error: Parameter file '{args.parameters}' not found.")
         sys.exit(1)
 
     try:
-        generate_data(args.parameters)
+        if args.command == "stream":
+            stream_data(
+                args.parameters, output=args.output, rate=args.rate, forever=args.forever,
+                batch_size=args.batch_size, report_interval=args.report_interval,
+            )
+        elif args.command == "coordinate":
+            coordinate(
+                args.parameters, listen=args.listen, directory=args.output_dir,
+                range_rows=args.range_rows, max_attempts=args.max_attempts,
+                task_timeout=args.task_timeout,
+            )
+        elif args.command == "worker":
+            run_worker(args.connect, name=args.name, directory=args.output_dir)
+        elif args.estimate:
+            estimate(args.parameters, sample_rows=args.sample_rows, workers=args.workers)
+            return
+        elif args.cdc:
+            generate_changes(args.parameters)
+        else:
+            generate_data(args.parameters)
         logger.info("Data generation completed successfully.")
     except Exception as e:
         logger.error(f"Error generating data: {e}")
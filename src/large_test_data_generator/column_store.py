@@ -0,0 +1,432 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Column store for Large Test Data Generator.
+
+With a ``column_store`` directory, a seeded run first writes every column to
+its own file and then merges the files into the output. Each column draws its
+values from a random stream keyed by the seed, the row index and the column
+name, rather than from one stream per row, so a column does not depend on the
+columns before it. Column files are named after a hash of everything their
+values depend on; when the parameter file changes, only columns whose hash
+changed are generated again, and the others are reused as they are.
+
+Column files hold one JSON array per batch of ``CSV_BATCH_SIZE`` rows, with
+dates as ISO strings, and are merged batch by batch, so memory stays bounded
+by one batch whatever the size of the dataset.
+"""
+from typing import Dict, List, Any, Iterator, Optional, Sequence
+from datetime import datetime
+import hashlib
+import json
+import os
+from .config import Config
+from .data_generator import (
+    CSV_BATCH_SIZE, ColumnDefinition, derived_order, evaluate_derived, format_rows,
+    generate_value, get_column_names, get_expression, sample_record, to_column_value
+)
+from .records import address_path
+from .seeding import row_rng, stream_id
+from .logger import logger
+
+# Version of the column file format, part of every column hash
+STORE_VERSION = 3
+
+MANIFEST_NAME = "manifest.json"
+
+# Datatypes whose values depend on the countries of the rows
+COUNTRY_DATATYPES = ("country", "phonenumber", "address", "mongo_address")
+
+# Stream of the country of every row, shared by all columns
+COUNTRY_STREAM = stream_id("row:country")
+
+
+def column_stream(name: str) -> int:
+    """
+    Get the random stream of a column.
+
+    Args:
+        name (str): Column name.
+
+    Returns:
+        int: Stream identifier, independent of the other columns.
+    """
+    return stream_id("column:" + name)
+
+
+def group_stream(group: str) -> int:
+    """
+    Get the random stream sampling the records of a column group.
+
+    Args:
+        group (str): Group name.
+
+    Returns:
+        int: Stream identifier, shared by the columns of the group.
+    """
+    return stream_id("group:" + group)
+
+
+def _digest(value: Any) -> str:
+    data = json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(data.encode("utf8")).hexdigest()
+
+
+def _file_signature(path: str) -> Optional[List[int]]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def reference_files(x: ColumnDefinition, country_array: List[str]) -> List[str]:
+    """
+    Get the files the values of a column are read from.
+
+    Args:
+        x (ColumnDefinition): Column definition.
+        country_array (List[str]): List of country codes.
+
+    Returns:
+        List[str]: Sorted paths of its list file, histogram and address files.
+    """
+    paths = set()
+    if "file_path" in x:
+        paths.add(x["file_path"])
+    if "file_path" in x.get("distribution", {}):
+        paths.add(x["distribution"]["file_path"])
+    if x["datatype"] == "address":
+        paths.update(address_path(country) for country in country_array)
+    return sorted(paths)
+
+
+def column_keys(column_definitions: List[ColumnDefinition], seed: int, row_count: int,
+                country_array: List[str], phone_array: List[Dict[str, Any]]) -> List[str]:
+    """
+    Hash everything the values of every column depend on.
+
+    That is the column definition and name, the seed and row count, the
+    reference data the column reads (country and phone lists, the size and
+    modification time of every file returned by ``reference_files``) and, for
+    ``derived`` columns, the hashes of the columns they refer to.
+
+    Args:
+        column_definitions (List[ColumnDefinition]): Prepared column definitions.
+        seed (int): Seed of the run.
+        row_count (int): Number of rows.
+        country_array (List[str]): List of country codes.
+        phone_array (List[Dict[str, Any]]): List of phone information.
+
+    Returns:
+        List[str]: One hash per column.
+    """
+    names = get_column_names(column_definitions)
+    countries = _digest(country_array)
+    keys: List[Optional[str]] = [None] * len(column_definitions)
+    derived = derived_order(column_definitions)
+    for i in [i for i in range(len(names)) if i not in derived] + derived:
+        x = column_definitions[i]
+        parts = {
+            "version": STORE_VERSION,
+            "batch_size": CSV_BATCH_SIZE,
+            "name": names[i],
+            "definition": {key: value for key, value in x.items() if not key.startswith("_")},
+            "seed": seed,
+            "row_count": row_count,
+        }
+        if x["datatype"] in COUNTRY_DATATYPES:
+            parts["countries"] = countries
+        if x["datatype"] == "phonenumber":
+            parts["phones"] = _digest(phone_array)
+        files = reference_files(x, country_array)
+        if files:
+            parts["files"] = {path: _file_signature(path) for path in files}
+        if x["datatype"] == "derived":
+            parts["references"] = {ref: keys[names.index(ref)]
+                                   for ref in get_expression(x).names}
+        keys[i] = _digest(parts)
+    return keys
+
+
+def generate_column(column_definitions: List[ColumnDefinition], i: int, seed: int,
+                    start: int, countries: Sequence[str], phone_array: List[Dict[str, Any]],
+                    my_file: Dict[str, Any]) -> List[Any]:
+    """
+    Generate the values of a column for a batch of rows from its own random stream.
+
+    Args:
+        column_definitions (List[ColumnDefinition]): Prepared column definitions.
+        i (int): Position of the column; it must not be ``derived``.
+        seed (int): Seed of the run.
+        start (int): Index of the first row of the batch.
+        countries (Sequence[str]): Country of every row of the batch.
+        phone_array (List[Dict[str, Any]]): List of phone information.
+        my_file (Dict[str, Any]): Dictionary storing various data.
+
+    Returns:
+        List[Any]: One value per row.
+    """
+    x = column_definitions[i]
+    stream = column_stream(get_column_names(column_definitions)[i])
+    group = x.get("group")
+    values = []
+    for row_index, country in enumerate(countries, start):
+        records = None
+        if group is not None:
+            # Every column of the group samples the same record from the group's stream
+            records = {group: sample_record(x, country, my_file,
+                                            row_rng(seed, row_index, group_stream(group)))}
+        value = generate_value(x, country, phone_array, my_file, row_rng(seed, row_index, stream),
+                               row_index, records)
+        values.append(to_column_value(value))
+    return values
+
+
+def encode_batch(values: Sequence[Any]) -> str:
+    """
+    Encode a batch of column values as a line of a column file.
+
+    Args:
+        values (Sequence[Any]): Values of the batch.
+
+    Returns:
+        str: JSON array, with datetimes as ISO strings, and a newline.
+    """
+    return json.dumps([value.isoformat() if isinstance(value, datetime) else value
+                       for value in values], ensure_ascii=False) + "\n"
+
+
+def decode_batch(x: ColumnDefinition, line: str) -> List[Any]:
+    """
+    Decode a line written by ``encode_batch``.
+
+    Args:
+        x (ColumnDefinition): Column definition.
+        line (str): The line.
+
+    Returns:
+        List[Any]: Values of the batch, with ``xdate`` values as datetimes again.
+    """
+    values = json.loads(line)
+    if x["datatype"] == "xdate":
+        return [datetime.fromisoformat(value) if isinstance(value, str) else value
+                for value in values]
+    return values
+
+
+class ColumnStore:
+    """Directory of column files, reused across runs of a parameter file."""
+
+    def __init__(self, directory: str, column_definitions: List[ColumnDefinition], seed: int,
+                 row_count: int, country_array: List[str], phone_array: List[Dict[str, Any]],
+                 my_file: Dict[str, Any]):
+        """
+        Initialize the store.
+
+        Args:
+            directory (str): Directory of the column files.
+            column_definitions (List[ColumnDefinition]): Prepared column definitions.
+            seed (int): Seed of the run.
+            row_count (int): Number of rows.
+            country_array (List[str]): List of country codes.
+            phone_array (List[Dict[str, Any]]): List of phone information.
+            my_file (Dict[str, Any]): Dictionary storing various data.
+
+        Raises:
+            ValueError: If the run has no seed.
+        """
+        if seed is None:
+            raise ValueError("A column store requires a seed")
+        self.directory = directory
+        self.column_definitions = column_definitions
+        self.names = get_column_names(column_definitions)
+        self.seed = seed
+        self.row_count = row_count
+        self.country_array = country_array
+        self.phone_array = phone_array
+        self.my_file = my_file
+        self.keys = column_keys(column_definitions, seed, row_count, country_array, phone_array)
+
+    def path(self, i: int) -> str:
+        """
+        Get the path of the file of a column.
+
+        Args:
+            i (int): Position of the column.
+
+        Returns:
+            str: Path of the file, named after the hash of the column.
+        """
+        return os.path.join(self.directory, self.keys[i] + ".jsonl")
+
+    def stale_columns(self) -> List[int]:
+        """
+        Get the columns whose file has to be generated.
+
+        Returns:
+            List[int]: Positions of the columns without an up-to-date file.
+        """
+        return [i for i in range(len(self.names)) if not os.path.exists(self.path(i))]
+
+    def _read(self, i: int) -> Iterator[List[Any]]:
+        with open(self.path(i), encoding="utf8") as f:
+            for line in f:
+                yield decode_batch(self.column_definitions[i], line)
+
+    def build(self) -> List[str]:
+        """
+        Generate the files of all stale columns in one pass over the rows.
+
+        Derived columns read the columns they refer to from their files when
+        those are up to date.
+
+        Returns:
+            List[str]: Names of the generated columns.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        stale = self.stale_columns()
+        order = derived_order(self.column_definitions)
+        generated = [i for i in stale if i not in order]
+        computed = [i for i in order if i in stale]
+        # Up-to-date columns that stale derived columns need
+        needed = sorted({
+            self.names.index(ref) for i in computed
+            for ref in get_expression(self.column_definitions[i]).names
+        } - set(stale))
+        if stale:
+            logger.info(f"Generating columns {', '.join(self.names[i] for i in stale)} "
+                        f"({len(self.names) - len(stale)} of {len(self.names)} reused)")
+
+        outputs = {i: open(self.path(i) + ".tmp", "w", encoding="utf8") for i in stale}
+        readers = {i: self._read(i) for i in needed}
+        try:
+            for start in range(0, self.row_count, CSV_BATCH_SIZE):
+                count = min(CSV_BATCH_SIZE, self.row_count - start)
+                batch = {self.names[i]: next(reader) for i, reader in readers.items()}
+                if generated:
+                    countries = [row_rng(self.seed, row_index, COUNTRY_STREAM).choice(self.country_array)
+                                 for row_index in range(start, start + count)]
+                    for i in generated:
+                        batch[self.names[i]] = generate_column(
+                            self.column_definitions, i, self.seed, start, countries,
+                            self.phone_array, self.my_file,
+                        )
+                for i in computed:
+                    batch[self.names[i]] = evaluate_derived(self.column_definitions[i], batch, count)
+                for i, f in outputs.items():
+                    f.write(encode_batch(batch[self.names[i]]))
+        finally:
+            for f in outputs.values():
+                f.close()
+            for reader in readers.values():
+                reader.close()
+        # Files only get their final name once complete, so an interrupted build is redone
+        for i in stale:
+            os.replace(self.path(i) + ".tmp", self.path(i))
+        self.write_manifest()
+        return [self.names[i] for i in stale]
+
+    def write_manifest(self) -> None:
+        """Record the current columns and remove the files of columns that changed since."""
+        manifest = {
+            "version": STORE_VERSION,
+            "seed": self.seed,
+            "row_count": self.row_count,
+            "batch_size": CSV_BATCH_SIZE,
+            "columns": [{"name": name, "file": os.path.basename(self.path(i))}
+                        for i, name in enumerate(self.names)],
+        }
+        with open(os.path.join(self.directory, MANIFEST_NAME), "w", encoding="utf8") as f:
+            json.dump(manifest, f, indent=2)
+        current = {entry["file"] for entry in manifest["columns"]}
+        for filename in os.listdir(self.directory):
+            if filename.endswith(".jsonl") and filename not in current:
+                os.remove(os.path.join(self.directory, filename))
+
+    def batches(self) -> Iterator[Dict[str, List[Any]]]:
+        """
+        Read the columns back batch by batch.
+
+        Yields:
+            Dict[str, List[Any]]: Column name to values, like a batch of ``create_columns``.
+        """
+        readers = [self._read(i) for i in range(len(self.names))]
+        try:
+            for values in zip(*readers):
+                yield dict(zip(self.names, values))
+        finally:
+            for reader in readers:
+                reader.close()
+
+
+def merge(store: ColumnStore, config: Config) -> None:
+    """
+    Stream the columns of a store into the output of a run.
+
+    Args:
+        store (ColumnStore): Store with up-to-date files for all columns.
+        config (Config): Configuration of the run.
+
+    Raises:
+        ValueError: If the output format is not supported.
+    """
+    filename = config.get_output_filename()
+    output_format = config.get_output_format()
+    columns = store.column_definitions
+
+    if output_format == "csv":
+        separator = config.get_separator()
+        with open(filename, "w", encoding="utf8") as f:
+            for batch in store.batches():
+                f.write("".join(row + "\n" for row in format_rows(columns, batch, separator)))
+
+    elif output_format == "fixed_width":
+        from .fixed_width import FixedWidthLayout
+        layout = FixedWidthLayout(columns)
+        with open(filename, "wb") as f:
+            for batch in store.batches():
+                f.write(layout.encode_rows(batch))
+
+    elif output_format == "parquet":
+        from .parquet_writer import arrow_schema, pa, pq, require_pyarrow, to_record_batch
+        require_pyarrow()
+        schema = arrow_schema(columns)
+        row_group_size = config.get_row_group_size()
+        with pq.ParquetWriter(filename, schema, compression=config.get_compression()) as writer:
+            pending = []
+            pending_rows = 0
+            for batch in store.batches():
+                record_batch = to_record_batch(batch, schema)
+                pending.append(record_batch)
+                pending_rows += record_batch.num_rows
+                if pending_rows >= row_group_size:
+                    writer.write_table(pa.Table.from_batches(pending, schema),
+                                       row_group_size=row_group_size)
+                    pending, pending_rows = [], 0
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending, schema),
+                                   row_group_size=row_group_size)
+
+    else:
+        raise ValueError(f"Unsupported output format '{output_format}'")
+
+
+def write_with_column_store(config: Config, state: Any) -> List[str]:
+    """
+    Bring the column store of a run up to date and merge it into the output.
+
+    Args:
+        config (Config): Configuration with a ``column_store`` directory.
+        state (RunState): Prepared columns and reference data.
+
+    Returns:
+        List[str]: Names of the columns that were generated again.
+    """
+    store = ColumnStore(
+        config.get_column_store()["directory"], state.columns, config.get_seed(),
+        config.get_row_count(), state.country_array, state.phone_array, state.my_file,
+    )
+    generated = store.build()
+    merge(store, config)
+    return generated
@@ -5,9 +5,12 @@ Configuration handling for Large Test Data Generator.
 """
 import json
 import os
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 from .logger import logger
 
+# Fields every parameter file must contain
+REQUIRED_FIELDS = ('filename', 'columns', 'separator', 'number_of_rows')
+
 
 class Config:
     """Configuration manager for the data generator."""
@@ -36,8 +39,36 @@ class Config:
             logger.error(f"Invalid JSON in configuration file {self.config_file}")
             raise
         
-        # Validate required fields
-        required_fields = ['filename', 'columns', 'separator', 'number_of_rows']
+        self.validate()
+    
+    @classmethod
+    def from_dict(cls, config: Dict[str, Any], required_fields: Tuple[str, ...] = REQUIRED_FIELDS) -> 'Config':
+        """
+        Create a configuration from a dictionary instead of a file.
+        
+        Args:
+            config (Dict[str, Any]): Parameters, as they would appear in a parameter file.
+            required_fields (Tuple[str, ...]): Fields that must be present.
+            
+        Returns:
+            Config: Configuration object.
+        """
+        instance = cls.__new__(cls)
+        instance.config_file = None
+        instance.config = dict(config)
+        instance.validate(required_fields)
+        return instance
+    
+    def validate(self, required_fields: Tuple[str, ...] = REQUIRED_FIELDS) -> None:
+        """
+        Validate that the required fields are present.
+        
+        Args:
+            required_fields (Tuple[str, ...]): Fields that must be present.
+            
+        Raises:
+            ValueError: If a required field is missing.
+        """
         for field in required_fields:
             if field not in self.config:
                 logger.error(f"Required field '{field}' missing from configuration")
@@ -106,6 +137,106 @@ class Config:
             int: Number of rows.
         """
         return self.config.get('number_of_rows', 100)
+    
+    def get_output_format(self) -> str:
+        """
+        Get the output format from configuration.
+        
+        Returns:
+            str: Output format, ``csv``, ``parquet`` or ``fixed_width``.
+        """
+        return self.config.get('output_format', 'csv')
+    
+    def get_workers(self) -> int:
+        """
+        Get the number of worker processes writing fixed-width output from configuration.
+        
+        Returns:
+            int: Number of worker processes.
+        """
+        return int(self.config.get('workers', 1))
+    
+    def get_row_group_size(self) -> int:
+        """
+        Get the number of rows per Parquet row group from configuration.
+        
+        Returns:
+            int: Rows per row group.
+        """
+        return self.config.get('row_group_size', 100000)
+    
+    def get_compression(self) -> str:
+        """
+        Get the Parquet compression codec from configuration.
+        
+        Returns:
+            str: Compression codec name.
+        """
+        return self.config.get('compression', 'snappy')
+    
+    def get_partitioning(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the partitioning options from configuration.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Partitioning options, or None to write a single file.
+        """
+        return self.config.get('partitioning')
+    
+    def get_cache_memory_budget(self) -> Optional[int]:
+        """
+        Get the memory budget of the reference data cache from configuration.
+        
+        Returns:
+            Optional[int]: Budget in bytes, or None for no limit.
+        """
+        return self.config.get('cache_memory_budget')
+    
+    def get_seed(self) -> Optional[int]:
+        """
+        Get the seed of the run from configuration.
+        
+        Returns:
+            Optional[int]: Seed, or None for an unseeded run.
+        """
+        return self.config.get('seed')
+    
+    def get_cdc(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the change-data-capture options from configuration.
+        
+        Returns:
+            Optional[Dict[str, Any]]: CDC options, or None if not configured.
+        """
+        return self.config.get('cdc')
+    
+    def get_column_store(self) -> Optional[Dict[str, Any]]:
+        """
+        Get the column store options from configuration.
+        
+        Returns:
+            Optional[Dict[str, Any]]: Column store options, or None to generate rows directly.
+        """
+        return self.config.get('column_store')
+    
+    def get_warm_cache_dir(self) -> Optional[str]:
+        """
+        Get the directory of the warm-start cache.
+        
+        Returns:
+            Optional[str]: Cache directory, or None to prepare every run from scratch.
+        """
+        return self.config.get('warm_cache_dir')
+    
+    def get_warm_cache_max_age(self) -> Optional[float]:
+        """
+        Get the age after which warm cache entries are rebuilt.
+        
+        Returns:
+            Optional[float]: Maximum age in seconds, 86400 (one day) by default,
+            or None to keep entries forever.
+        """
+        return self.config.get('warm_cache_max_age', 86400)
 
 
 def load_config(config_file: str = None) -> Config:
@@ -118,4 +249,4 @@ def load_config(config_file: str = None) -> Config:
     Returns:
         Config: Configuration object.
     """
-    return Config(config_file)
\ No newline at end of file
+    return Config(config_file)
@@ -5,23 +5,44 @@ Large Test Data Generator
 
 This module provides functionality to generate test data based on specified parameters.
 """
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, List, Any, Optional, Sequence, Tuple, Union
+from datetime import datetime
+from functools import lru_cache
 import random
 import json
 import string
 import time
-import uuid
 import os
 import pymongo
 from .mongodb_utils import (
     get_country_list, get_phone_list, get_credit_card_info, get_address_from_db
 )
+from .cache import store_source
+from .expressions import Expression, dependency_order, to_python
+from .distributions import (
+    Distribution, build_distribution, clip_integer, sample_integers, sample_proportions
+)
+from .seeding import mix_seed, permute_index, row_rng, stream_id
+from .records import (
+    address_column, address_line, convert_field, sample_address, validate_groups
+)
+from .skew import SKEW_DATATYPES, SkewInjector
+from .uuids import UuidGenerator
 from .logger import logger
 
 # Type aliases for better readability
 ColumnDefinition = Dict[str, Any]
 ParameterData = Dict[str, Any]
 
+# Rows generated column by column before being written as text
+CSV_BATCH_SIZE = 10000
+
+# Digits of the longest ``number`` values that fit into a signed 64-bit integer
+INT64_DIGITS = 18
+
+# Characters of ``string`` columns
+STRING_CHARACTERS = string.ascii_letters + string.digits + 'äëöü'
+
 
 def initialize_country_list() -> List[str]:
     """
@@ -53,13 +74,14 @@ def initialize_phone_list() -> List[Dict[str, Any]]:
         return []
 
 
-def get_phone_number(region_code: str, phone_array: List[Dict[str, Any]]) -> str:
+def get_phone_number(region_code: str, phone_array: List[Dict[str, Any]], rng: Any = random) -> str:
     """
     Generate a random phone number for the given country code.
     
     Args:
         region_code (str): ISO ALPHA-2 country code (e.g., "CH" for Switzerland).
         phone_array (List[Dict[str, Any]]): List of phone information.
+        rng (Any): Random number generator.
         
     Returns:
         str: A random phone number for the specified country.
@@ -67,11 +89,46 @@ def get_phone_number(region_code: str, phone_array: List[Dict[str, Any]]) -> str
     for phone in phone_array:
         if phone['alpha-2'] == region_code:
             phone_number_length = len(str(phone['eg_phone_number']))
-            random_phone_number = str(random.randrange(10**int(phone_number_length-1), 10**int(phone_number_length)))
+            random_phone_number = str(rng.randrange(10**int(phone_number_length-1), 10**int(phone_number_length)))
             return f"+{phone['dialCode']}{random_phone_number}"
     return ""
 
 
+@lru_cache(maxsize=128)
+def _parse_date_bounds(start: str, end: str, date_format: str) -> Tuple[float, float]:
+    """
+    Parse the bounds of a date range into epoch seconds.
+
+    Args:
+        start (str): Start date string in the specified format.
+        end (str): End date string in the specified format.
+        date_format (str): Format string for dates (strftime-style).
+
+    Returns:
+        Tuple[float, float]: Start and end of the range in epoch seconds.
+    """
+    stime = time.mktime(time.strptime(start, date_format))
+    etime = time.mktime(time.strptime(end, date_format))
+    return stime, etime
+
+
+def random_timestamp_between(start: str, end: str, date_format: str, prop: float) -> float:
+    """
+    Get the epoch timestamp at a proportion of a range of two formatted times.
+
+    Args:
+        start (str): Start date string in the specified format.
+        end (str): End date string in the specified format.
+        date_format (str): Format string for dates (strftime-style).
+        prop (float): Proportion of the interval to be taken after start (0.0 to 1.0).
+
+    Returns:
+        float: Epoch seconds between start and end.
+    """
+    stime, etime = _parse_date_bounds(start, end, date_format)
+    return stime + prop * (etime - stime)
+
+
 def random_date_between(start: str, end: str, date_format: str, prop: float) -> str:
     """
     Get a time at a proportion of a range of two formatted times.
@@ -85,10 +142,7 @@ def random_date_between(start: str, end: str, date_format: str, prop: float) ->
     Returns:
         str: Random date between start and end, in the specified format.
     """
-    stime = time.mktime(time.strptime(start, date_format))
-    etime = time.mktime(time.strptime(end, date_format))
-
-    ptime = stime + prop * (etime - stime)
+    ptime = random_timestamp_between(start, end, date_format, prop)
     
     result = time.strftime(date_format, time.localtime(ptime))
 
@@ -126,13 +180,14 @@ def is_valid_card(card_number: str) -> bool:
     return total_sum % 10 == 0
 
 
-def generate_credit_card(prefix: str, length: int) -> str:
+def generate_credit_card(prefix: str, length: int, rng: Any = random) -> str:
     """
     Generate a valid credit card number with a given prefix and length.
     
     Args:
         prefix (str): The BIN (Bank Identification Number) prefix for the card.
         length (int): The total length of the card number.
+        rng (Any): Random number generator.
         
     Returns:
         str: A valid credit card number.
@@ -140,7 +195,7 @@ def generate_credit_card(prefix: str, length: int) -> str:
     # Generate the body of the card number
     credit_card = prefix
     for i in range(1, length-len(prefix)):
-        credit_card += str(random.choice(range(0, 10)))
+        credit_card += str(rng.choice(range(0, 10)))
     
     # Find a valid check digit
     for i in range(0, 10):
@@ -192,6 +247,9 @@ def initialize_list(filename: str) -> List[str]:
     """
     Initialize a list from a file, removing duplicates.
     
+    The values are sorted so that seeded runs pick the same values in every
+    process, independently of string hash randomization.
+    
     Args:
         filename (str): Path to the file.
         
@@ -200,57 +258,112 @@ def initialize_list(filename: str) -> List[str]:
     """
     with open(filename, encoding='utf8') as f:
         temp_list = [line.rstrip('\n') for line in f]
-    return list(set(temp_list))
+    return sorted(set(temp_list))
+
+
+def pop_random_item(values: List[Any], rng: Any = random) -> Any:
+    """
+    Remove and return a random item from a list in constant time.
+    
+    The chosen item is swapped with the last one before popping, so the
+    remaining items do not have to be shifted.
+    
+    Args:
+        values (List[Any]): Non-empty list to take the item from.
+        rng (Any): Random number generator.
+        
+    Returns:
+        Any: The removed item.
+    """
+    i = rng.randint(0, len(values)-1)
+    values[i], values[-1] = values[-1], values[i]
+    return values.pop()
 
 
-def get_item_from_list(filename: str, my_file: Dict[str, Any]) -> Optional[str]:
+def get_item_from_list(filename: str, my_file: Dict[str, Any], rng: Any = random) -> Optional[str]:
     """
     Get and remove a random item from a list associated with a file.
     
     Args:
         filename (str): Path to the file.
         my_file (Dict[str, Any]): Dictionary storing file contents.
+        rng (Any): Random number generator.
         
     Returns:
         Optional[str]: A random item from the list or None if the list is empty.
     """
     if filename in my_file:
         if len(my_file[filename]) > 0:
-            return my_file[filename].pop(random.randint(0, len(my_file[filename])-1))
+            return pop_random_item(my_file[filename], rng)
         else:
             return None
     else:
         file_array = initialize_list(filename)
-        my_file[filename] = file_array
+        # Values are consumed as they are used, so the pool cannot be reloaded
+        store_source(my_file, filename, file_array, reloadable=False)
         if len(file_array) > 0:
-            return my_file[filename].pop(random.randint(0, len(my_file[filename])-1))
+            return pop_random_item(file_array, rng)
         return None
 
 
-def get_any_item_from_list(filename: str, my_file: Dict[str, Any]) -> Optional[str]:
+def get_any_item_from_list(filename: str, my_file: Dict[str, Any], rng: Any = random) -> Optional[str]:
     """
     Get a random item from a list without removing it.
     
     Args:
         filename (str): Path to the file.
         my_file (Dict[str, Any]): Dictionary storing file contents.
+        rng (Any): Random number generator.
         
     Returns:
         Optional[str]: A random item from the list or None if the list is empty.
     """
     if filename in my_file:
         if len(my_file[filename]) > 0:
-            return my_file[filename][random.randint(0, len(my_file[filename])-1)]
+            return my_file[filename][rng.randint(0, len(my_file[filename])-1)]
         else:
             return None
     else:
         file_array = initialize_list(filename)
-        my_file[filename] = file_array
+        store_source(my_file, filename, file_array)
         if len(file_array) > 0:
-            return my_file[filename][random.randint(0, len(my_file[filename])-1)]
+            return file_array[rng.randint(0, len(file_array)-1)]
         return None
 
 
+def get_indexed_item(filename: str, my_file: Dict[str, Any], row_index: Optional[int],
+                     seed: int, rng: Any = random) -> Optional[str]:
+    """
+    Get the item of a list assigned to a row by a seeded permutation.
+    
+    Every row below the size of the list gets a different item, so values
+    are unique without removing them from the list, and any row can be
+    regenerated on its own.
+    
+    Args:
+        filename (str): Path to the file.
+        my_file (Dict[str, Any]): Dictionary storing file contents.
+        row_index (Optional[int]): Index of the row, or None for a random item.
+        seed (int): Seed selecting the permutation.
+        rng (Any): Random number generator.
+        
+    Returns:
+        Optional[str]: The item, or None if the row is beyond the end of the list.
+    """
+    if filename in my_file:
+        file_array = my_file[filename]
+    else:
+        file_array = initialize_list(filename)
+        store_source(my_file, filename, file_array)
+    if len(file_array) == 0:
+        return None
+    if row_index is None:
+        return file_array[rng.randrange(len(file_array))]
+    if row_index >= len(file_array):
+        return None
+    return file_array[permute_index(row_index, len(file_array), seed)]
+
+
 def get_sample_address(country: str) -> Optional[Dict[str, Any]]:
     """
     Get a sample address with retry logic.
@@ -294,36 +407,55 @@ def initialize_db(parameter: str) -> List[Dict[str, Any]]:
         return []
 
 
-def db_get_credit_card(country: str, bank: str, card_type: str, my_file: Dict[str, Any]) -> str:
+def get_credit_card_record(country: str, bank: str, card_type: str, my_file: Dict[str, Any],
+                           rng: Any = random) -> Optional[Tuple[Dict[str, Any], str]]:
     """
-    Get a credit card from the database with caching.
+    Pick a BIN record from the database with caching and generate a card number for it.
     
     Args:
         country (str): Country code.
         bank (str): Bank name.
         card_type (str): Card type.
         my_file (Dict[str, Any]): Dictionary storing credit card information.
+        rng (Any): Random number generator.
         
     Returns:
-        str: A valid credit card number.
+        Optional[Tuple[Dict[str, Any], str]]: The BIN record and a valid card number,
+        or None if there are no BIN records.
     """
     parameter = country + bank + card_type
     if parameter in my_file:
-        if len(my_file[parameter]) > 0:
-            x = my_file[parameter]
-        else:
-            return ""
-    else:
-        my_file[parameter] = initialize_credit_card_list(country, bank, card_type)
         x = my_file[parameter]
-        if len(x) == 0:
-            return ""
+    else:
+        x = initialize_credit_card_list(country, bank, card_type)
+        store_source(my_file, parameter, x)
+    if len(x) == 0:
+        return None
 
-    this_instance = random.choice(x)
+    this_instance = rng.choice(x)
     prefix = this_instance['bin_range']
     length = int(this_instance['number_length'])
     
-    return generate_credit_card(prefix, length)
+    return this_instance, generate_credit_card(prefix, length, rng)
+
+
+def db_get_credit_card(country: str, bank: str, card_type: str, my_file: Dict[str, Any],
+                       rng: Any = random) -> str:
+    """
+    Get a credit card from the database with caching.
+    
+    Args:
+        country (str): Country code.
+        bank (str): Bank name.
+        card_type (str): Card type.
+        my_file (Dict[str, Any]): Dictionary storing credit card information.
+        rng (Any): Random number generator.
+        
+    Returns:
+        str: A valid credit card number.
+    """
+    record = get_credit_card_record(country, bank, card_type, my_file, rng)
+    return "" if record is None else record[1]
 
 
 def get_item_from_db(parameter: str, my_file: Dict[str, Any]) -> Optional[Dict[str, Any]]:
@@ -343,15 +475,495 @@ def get_item_from_db(parameter: str, my_file: Dict[str, Any]) -> Optional[Dict[s
         else:
             return None
     else:
-        my_file[parameter] = initialize_db(parameter)
-        if len(my_file[parameter]) > 0:
-            return my_file[parameter].pop(0)
+        addresses = initialize_db(parameter)
+        # Addresses are consumed as they are used, so they cannot be reloaded
+        store_source(my_file, parameter, addresses, reloadable=False)
+        if len(addresses) > 0:
+            return addresses.pop(0)
+        return None
+
+
+@lru_cache(maxsize=None)
+def _cached_distribution(spec: str) -> Distribution:
+    return build_distribution(json.loads(spec))
+
+
+def get_distribution(x: ColumnDefinition) -> Optional[Distribution]:
+    """
+    Get the distribution of a ``number`` or ``xdate`` column.
+    
+    Columns returned by ``prepare_columns`` carry their distribution already
+    built; other columns build it once per distinct specification.
+    
+    Args:
+        x (ColumnDefinition): Column definition.
+        
+    Returns:
+        Optional[Distribution]: The distribution, or None for uniform values.
+    """
+    if "_distribution" in x:
+        return x["_distribution"]
+    if "distribution" not in x:
+        return None
+    return _cached_distribution(json.dumps(x["distribution"], sort_keys=True))
+
+
+def build_uuid_generator(x: ColumnDefinition) -> UuidGenerator:
+    """
+    Build the generator of a ``uuid`` column.
+    
+    Args:
+        x (ColumnDefinition): Column definition with an optional ``version`` and,
+            for seeded version 7 columns, an optional ``from_date`` in ``date_format``.
+        
+    Returns:
+        UuidGenerator: The generator.
+    """
+    start_ms = None
+    if "from_date" in x:
+        start_ms = int(time.mktime(time.strptime(x["from_date"], x["date_format"])) * 1000)
+    return UuidGenerator(int(x.get("version", 4)), start_ms)
+
+
+@lru_cache(maxsize=None)
+def _cached_uuid_generator(spec: str) -> UuidGenerator:
+    return build_uuid_generator(json.loads(spec))
+
+
+def get_uuid_generator(x: ColumnDefinition) -> UuidGenerator:
+    """
+    Get the generator of a ``uuid`` column.
+    
+    Args:
+        x (ColumnDefinition): Column definition.
+        
+    Returns:
+        UuidGenerator: The generator, built once per distinct specification.
+    """
+    if "_uuid" in x:
+        return x["_uuid"]
+    return _cached_uuid_generator(json.dumps(
+        {key: x[key] for key in ("version", "from_date", "date_format") if key in x},
+        sort_keys=True,
+    ))
+
+
+@lru_cache(maxsize=None)
+def _cached_expression(source: str) -> Expression:
+    return Expression(source)
+
+
+def get_expression(x: ColumnDefinition) -> Expression:
+    """
+    Get the compiled expression of a ``derived`` column.
+    
+    Args:
+        x (ColumnDefinition): Column definition.
+        
+    Returns:
+        Expression: The expression, compiled once per distinct source.
+    """
+    if "_expression" in x:
+        return x["_expression"]
+    return _cached_expression(x["expression"])
+
+
+def derived_order(column_definitions: List[ColumnDefinition]) -> List[int]:
+    """
+    Get the positions of the ``derived`` columns in the order they are computed.
+    
+    Columns returned by ``prepare_columns`` carry their rank already; other
+    definitions are sorted by their dependencies on every call.
+    
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        
+    Returns:
+        List[int]: Indexes of the derived columns, each after the columns it refers to.
+        
+    Raises:
+        ValueError: If an expression refers to an unknown column or to itself through other columns.
+    """
+    derived = [i for i, x in enumerate(column_definitions) if x["datatype"] == "derived"]
+    if not derived:
+        return derived
+    if all("_rank" in column_definitions[i] for i in derived):
+        return sorted(derived, key=lambda i: column_definitions[i]["_rank"])
+    names = get_column_names(column_definitions)
+    order = dependency_order({names[i]: get_expression(column_definitions[i]) for i in derived}, names)
+    return [names.index(name) for name in order]
+
+
+def derived_value(x: ColumnDefinition, value: Any) -> Any:
+    """
+    Convert the result of an expression to the value of its ``derived`` column.
+    
+    Args:
+        x (ColumnDefinition): Column definition with an optional ``field_type``
+            and ``date_format``.
+        value (Any): Result of the expression.
+        
+    Returns:
+        Any: The value converted to ``field_type``, or rendered as a string
+        without one, with datetimes in ``date_format``.
+    """
+    if value is None:
         return None
+    if x.get("field_type") is not None:
+        return convert_field(value, x["field_type"])
+    if isinstance(value, datetime) and "date_format" in x:
+        return value.strftime(x["date_format"]).upper()
+    return str(value)
+
+
+def apply_derived(column_definitions: List[ColumnDefinition], values: List[Any]) -> List[Any]:
+    """
+    Compute the ``derived`` columns of a row in place.
+    
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        values (List[Any]): Values of the row, one per column.
+        
+    Returns:
+        List[Any]: ``values``, with the derived columns filled in.
+    """
+    order = derived_order(column_definitions)
+    if order:
+        names = get_column_names(column_definitions)
+        row = dict(zip(names, values))
+        for i in order:
+            x = column_definitions[i]
+            try:
+                values[i] = row[names[i]] = derived_value(x, get_expression(x).evaluate(row))
+            except Exception as e:
+                raise ValueError(f"Cannot compute derived column '{names[i]}': {e}") from e
+    return values
+
+
+def evaluate_derived(x: ColumnDefinition, columns: Dict[str, Sequence[Any]],
+                     row_count: int) -> List[Any]:
+    """
+    Compute a ``derived`` column for a whole batch.
+    
+    Args:
+        x (ColumnDefinition): Column definition.
+        columns (Dict[str, Sequence[Any]]): Batch columns the expression refers to.
+        row_count (int): Number of rows in the batch.
+        
+    Returns:
+        List[Any]: One value per row.
+    """
+    try:
+        values = get_expression(x).evaluate_batch(columns, row_count)
+    except Exception as e:
+        name = x.get("column_name", x["expression"])
+        raise ValueError(f"Cannot compute derived column '{name}': {e}") from e
+    return [derived_value(x, value) for value in to_python(values)]
+
+
+def prepare_columns(column_definitions: List[ColumnDefinition],
+                    seed: Optional[int] = None) -> List[ColumnDefinition]:
+    """
+    Compile column definitions once before generating rows.
+    
+    Returns copies of the definitions with precomputed helpers (distributions,
+    hot-key tables, per-column seeds, compiled expressions) stored under keys starting with an
+    underscore; the input definitions are not modified.
+    
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        seed (Optional[int]): Seed of the run, or None for an unseeded run.
+        
+    Returns:
+        List[ColumnDefinition]: The prepared column definitions.
+    """
+    validate_groups(column_definitions)
+    prepared = []
+    for name, x in zip(get_column_names(column_definitions), column_definitions):
+        x = dict(x)
+        column_seed = None if seed is None else mix_seed(seed, stream_id(name))
+        if "distribution" in x and "_distribution" not in x:
+            x["_distribution"] = build_distribution(x["distribution"])
+        if "skew" in x and "_skew" not in x:
+            if x["datatype"] not in SKEW_DATATYPES:
+                raise ValueError(f"Datatype '{x['datatype']}' does not support skew")
+            x["_skew"] = SkewInjector(x["skew"], column_seed)
+        if x["datatype"] == "unique_values" and seed is not None:
+            x["_seed"] = column_seed
+        if x["datatype"] == "uuid" and "_uuid" not in x:
+            x["_uuid"] = build_uuid_generator(x)
+        if x["datatype"] == "derived" and "_expression" not in x:
+            x["_expression"] = Expression(x["expression"])
+        prepared.append(x)
+    for rank, i in enumerate(derived_order(prepared)):
+        prepared[i]["_rank"] = rank
+    return prepared
+
+
+def get_column_names(column_definitions: List[ColumnDefinition]) -> List[str]:
+    """
+    Get the output names of the columns, falling back to a positional name.
+    
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        
+    Returns:
+        List[str]: One name per column definition.
+        
+    Raises:
+        ValueError: If two columns have the same name, which batches keyed by
+            column name cannot hold.
+    """
+    names = [
+        x.get("column_name") or f"column_{i + 1}"
+        for i, x in enumerate(column_definitions)
+    ]
+    if len(set(names)) != len(names):
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        raise ValueError(f"Duplicate column names: {', '.join(duplicates)}")
+    return names
+
+
+def generate_value(x: ColumnDefinition, country: str, phone_array: List[Dict[str, Any]],
+                   my_file: Dict[str, Any], rng: Any = random,
+                   row_index: Optional[int] = None,
+                   records: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Generate the raw value of a single column.
+    
+    Numbers are returned as ``int`` and dates as ``datetime``, so that typed
+    writers can keep them as such; everything else is returned as produced by
+    its source. Columns with a ``skew`` specification must have been compiled
+    with ``prepare_columns``, which holds their hot-key tables.
+    
+    Args:
+        x (ColumnDefinition): Column definition.
+        country (str): Country code sampled for the current row.
+        phone_array (List[Dict[str, Any]]): List of phone information.
+        my_file (Dict[str, Any]): Dictionary storing various data.
+        rng (Any): Random number generator of the row.
+        row_index (Optional[int]): Index of the row in a seeded run.
+        records (Optional[Dict[str, Any]]): Records sampled for the column groups of
+            the row so far, shared by the columns of a row.
+        
+    Returns:
+        Any: The generated value.
+        
+    Raises:
+        ValueError: If the datatype is not supported.
+    """
+    if "skew" in x:
+        skew = x.get("_skew")
+        if skew is None:
+            raise ValueError("Columns with skew must be compiled with prepare_columns")
+        # Hot keys are drawn from the source without a row index
+        return skew.apply(
+            lambda r: _generate_value(x, country, phone_array, my_file, r,
+                                      row_index if r is rng else None),
+            rng,
+        )
+    if "field" in x or "group" in x:
+        return record_value(x, country, get_record(x, country, my_file, rng, records), my_file)
+    return _generate_value(x, country, phone_array, my_file, rng, row_index)
+
+
+def sample_record(x: ColumnDefinition, country: str, my_file: Dict[str, Any],
+                  rng: Any = random) -> Any:
+    """
+    Sample the source record of an ``address``, ``mongo_address`` or ``creditcard`` column.
+    
+    Args:
+        x (ColumnDefinition): Column definition.
+        country (str): Country code sampled for the current row.
+        my_file (Dict[str, Any]): Dictionary storing various data.
+        rng (Any): Random number generator of the row.
+        
+    Returns:
+        Any: Row number in the address file, address document, or BIN record and
+        card number; None if the source is empty.
+    """
+    datatype = x["datatype"]
+    if datatype == "address":
+        return sample_address(country, my_file, rng)
+    if datatype == "mongo_address":
+        return get_item_from_db(country, my_file)
+    if datatype == "creditcard":
+        return get_credit_card_record(x['country'], x['bank_name'], x['card_type'], my_file, rng)
+    raise ValueError(f"Datatype '{datatype}' has no records")
+
+
+def get_record(x: ColumnDefinition, country: str, my_file: Dict[str, Any], rng: Any = random,
+               records: Optional[Dict[str, Any]] = None) -> Any:
+    """
+    Get the source record of a column, sampling it once per row for each group.
+    
+    Args:
+        x (ColumnDefinition): Column definition.
+        country (str): Country code sampled for the current row.
+        my_file (Dict[str, Any]): Dictionary storing various data.
+        rng (Any): Random number generator of the row.
+        records (Optional[Dict[str, Any]]): Records sampled for the groups of the row so far.
+        
+    Returns:
+        Any: The record, as returned by ``sample_record``.
+    """
+    group = x.get("group")
+    if group is None or records is None:
+        return sample_record(x, country, my_file, rng)
+    if group not in records:
+        records[group] = sample_record(x, country, my_file, rng)
+    return records[group]
+
+
+def record_value(x: ColumnDefinition, country: str, record: Any, my_file: Dict[str, Any]) -> Any:
+    """
+    Get the value of a column from its source record.
+    
+    Args:
+        x (ColumnDefinition): Column definition with an optional ``field`` and ``field_type``.
+        country (str): Country code sampled for the current row.
+        record (Any): Record returned by ``sample_record``.
+        my_file (Dict[str, Any]): Dictionary storing various data.
+        
+    Returns:
+        Any: The field of the record, or the whole record without ``field``.
+    """
+    datatype, field = x["datatype"], x.get("field")
+    if record is None:
+        return "" if datatype == "creditcard" else None
+    if datatype == "address":
+        if field is None:
+            return address_line(country, record, my_file)
+        value = address_column(country, field, my_file)[record]
+    elif datatype == "mongo_address":
+        if field is None:
+            return json.dumps(record, ensure_ascii=False, sort_keys=True, default=str)
+        value = record.get(field)
+    else:
+        bin_record, number = record
+        value = number if field in (None, "number") else bin_record.get(field)
+    return convert_field(value, x.get("field_type"))
+
+
+def _generate_value(x: ColumnDefinition, country: str, phone_array: List[Dict[str, Any]],
+                    my_file: Dict[str, Any], rng: Any, row_index: Optional[int]) -> Any:
+    """Generate the raw value of a single column, ignoring any skew."""
+    datatype = x["datatype"]
+    
+    if datatype == "string":
+        if x["is_variable_length"]:
+            if x["is_null"]:
+                ll = rng.randint(0, x["length"])
+            else:
+                ll = rng.randint(1, x["length"])
+        else:
+            ll = x["length"]
+        return ''.join(
+            rng.choice(STRING_CHARACTERS) 
+            for _ in range(ll)
+        )
+        
+    elif datatype == "file":
+        return get_any_item_from_list(x["file_path"], my_file, rng)
+        
+    elif datatype == "ssn":
+        return f'{rng.randrange(100,999)}-{rng.randrange(10,99)}-{rng.randrange(100,999)}'
+        
+    elif datatype == "number":
+        low, high = 10**int(x["min_range"]), 10**int(x["max_range"])
+        distribution = get_distribution(x)
+        if distribution is not None:
+            return clip_integer(distribution.sample(rng), low, high)
+        return rng.randrange(low, high)
+        
+    elif datatype == "phonenumber":
+        return get_phone_number(country, phone_array, rng)
+        
+    elif datatype == "xdate":
+        distribution = get_distribution(x)
+        if distribution is not None:
+            prop = min(max(distribution.sample(rng), 0.0), 1.0)
+        else:
+            prop = rng.random()
+        return datetime.fromtimestamp(random_timestamp_between(
+            x["from_date"], x["until_date"], x["date_format"], prop
+        ))
+        
+    elif datatype == "country":
+        return country
+        
+    elif datatype in ("address", "creditcard", "mongo_address"):
+        return record_value(x, country, sample_record(x, country, my_file, rng), my_file)
+        
+    elif datatype == "unique_values":
+        if "_seed" in x:
+            return get_indexed_item(x['file_path'], my_file, row_index, x["_seed"], rng)
+        return get_item_from_list(x['file_path'], my_file, rng)
+        
+    elif datatype == "mychoice":
+        return rng.choice(x['choices'])
+        
+    elif datatype == "uuid":
+        return get_uuid_generator(x).generate(rng, row_index)
+        
+    elif datatype == "derived":
+        raise ValueError("Derived columns are computed from their row by generate_row_values")
+    
+    raise ValueError(f"Unsupported datatype '{datatype}'")
+
+
+def format_value(x: ColumnDefinition, value: Any) -> str:
+    """
+    Format a raw column value as a quoted CSV field.
+    
+    Double quotes inside the value are doubled, as in RFC 4180, so values such
+    as JSON documents stay a single field.
+    
+    Args:
+        x (ColumnDefinition): Column definition.
+        value (Any): Value returned by ``generate_value``.
+        
+    Returns:
+        str: The quoted field.
+    """
+    if isinstance(value, datetime):
+        value = value.strftime(x["date_format"]).upper()
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def generate_row_values(column_definitions: List[ColumnDefinition], country_array: List[str],
+                        phone_array: List[Dict[str, Any]], my_file: Dict[str, Any],
+                        rng: Any = random, row_index: Optional[int] = None) -> List[Any]:
+    """
+    Generate the raw values of a single row.
+    
+    ``derived`` columns are computed once all other columns of the row are known.
+    
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        country_array (List[str]): List of country codes.
+        phone_array (List[Dict[str, Any]]): List of phone information.
+        my_file (Dict[str, Any]): Dictionary storing various data.
+        rng (Any): Random number generator of the row.
+        row_index (Optional[int]): Index of the row in a seeded run.
+        
+    Returns:
+        List[Any]: One value per column.
+    """
+    country = rng.choice(country_array)
+    records = {}
+    values = [
+        None if x["datatype"] == "derived" else
+        generate_value(x, country, phone_array, my_file, rng, row_index, records)
+        for x in column_definitions
+    ]
+    return apply_derived(column_definitions, values)
 
 
 def create_row(column_definitions: List[ColumnDefinition], separator: str, 
                country_array: List[str], phone_array: List[Dict[str, Any]], 
-               my_file: Dict[str, Any]) -> str:
+               my_file: Dict[str, Any], rng: Any = random,
+               row_index: Optional[int] = None) -> str:
     """
     Create a single data row based on column definitions.
     
@@ -361,90 +973,155 @@ def create_row(column_definitions: List[ColumnDefinition], separator: str,
         country_array (List[str]): List of country codes.
         phone_array (List[Dict[str, Any]]): List of phone information.
         my_file (Dict[str, Any]): Dictionary storing various data.
+        rng (Any): Random number generator of the row.
+        row_index (Optional[int]): Index of the row in a seeded run.
         
     Returns:
         str: A single row of data.
     """
-    row_value = ""
-    country = random.choice(country_array)
-    
-    for x in column_definitions:
-        # Handle different data types
-        if x["datatype"] == "string":
-            if x["is_variable_length"]:
-                if x["is_null"]:
-                    ll = random.randint(0, x["length"])
-                else:
-                    ll = random.randint(1, x["length"])
-            else:
-                ll = x["length"]
-            value_of_string = ''.join(
-                random.choice(string.ascii_letters + string.digits + 'äëöü') 
-                for _ in range(ll)
-            )
-            value_of_string = f'"{value_of_string}"'
-            
-        elif x["datatype"] == "file":
-            value_of_string = get_any_item_from_list(x["file_path"], my_file)
-            value_of_string = f'"{value_of_string}"'
-            
-        elif x["datatype"] == "ssn":
-            value_of_string = f'{random.randrange(100,999)}-{random.randrange(10,99)}-{random.randrange(100,999)}'
-            value_of_string = f'"{value_of_string}"'
-            
-        elif x["datatype"] == "number":
-            value_of_string = str(random.randrange(10**int(x["min_range"]), 10**int(x["max_range"])))
-            value_of_string = f'"{value_of_string}"'
-            
-        elif x["datatype"] == "phonenumber":
-            value_of_string = get_phone_number(country, phone_array)
-            value_of_string = f'"{value_of_string}"'
-            
-        elif x["datatype"] == "xdate":
-            value_of_string = random_date_between(
-                x["from_date"], x["until_date"], x["date_format"], random.random()
-            )
-            value_of_string = f'"{value_of_string}"'
-            
-        elif x["datatype"] == "country":
-            value_of_string = country
-            value_of_string = f'"{value_of_string}"'
-            
-        elif x["datatype"] == "address":
-            with open(f"input/{country}.csv", encoding="utf8") as f_address:
-                address_array = [row.rstrip("\n") for row in f_address]
-            value_of_string = random.choice(address_array)
-            value_of_string = f'"{value_of_string}"'
-            
-        elif x["datatype"] == "creditcard":
-            value_of_string = db_get_credit_card(
-                x['country'], x['bank_name'], x['card_type'], my_file
-            )
-            value_of_string = f'"{value_of_string}"'
-            
-        elif x["datatype"] == "mongo_address":
-            value_of_string = get_item_from_db(country, my_file)
-            value_of_string = f'"{str(value_of_string)}"'
-            
-        elif x["datatype"] == "unique_values":
-            value_of_string = get_item_from_list(x['file_path'], my_file)
-            value_of_string = f'"{str(value_of_string)}"'
-            
-        elif x["datatype"] == "mychoice":
-            value_of_string = random.choice(x['choices'])
-            value_of_string = f'"{str(value_of_string)}"'
-            
-        elif x["datatype"] == "uuid":
-            value_of_string = uuid.uuid4()
-            value_of_string = f'"{str(value_of_string)}"'
+    values = generate_row_values(column_definitions, country_array, phone_array, my_file, rng, row_index)
+    
+    return separator.join(
+        format_value(x, value) for x, value in zip(column_definitions, values)
+    )
+
+
+def sample_column(x: ColumnDefinition, row_count: int,
+                  as_array: bool = False) -> Optional[Sequence[Any]]:
+    """
+    Sample a whole column at once for datatypes that support it.
+    
+    Args:
+        x (ColumnDefinition): Column definition.
+        row_count (int): Number of values.
+        as_array (bool): Keep numbers in the NumPy array they were sampled into.
         
-        # Append to row with separator
-        if row_value == "":
-            row_value = value_of_string
-        else:
-            row_value = row_value + separator + value_of_string
-            
-    return row_value
+    Returns:
+        Optional[Sequence[Any]]: The values, or None if the column is generated row by row.
+    """
+    if x["datatype"] == "number":
+        low, high = 10**int(x["min_range"]), 10**int(x["max_range"])
+        return sample_integers(get_distribution(x), low, high, row_count, as_array=as_array)
+    if x["datatype"] == "xdate":
+        stime, etime = _parse_date_bounds(x["from_date"], x["until_date"], x["date_format"])
+        return [
+            datetime.fromtimestamp(stime + prop * (etime - stime))
+            for prop in sample_proportions(get_distribution(x), row_count)
+        ]
+    if x["datatype"] == "uuid" and "skew" not in x:
+        return get_uuid_generator(x).generate_many(row_count)
+    return None
+
+
+def to_column_value(value: Any) -> Any:
+    """
+    Convert a raw value into a value of a columnar batch.
+    
+    Args:
+        value (Any): Value returned by ``generate_value``.
+        
+    Returns:
+        Any: The value, with sources that are not strings, numbers or dates rendered as ``str``.
+    """
+    if value is None or isinstance(value, (str, int, float, datetime)):
+        return value
+    return str(value)
+
+
+def create_columns(column_definitions: List[ColumnDefinition], row_count: int,
+                   country_array: List[str], phone_array: List[Dict[str, Any]],
+                   my_file: Dict[str, Any], seed: Optional[int] = None,
+                   start_index: int = 0, as_arrays: bool = False) -> Dict[str, Sequence[Any]]:
+    """
+    Create a batch of rows laid out column by column.
+    
+    Values keep the types returned by ``generate_value``, with sources that do
+    not produce strings, numbers or dates natively converted to ``str`` the
+    same way ``create_row`` renders them. Numbers, dates and UUIDs are
+    sampled for the whole batch at once, except in seeded runs, where every
+    row is generated from its own row index so that it can be regenerated.
+    ``derived`` columns are then computed column by column from the batch.
+    
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        row_count (int): Number of rows in the batch.
+        country_array (List[str]): List of country codes.
+        phone_array (List[Dict[str, Any]]): List of phone information.
+        my_file (Dict[str, Any]): Dictionary storing various data.
+        seed (Optional[int]): Seed of the run, or None for an unseeded run.
+        start_index (int): Row index of the first row in a seeded run.
+        as_arrays (bool): Keep numbers sampled with NumPy as ``int64`` arrays
+            instead of converting them to lists of Python ints.
+        
+    Returns:
+        Dict[str, Sequence[Any]]: Column name to values, in definition order.
+    """
+    names = get_column_names(column_definitions)
+    
+    if seed is not None:
+        rows = [
+            generate_row_values(column_definitions, country_array, phone_array, my_file,
+                                row_rng(seed, row_index), row_index)
+            for row_index in range(start_index, start_index + row_count)
+        ]
+        return {
+            name: [to_column_value(row[i]) for row in rows]
+            for i, name in enumerate(names)
+        }
+    
+    countries = random.choices(country_array, k=row_count)
+    # Records of column groups, sampled by the first column of each group
+    row_records = [{} for _ in countries] if any("group" in x for x in column_definitions) else None
+    derived = derived_order(column_definitions)
+    # Derived columns compute on the NumPy arrays of numbers where they can
+    keep_arrays = as_arrays or bool(derived)
+    columns = {}
+    
+    for name, x in zip(names, column_definitions):
+        if x["datatype"] == "derived":
+            continue
+        values = sample_column(x, row_count, as_array=keep_arrays)
+        if values is None and "group" in x:
+            values = [
+                to_column_value(generate_value(x, country, phone_array, my_file, records=records))
+                for country, records in zip(countries, row_records)
+            ]
+        elif values is None:
+            values = [
+                to_column_value(generate_value(x, country, phone_array, my_file))
+                for country in countries
+            ]
+        columns[name] = values
+    
+    if not derived:
+        return columns
+    for i in derived:
+        columns[names[i]] = evaluate_derived(column_definitions[i], columns, row_count)
+    return {
+        name: columns[name] if as_arrays or not hasattr(columns[name], "tolist")
+        else columns[name].tolist()
+        for name in names
+    }
+
+
+def format_rows(column_definitions: List[ColumnDefinition], columns: Dict[str, List[Any]],
+                separator: str) -> List[str]:
+    """
+    Format a batch returned by ``create_columns`` as CSV rows.
+    
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        columns (Dict[str, List[Any]]): Column name to list of values.
+        separator (str): Separator between values.
+        
+    Returns:
+        List[str]: One row per batch row, without trailing newline.
+    """
+    fields = [
+        [format_value(x, value) for value in columns[name]]
+        for name, x in zip(get_column_names(column_definitions), column_definitions)
+    ]
+    return [separator.join(row) for row in zip(*fields)]
 
 
 def generate_data(parameter_file: str) -> None:
@@ -456,40 +1133,81 @@ def generate_data(parameter_file: str) -> None:
     """
     try:
         from .config import load_config
+        from .warm_start import prepare_run
         
         logger.info(f"Starting data generation using parameters from '{parameter_file}'")
         
         # Load configuration
         config = load_config(parameter_file)
         separator = config.get_separator()
-        columns = config.get_column_definitions()
+        seed = config.get_seed()
         filename = config.get_output_filename()
         row_count = config.get_row_count()
         
+        # Compile columns and initialize data structures, from the warm cache if configured
+        state = prepare_run(config)
+        columns, country_array, phone_array, my_file = state
         logger.info(f"Loaded configuration with {len(columns)} columns")
-        
-        # Initialize data structures
-        country_array = initialize_country_list()
-        logger.info(f"Initialized country list with {len(country_array)} entries")
-        
-        phone_array = initialize_phone_list()
-        logger.info(f"Initialized phone list with {len(phone_array)} entries")
-        
-        my_file = {}
-
-        # Generate and write data
-        try:
-            with open(filename, 'w', encoding="utf8") as f:
-                logger.info(f"Generating {row_count} rows of data")
-                for i in range(row_count):
-                    if i > 0 and i % 1000 == 0:
-                        logger.info(f"Generated {i} rows...")
-                    each_row = create_row(columns, separator, country_array, phone_array, my_file).rstrip('\n')
-                    print(each_row, file=f)
-                logger.info(f"Successfully generated {row_count} rows of data")
-        except Exception as e:
-            logger.error(f"Error writing data to file: {e}")
-            raise
+
+        output_format = config.get_output_format()
+        if output_format not in ("csv", "parquet", "fixed_width"):
+            raise ValueError(f"Unsupported output format '{output_format}'")
+
+        if output_format != "csv" and config.get_partitioning():
+            raise ValueError("Partitioning is only supported for csv output")
+
+        partitioning = config.get_partitioning()
+
+        if config.get_column_store():
+            if partitioning:
+                raise ValueError("Partitioning is not supported with a column store")
+            from .column_store import write_with_column_store
+            generated = write_with_column_store(config, state)
+            logger.info(f"Successfully generated {row_count} rows of data "
+                        f"({len(generated)} of {len(columns)} columns regenerated)")
+
+        elif output_format == "fixed_width":
+            from .fixed_width import write_fixed_width
+            write_fixed_width(config, state)
+            logger.info(f"Successfully generated {row_count} rows of data")
+
+        elif output_format == "parquet":
+            from .parquet_writer import write_parquet
+            write_parquet(
+                filename, columns, row_count, country_array, phone_array, my_file,
+                row_group_size=config.get_row_group_size(),
+                compression=config.get_compression(),
+                seed=seed,
+            )
+            logger.info(f"Successfully generated {row_count} rows of data")
+
+        elif partitioning:
+            from .partitioner import write_partitioned
+            write_partitioned(
+                filename, partitioning, columns, separator, row_count,
+                country_array, phone_array, my_file, seed=seed,
+            )
+            logger.info(f"Successfully generated {row_count} rows of data")
+
+        else:
+            # Generate and write data in batches, so numbers, dates and UUIDs are sampled per column
+            try:
+                with open(filename, 'w', encoding="utf8") as f:
+                    logger.info(f"Generating {row_count} rows of data")
+                    for start in range(0, row_count, CSV_BATCH_SIZE):
+                        if start > 0:
+                            logger.info(f"Generated {start} rows...")
+                        batch = create_columns(
+                            columns, min(CSV_BATCH_SIZE, row_count - start),
+                            country_array, phone_array, my_file, seed=seed, start_index=start,
+                        )
+                        f.write("".join(row + "\n" for row in format_rows(columns, batch, separator)))
+                    logger.info(f"Successfully generated {row_count} rows of data")
+            except Exception as e:
+                logger.error(f"Error writing data to file: {e}")
+                raise
+
+        my_file.log_stats()
             
     except Exception as e:
         logger.error(f"Error generating data: {e}")
@@ -0,0 +1,511 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Distributed generation for Large Test Data Generator.
+
+A coordinator splits ``number_of_rows`` into row ranges and hands them out to
+workers over TCP. Messages are JSON objects, one per line:
+
+- worker: ``{"type": "hello", "worker": name}``
+- coordinator: ``{"type": "config", "config": {...}, "directory": path,
+  "country_array": [...], "phone_array": [...]}``
+- coordinator: ``{"type": "range", "range_id": 3, "start": 3000, "stop": 4000, "attempt": 1}``
+- worker: ``{"type": "result", "range_id": 3, "attempt": 1, "manifest": {...}}`` or
+  ``{"type": "error", "range_id": 3, "error": message}``
+- coordinator: ``{"type": "done"}`` once no range is left
+
+Workers write every attempt at a range as partitioned output into its own
+``range-NNNNNN.attempt-K`` directory. A range whose worker reports an error,
+disconnects or times out is handed out again, up to ``max_attempts`` times; a
+worker that timed out may still be writing, so attempts never share a
+directory. When every range is written, the coordinator writes a manifest of
+the files of the accepted attempts and removes the directories of the others. The coordinator reads the
+country and phone lists once and sends them along with the configuration, so
+every worker samples from the same reference data.
+
+Runs must be seeded: rows then depend only on the seed and their row index, so
+a range produces the same files on any worker and on any attempt, and
+``unique_values`` columns, which assign pool entries by a seeded permutation
+of the global row index, never repeat a value across workers.
+"""
+from collections import deque
+from typing import Dict, List, Any, BinaryIO, Optional, Tuple
+import json
+import os
+import shutil
+import socket
+import socketserver
+import threading
+import time
+from .config import Config, load_config
+from .data_generator import initialize_country_list, initialize_phone_list, prepare_columns
+from .partitioner import MANIFEST_FILENAME, write_partitioned
+from .warm_start import RunState, prepare_run
+from .logger import logger
+
+DEFAULT_PORT = 7700
+DEFAULT_RANGE_ROWS = 1000000
+
+
+def parse_address(address: str, default_host: str = "") -> Tuple[str, int]:
+    """
+    Parse a ``host:port`` address.
+
+    Args:
+        address (str): The address; the host may be omitted.
+        default_host (str): Host used when the address has none.
+
+    Returns:
+        Tuple[str, int]: Host and port.
+    """
+    host, _, port = address.rpartition(":")
+    return host or default_host, int(port)
+
+
+def range_directory(range_id: int, attempt: int) -> str:
+    """
+    Get the name of the directory an attempt at a row range is written to.
+
+    Args:
+        range_id (int): Index of the range.
+        attempt (int): Number of the attempt, from 1.
+
+    Returns:
+        str: Directory name, relative to the output directory.
+    """
+    return f"range-{range_id:06d}.attempt-{attempt}"
+
+
+def output_directory(config: Config) -> str:
+    """
+    Get the output directory of a distributed run.
+
+    Args:
+        config (Config): Configuration of the run.
+
+    Returns:
+        str: The ``partitioning.directory`` option, or ``filename`` without its extension.
+    """
+    partitioning = config.get_partitioning() or {}
+    return partitioning.get("directory") or os.path.splitext(config.get_output_filename())[0]
+
+
+def send_message(stream: BinaryIO, message: Dict[str, Any]) -> None:
+    """
+    Send a message as a line of JSON.
+
+    Args:
+        stream (BinaryIO): Stream of the connection.
+        message (Dict[str, Any]): The message.
+    """
+    stream.write((json.dumps(message) + "\n").encode("utf8"))
+    stream.flush()
+
+
+def receive_message(stream: BinaryIO) -> Optional[Dict[str, Any]]:
+    """
+    Receive a message sent with ``send_message``.
+
+    Args:
+        stream (BinaryIO): Stream of the connection.
+
+    Returns:
+        Optional[Dict[str, Any]]: The message, or None if the connection was closed.
+    """
+    line = stream.readline()
+    if not line:
+        return None
+    return json.loads(line)
+
+
+class RangeScheduler:
+    """Hand out row ranges and collect their results."""
+
+    def __init__(self, row_count: int, range_rows: int = DEFAULT_RANGE_ROWS, max_attempts: int = 3):
+        """
+        Initialize the scheduler.
+
+        Args:
+            row_count (int): Total number of rows.
+            range_rows (int): Rows per range.
+            max_attempts (int): Attempts per range before the run fails.
+        """
+        if range_rows < 1 or max_attempts < 1:
+            raise ValueError("range_rows and max_attempts must be positive integers")
+        self.ranges = [
+            {"range_id": i, "start": start, "stop": min(start + range_rows, row_count)}
+            for i, start in enumerate(range(0, row_count, range_rows))
+        ]
+        self.max_attempts = max_attempts
+        self.pending = deque(r["range_id"] for r in self.ranges)
+        self.attempts: Dict[int, int] = {}
+        self.results: Dict[int, Dict[str, Any]] = {}
+        self.error: Optional[str] = None
+        self._condition = threading.Condition()
+
+    @property
+    def finished(self) -> bool:
+        """Whether every range is written or the run has failed."""
+        return self.error is not None or len(self.results) == len(self.ranges)
+
+    def acquire(self) -> Optional[Dict[str, Any]]:
+        """
+        Take the next range, waiting while ranges are in flight that may still fail.
+
+        Returns:
+            Optional[Dict[str, Any]]: The range, or None once the run is finished.
+        """
+        with self._condition:
+            self._condition.wait_for(lambda: self.pending or self.finished)
+            if self.finished:
+                return None
+            range_id = self.pending.popleft()
+            self.attempts[range_id] = self.attempts.get(range_id, 0) + 1
+            return dict(self.ranges[range_id], attempt=self.attempts[range_id])
+
+    def complete(self, range_id: int, worker: str, manifest: Dict[str, Any], attempt: int) -> None:
+        """
+        Record a written range.
+
+        Args:
+            range_id (int): Index of the range.
+            worker (str): Name of the worker that wrote it.
+            manifest (Dict[str, Any]): Manifest of the range.
+            attempt (int): The attempt whose files are kept.
+        """
+        with self._condition:
+            self.results[range_id] = {"worker": worker, "manifest": manifest, "attempt": attempt}
+            self._condition.notify_all()
+        logger.info(f"Range {range_id} written by {worker} ({len(self.results)}/{len(self.ranges)})")
+
+    def fail(self, range_id: int, reason: str) -> None:
+        """
+        Record a failed attempt, handing the range out again if attempts are left.
+
+        Args:
+            range_id (int): Index of the range.
+            reason (str): Why the attempt failed.
+        """
+        with self._condition:
+            attempts = self.attempts[range_id]
+            if attempts >= self.max_attempts:
+                self.error = f"Range {range_id} failed {attempts} times, last: {reason}"
+                logger.error(self.error)
+            else:
+                logger.warning(f"Range {range_id} failed ({reason}), retrying")
+                self.pending.append(range_id)
+            self._condition.notify_all()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until the run is finished.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait, or None to wait forever.
+
+        Returns:
+            bool: Whether the run is finished.
+        """
+        with self._condition:
+            return self._condition.wait_for(lambda: self.finished, timeout)
+
+
+class _WorkerHandler(socketserver.StreamRequestHandler):
+    """Serve the ranges of one worker connection."""
+
+    def handle(self) -> None:
+        coordinator = self.server.coordinator
+        scheduler = coordinator.scheduler
+        hello = receive_message(self.rfile)
+        if hello is None or hello.get("type") != "hello":
+            return
+        worker = hello.get("worker") or "%s:%d" % self.client_address[:2]
+        logger.info(f"Worker {worker} connected")
+        send_message(self.wfile, {
+            "type": "config", "config": coordinator.config.config, "directory": coordinator.directory,
+            "country_array": coordinator.country_array, "phone_array": coordinator.phone_array,
+        })
+        while True:
+            task = scheduler.acquire()
+            if task is None:
+                try:
+                    send_message(self.wfile, {"type": "done"})
+                except OSError:
+                    pass
+                return
+            self.connection.settimeout(coordinator.task_timeout)
+            try:
+                send_message(self.wfile, dict(task, type="range"))
+                reply = receive_message(self.rfile)
+            except (OSError, ValueError) as e:
+                scheduler.fail(task["range_id"], f"worker {worker}: {e}")
+                return
+            if reply is None:
+                scheduler.fail(task["range_id"], f"worker {worker} disconnected")
+                return
+            reason = coordinator.check_result(task, reply)
+            if reason is None:
+                scheduler.complete(task["range_id"], worker, reply["manifest"], task["attempt"])
+            else:
+                scheduler.fail(task["range_id"], f"worker {worker}: {reason}")
+
+
+class _CoordinatorServer(socketserver.ThreadingTCPServer):
+    allow_reuse_address = True
+    daemon_threads = True
+
+
+class Coordinator:
+    """Split a run into row ranges and hand them out to workers."""
+
+    def __init__(self, config: Config, host: str = "0.0.0.0", port: int = DEFAULT_PORT,
+                 directory: Optional[str] = None, range_rows: int = DEFAULT_RANGE_ROWS,
+                 max_attempts: int = 3, task_timeout: Optional[float] = None,
+                 country_array: Optional[List[str]] = None,
+                 phone_array: Optional[List[Dict[str, Any]]] = None):
+        """
+        Initialize the coordinator and start listening.
+
+        Args:
+            config (Config): Configuration of the run; it is sent to the workers.
+            host (str): Interface to listen on.
+            port (int): Port to listen on, 0 for any free port.
+            directory (Optional[str]): Output directory, ``output_directory(config)`` by default.
+            range_rows (int): Rows per range.
+            max_attempts (int): Attempts per range before the run fails.
+            task_timeout (Optional[float]): Seconds a worker may take for a range before
+                it is handed to another worker, or None to wait forever.
+            country_array (Optional[List[str]]): Country codes to use instead of MongoDB.
+            phone_array (Optional[List[Dict[str, Any]]]): Phone information to use instead of MongoDB.
+
+        Raises:
+            ValueError: If the run is not seeded or not written as csv.
+        """
+        if config.get_seed() is None:
+            raise ValueError("Distributed generation requires a seed")
+        if config.get_output_format() != "csv":
+            raise ValueError("Distributed generation only supports csv output")
+        # Fail on invalid columns before any worker connects
+        prepare_columns(config.get_column_definitions(), config.get_seed())
+        self.config = config
+        self.directory = directory or output_directory(config)
+        self.task_timeout = task_timeout
+        self.country_array = initialize_country_list() if country_array is None else country_array
+        self.phone_array = initialize_phone_list() if phone_array is None else phone_array
+        self.scheduler = RangeScheduler(config.get_row_count(), range_rows, max_attempts)
+        self.server = _CoordinatorServer((host, port), _WorkerHandler)
+        self.server.coordinator = self
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Host and port the coordinator listens on."""
+        return self.server.server_address[:2]
+
+    def check_result(self, task: Dict[str, Any], reply: Dict[str, Any]) -> Optional[str]:
+        """
+        Check the reply of a worker to a range.
+
+        Args:
+            task (Dict[str, Any]): The range.
+            reply (Dict[str, Any]): The reply of the worker.
+
+        Returns:
+            Optional[str]: Why the range failed, or None if it was written.
+        """
+        if reply.get("type") == "error":
+            return reply.get("error", "unknown error")
+        if reply.get("type") != "result" or reply.get("range_id") != task["range_id"]:
+            return f"unexpected reply {reply.get('type')!r}"
+        if reply.get("attempt") != task["attempt"]:
+            return f"reply for attempt {reply.get('attempt')} instead of {task['attempt']}"
+        rows = reply["manifest"].get("total_rows")
+        if rows != task["stop"] - task["start"]:
+            return f"wrote {rows} rows instead of {task['stop'] - task['start']}"
+        return None
+
+    def run(self, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Serve workers until every range is written, then write the manifest.
+
+        Args:
+            timeout (Optional[float]): Seconds to wait for the run, or None to wait forever.
+
+        Returns:
+            Dict[str, Any]: The manifest.
+
+        Raises:
+            RuntimeError: If a range failed too often or the run timed out.
+        """
+        host, port = self.address
+        logger.info(
+            f"Coordinating {len(self.scheduler.ranges)} ranges of {self.config.get_row_count()} rows "
+            f"on {host}:{port}"
+        )
+        thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            if not self.scheduler.wait(timeout):
+                raise RuntimeError("Distributed generation timed out")
+        finally:
+            self.server.shutdown()
+            self.server.server_close()
+        if self.scheduler.error is not None:
+            raise RuntimeError(self.scheduler.error)
+        return self.write_manifest()
+
+    def write_manifest(self) -> Dict[str, Any]:
+        """
+        Write the manifest of all ranges.
+
+        Returns:
+            Dict[str, Any]: The manifest.
+        """
+        ranges, files = [], []
+        for r in self.scheduler.ranges:
+            result = self.scheduler.results[r["range_id"]]
+            ranges.append(dict(r, worker=result["worker"], attempt=result["attempt"],
+                               attempts=self.scheduler.attempts[r["range_id"]]))
+            directory = range_directory(r["range_id"], result["attempt"])
+            for entry in result["manifest"]["files"]:
+                files.append(dict(entry, path=f"{directory}/{entry['path']}", range_id=r["range_id"]))
+        manifest = {
+            "seed": self.config.get_seed(),
+            "total_rows": sum(entry["rows"] for entry in files),
+            "partition_column": (self.config.get_partitioning() or {}).get("column"),
+            "ranges": ranges,
+            "files": files,
+        }
+        os.makedirs(self.directory, exist_ok=True)
+        with open(os.path.join(self.directory, MANIFEST_FILENAME), "w", encoding="utf8") as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(f"Wrote {len(files)} files in {len(ranges)} ranges to '{self.directory}'")
+        self.discard_attempts()
+        return manifest
+
+    def discard_attempts(self) -> None:
+        """Remove the directories of attempts that were not accepted, such as timed-out ones."""
+        accepted = {range_directory(range_id, result["attempt"])
+                    for range_id, result in self.scheduler.results.items()}
+        for entry in os.scandir(self.directory):
+            if entry.is_dir() and entry.name.startswith("range-") and entry.name not in accepted:
+                logger.debug(f"Removing discarded attempt '{entry.path}'")
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def generate_range(config: Config, state: RunState, directory: str,
+                   task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Write a row range as partitioned output.
+
+    Args:
+        config (Config): Configuration of the run.
+        state (RunState): Prepared columns and reference data.
+        directory (str): Output directory of the run.
+        task (Dict[str, Any]): The range.
+
+    Returns:
+        Dict[str, Any]: Manifest of the range.
+    """
+    partitioning = dict(config.get_partitioning() or {})
+    partitioning["directory"] = os.path.join(
+        directory, range_directory(task["range_id"], task["attempt"])
+    )
+    # Left over from an earlier run into the same output directory
+    shutil.rmtree(partitioning["directory"], ignore_errors=True)
+    return write_partitioned(
+        config.get_output_filename(), partitioning, state.columns, config.get_separator(),
+        task["stop"] - task["start"], state.country_array, state.phone_array, state.my_file,
+        seed=config.get_seed(), start_index=task["start"],
+    )
+
+
+def connect(address: str, timeout: float = 30.0) -> socket.socket:
+    """
+    Connect to a coordinator, retrying until it listens.
+
+    Args:
+        address (str): ``host:port`` of the coordinator.
+        timeout (float): Seconds to keep retrying.
+
+    Returns:
+        socket.socket: The connection.
+    """
+    host, port = parse_address(address, "localhost")
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except ConnectionRefusedError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.5)
+
+
+def run_worker(address: str, name: Optional[str] = None, directory: Optional[str] = None,
+               connect_timeout: float = 30.0) -> int:
+    """
+    Generate the ranges handed out by a coordinator until it is done.
+
+    Args:
+        address (str): ``host:port`` of the coordinator.
+        name (Optional[str]): Name reported to the coordinator, host and process id by default.
+        directory (Optional[str]): Output directory, the one of the coordinator by default.
+        connect_timeout (float): Seconds to wait for the coordinator to listen.
+
+    Returns:
+        int: Number of ranges written.
+    """
+    name = name or f"{socket.gethostname()}-{os.getpid()}"
+    written = 0
+    with connect(address, connect_timeout) as sock, sock.makefile("rwb") as stream:
+        send_message(stream, {"type": "hello", "worker": name})
+        message = receive_message(stream)
+        if message is None or message.get("type") != "config":
+            raise RuntimeError("Coordinator did not send a configuration")
+        config = Config.from_dict(message["config"], required_fields=())
+        directory = directory or message["directory"]
+        state = prepare_run(config, message["country_array"], message["phone_array"])
+        logger.info(f"Worker {name} connected to {address}, writing to '{directory}'")
+
+        while True:
+            task = receive_message(stream)
+            if task is None or task.get("type") != "range":
+                break
+            logger.info(f"Generating range {task['range_id']} (rows {task['start']} to {task['stop'] - 1})")
+            try:
+                manifest = generate_range(config, state, directory, task)
+            except Exception as e:
+                logger.error(f"Range {task['range_id']} failed: {e}")
+                send_message(stream, {"type": "error", "range_id": task["range_id"], "error": str(e)})
+                continue
+            send_message(stream, {"type": "result", "range_id": task["range_id"],
+                                  "attempt": task["attempt"], "manifest": manifest})
+            written += 1
+    state.my_file.log_stats()
+    logger.info(f"Worker {name} wrote {written} ranges")
+    return written
+
+
+def coordinate(parameter_file: str, listen: str = f"0.0.0.0:{DEFAULT_PORT}",
+               directory: Optional[str] = None, range_rows: int = DEFAULT_RANGE_ROWS,
+               max_attempts: int = 3, task_timeout: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Coordinate a distributed run described by a parameter file.
+
+    Args:
+        parameter_file (str): Path to the parameter JSON file.
+        listen (str): ``host:port`` to listen on.
+        directory (Optional[str]): Output directory, see ``output_directory``.
+        range_rows (int): Rows per range.
+        max_attempts (int): Attempts per range before the run fails.
+        task_timeout (Optional[float]): Seconds a worker may take for a range.
+
+    Returns:
+        Dict[str, Any]: The manifest.
+    """
+    host, port = parse_address(listen, "0.0.0.0")
+    coordinator = Coordinator(
+        load_config(parameter_file), host, port, directory=directory, range_rows=range_rows,
+        max_attempts=max_attempts, task_timeout=task_timeout,
+    )
+    return coordinator.run()
@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Statistical distributions for Large Test Data Generator.
+
+``number`` and ``xdate`` columns can draw their values from a distribution
+instead of uniformly. Each distribution samples single values with the
+``random`` module and whole batches at once with NumPy when it is installed,
+falling back to a Python loop otherwise.
+"""
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from itertools import accumulate
+from typing import Dict, List, Any, Optional, Sequence
+import math
+import random
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+
+class Distribution(ABC):
+    """Base class of all distributions."""
+
+    @abstractmethod
+    def sample(self, rng: Any = random) -> float:
+        """
+        Draw a single sample.
+
+        Args:
+            rng (Any): Random number generator (the ``random`` module or a ``random.Random``).
+
+        Returns:
+            float: The sample.
+        """
+
+    @abstractmethod
+    def sample_numpy(self, n: int, generator: "np.random.Generator") -> "np.ndarray":
+        """
+        Draw a batch of samples with NumPy.
+
+        Args:
+            n (int): Number of samples.
+            generator (np.random.Generator): NumPy random generator.
+
+        Returns:
+            np.ndarray: The samples.
+        """
+
+    def sample_batch(self, n: int, rng: Any = random) -> Sequence[float]:
+        """
+        Draw a batch of samples, vectorized when NumPy is available.
+
+        The NumPy generator is seeded from ``rng`` so that seeded runs stay
+        reproducible.
+
+        Args:
+            n (int): Number of samples.
+            rng (Any): Random number generator.
+
+        Returns:
+            Sequence[float]: The samples, a NumPy array when NumPy is available.
+        """
+        if np is not None:
+            return self.sample_numpy(n, np.random.default_rng(rng.getrandbits(64)))
+        return [self.sample(rng) for _ in range(n)]
+
+
+class UniformDistribution(Distribution):
+    """Uniform distribution between ``low`` and ``high``."""
+
+    def __init__(self, low: float = 0.0, high: float = 1.0):
+        self.low = float(low)
+        self.high = float(high)
+
+    def sample(self, rng: Any = random) -> float:
+        return rng.uniform(self.low, self.high)
+
+    def sample_numpy(self, n: int, generator: "np.random.Generator") -> "np.ndarray":
+        return generator.uniform(self.low, self.high, n)
+
+
+class NormalDistribution(Distribution):
+    """Normal distribution with ``mean`` and ``stddev``."""
+
+    def __init__(self, mean: float = 0.0, stddev: float = 1.0):
+        self.mean = float(mean)
+        self.stddev = float(stddev)
+
+    def sample(self, rng: Any = random) -> float:
+        return rng.gauss(self.mean, self.stddev)
+
+    def sample_numpy(self, n: int, generator: "np.random.Generator") -> "np.ndarray":
+        return generator.normal(self.mean, self.stddev, n)
+
+
+class LogNormalDistribution(Distribution):
+    """Log-normal distribution whose logarithm has ``mean`` and ``sigma``."""
+
+    def __init__(self, mean: float = 0.0, sigma: float = 1.0):
+        self.mean = float(mean)
+        self.sigma = float(sigma)
+
+    def sample(self, rng: Any = random) -> float:
+        return rng.lognormvariate(self.mean, self.sigma)
+
+    def sample_numpy(self, n: int, generator: "np.random.Generator") -> "np.ndarray":
+        return generator.lognormal(self.mean, self.sigma, n)
+
+
+class ExponentialDistribution(Distribution):
+    """Exponential distribution with mean ``scale``."""
+
+    def __init__(self, scale: float = 1.0):
+        if scale <= 0:
+            raise ValueError("Exponential distribution requires a positive scale")
+        self.scale = float(scale)
+
+    def sample(self, rng: Any = random) -> float:
+        return rng.expovariate(1.0 / self.scale)
+
+    def sample_numpy(self, n: int, generator: "np.random.Generator") -> "np.ndarray":
+        return generator.exponential(self.scale, n)
+
+
+class DiscreteDistribution(Distribution):
+    """Distribution over a finite set of values, sampled through its cumulative weights."""
+
+    def __init__(self, values: Sequence[float], weights: Sequence[float],
+                 widths: Optional[Sequence[float]] = None):
+        """
+        Initialize the distribution.
+
+        Args:
+            values (Sequence[float]): Values, or lower bounds of bins.
+            weights (Sequence[float]): Relative weight of every value.
+            widths (Optional[Sequence[float]]): Bin widths; samples are uniform within a bin.
+        """
+        if not values or len(values) != len(weights):
+            raise ValueError("Discrete distribution requires one weight per value")
+        total = float(sum(weights))
+        if total <= 0:
+            raise ValueError("Discrete distribution requires a positive total weight")
+        self.values = [float(v) for v in values]
+        self.widths = [float(w) for w in widths] if widths is not None else None
+        self.cdf = [c / total for c in accumulate(weights)]
+        self.cdf[-1] = 1.0
+
+    def sample(self, rng: Any = random) -> float:
+        i = bisect_left(self.cdf, rng.random())
+        if self.widths is None:
+            return self.values[i]
+        return self.values[i] + rng.random() * self.widths[i]
+
+    def sample_numpy(self, n: int, generator: "np.random.Generator") -> "np.ndarray":
+        i = np.searchsorted(np.asarray(self.cdf), generator.random(n), side="left")
+        samples = np.asarray(self.values)[i]
+        if self.widths is not None:
+            samples = samples + generator.random(n) * np.asarray(self.widths)[i]
+        return samples
+
+
+def _log1p_ratio(x: float) -> float:
+    """``log(1 + x) / x``, continued to 1 at 0."""
+    if abs(x) > 1e-8:
+        return math.log1p(x) / x
+    return 1.0 - x * (0.5 - x * (1.0 / 3.0 - 0.25 * x))
+
+
+def _expm1_ratio(x: float) -> float:
+    """``(exp(x) - 1) / x``, continued to 1 at 0."""
+    if abs(x) > 1e-8:
+        return math.expm1(x) / x
+    return 1.0 + x * 0.5 * (1.0 + x / 3.0 * (1.0 + 0.25 * x))
+
+
+def _log1p_ratio_numpy(x: "np.ndarray") -> "np.ndarray":
+    small = np.abs(x) <= 1e-8
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.log1p(x) / np.where(small, 1.0, x)
+    return np.where(small, 1.0 - x * (0.5 - x * (1.0 / 3.0 - 0.25 * x)), ratio)
+
+
+def _expm1_ratio_numpy(x: "np.ndarray") -> "np.ndarray":
+    small = np.abs(x) <= 1e-8
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.expm1(x) / np.where(small, 1.0, x)
+    return np.where(small, 1.0 + x * 0.5 * (1.0 + x / 3.0 * (1.0 + 0.25 * x)), ratio)
+
+
+class ZipfDistribution(Distribution):
+    """
+    Zipf distribution over the ranks ``1..n`` with exponent ``s``.
+
+    Ranks are drawn by rejection-inversion (Hörmann and Derflinger), which
+    needs no table of the ``n`` probabilities, so ``n`` can be as large as the
+    values of a column.
+    """
+
+    def __init__(self, s: float = 1.0, n: int = 1000):
+        if n < 1:
+            raise ValueError("Zipf distribution requires at least one rank")
+        if s < 0:
+            raise ValueError("Zipf distribution requires a non-negative exponent")
+        self.s = float(s)
+        self.n = int(n)
+        self._h_integral_x1 = self._h_integral(1.5) - 1.0
+        self._h_integral_n = self._h_integral(self.n + 0.5)
+        self._threshold = 2.0 - self._h_integral_inverse(self._h_integral(2.5) - self._h(2.0))
+
+    def _h(self, x: float) -> float:
+        return math.exp(-self.s * math.log(x))
+
+    def _h_integral(self, x: float) -> float:
+        log_x = math.log(x)
+        return _expm1_ratio((1.0 - self.s) * log_x) * log_x
+
+    def _h_integral_inverse(self, x: float) -> float:
+        t = max(-1.0, x * (1.0 - self.s))
+        return math.exp(_log1p_ratio(t) * x)
+
+    def sample(self, rng: Any = random) -> float:
+        while True:
+            u = self._h_integral_n + rng.random() * (self._h_integral_x1 - self._h_integral_n)
+            x = self._h_integral_inverse(u)
+            k = min(max(int(x + 0.5), 1), self.n)
+            if k - x <= self._threshold or u >= self._h_integral(k + 0.5) - self._h(k):
+                return float(k)
+
+    def sample_numpy(self, n: int, generator: "np.random.Generator") -> "np.ndarray":
+        samples = np.empty(n)
+        pending = np.arange(n)
+        while pending.size:
+            u = self._h_integral_n + generator.random(pending.size) * (
+                self._h_integral_x1 - self._h_integral_n)
+            t = np.maximum(-1.0, u * (1.0 - self.s))
+            x = np.exp(_log1p_ratio_numpy(t) * u)
+            k = np.clip(np.floor(x + 0.5), 1, self.n)
+            log_k = np.log(k + 0.5)
+            bound = _expm1_ratio_numpy((1.0 - self.s) * log_k) * log_k - np.exp(-self.s * np.log(k))
+            accepted = (k - x <= self._threshold) | (u >= bound)
+            samples[pending[accepted]] = k[accepted]
+            pending = pending[~accepted]
+        return samples
+
+
+def load_histogram(file_path: str) -> DiscreteDistribution:
+    """
+    Load an empirical histogram from a file.
+
+    Every line is either ``value,weight`` or ``low,high,weight``; blank lines
+    and lines starting with ``#`` are ignored.
+
+    Args:
+        file_path (str): Path to the histogram file.
+
+    Returns:
+        DiscreteDistribution: The histogram as a distribution.
+    """
+    values, weights, widths = [], [], []
+    with open(file_path, encoding="utf8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = [float(field) for field in line.split(",")]
+            if len(fields) == 2:
+                values.append(fields[0])
+                widths.append(0.0)
+            elif len(fields) == 3:
+                values.append(fields[0])
+                widths.append(fields[1] - fields[0])
+            else:
+                raise ValueError(f"Invalid histogram line in {file_path}: {line}")
+            weights.append(fields[-1])
+    return DiscreteDistribution(values, weights, widths if any(widths) else None)
+
+
+def build_distribution(spec: Dict[str, Any]) -> Distribution:
+    """
+    Build a distribution from its column specification.
+
+    Args:
+        spec (Dict[str, Any]): The ``distribution`` object of a column definition.
+
+    Returns:
+        Distribution: The distribution.
+
+    Raises:
+        ValueError: If the distribution type is not supported.
+    """
+    kind = spec.get("type", "uniform")
+    if kind == "uniform":
+        return UniformDistribution(spec.get("low", 0.0), spec.get("high", 1.0))
+    if kind == "normal":
+        return NormalDistribution(spec.get("mean", 0.0), spec.get("stddev", 1.0))
+    if kind == "lognormal":
+        return LogNormalDistribution(spec.get("mean", 0.0), spec.get("sigma", 1.0))
+    if kind == "exponential":
+        return ExponentialDistribution(spec.get("scale", 1.0))
+    if kind == "zipf":
+        return ZipfDistribution(spec.get("s", 1.0), spec.get("n", 1000))
+    if kind == "empirical":
+        return load_histogram(spec["file_path"])
+    raise ValueError(f"Unsupported distribution type '{kind}'")
+
+
+def clip_integer(sample: float, low: int, high: int) -> int:
+    """
+    Round a sample and clip it into the integer range ``[low, high)``.
+
+    Args:
+        sample (float): The sample.
+        low (int): Lowest allowed value.
+        high (int): Upper bound (exclusive).
+
+    Returns:
+        int: The clipped integer.
+    """
+    return int(round(min(max(sample, low), high - 1)))
+
+
+def sample_integers(distribution: Optional[Distribution], low: int, high: int, n: int,
+                    rng: Any = random, as_array: bool = False) -> Sequence[int]:
+    """
+    Draw a batch of integers in ``[low, high)``.
+
+    Args:
+        distribution (Optional[Distribution]): Distribution of the values, or None for uniform.
+        low (int): Lowest allowed value.
+        high (int): Upper bound (exclusive).
+        n (int): Number of samples.
+        rng (Any): Random number generator.
+        as_array (bool): Return the NumPy ``int64`` array the values were sampled
+            into instead of a list, when they were sampled with NumPy.
+
+    Returns:
+        Sequence[int]: The integers.
+    """
+    # Beyond 2**53 floats lose integer precision, so large ranges use Python ints
+    if np is not None and high <= 2 ** 53:
+        generator = np.random.default_rng(rng.getrandbits(64))
+        if distribution is None:
+            samples = generator.integers(low, high, n, dtype=np.int64)
+        else:
+            samples = np.rint(np.clip(distribution.sample_numpy(n, generator), low, high - 1))
+            samples = samples.astype(np.int64)
+        return samples if as_array else samples.tolist()
+    if distribution is None:
+        return [rng.randrange(low, high) for _ in range(n)]
+    return [clip_integer(distribution.sample(rng), low, high) for _ in range(n)]
+
+
+def sample_proportions(distribution: Optional[Distribution], n: int,
+                       rng: Any = random) -> List[float]:
+    """
+    Draw a batch of proportions in ``[0, 1]``.
+
+    Args:
+        distribution (Optional[Distribution]): Distribution of the values, or None for uniform.
+        n (int): Number of samples.
+        rng (Any): Random number generator.
+
+    Returns:
+        List[float]: The proportions.
+    """
+    if np is not None:
+        generator = np.random.default_rng(rng.getrandbits(64))
+        if distribution is None:
+            return generator.random(n).tolist()
+        return np.clip(distribution.sample_numpy(n, generator), 0.0, 1.0).tolist()
+    if distribution is None:
+        return [rng.random() for _ in range(n)]
+    return [min(max(distribution.sample(rng), 0.0), 1.0) for _ in range(n)]
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Dry-run sizing estimates for Large Test Data Generator.
+
+An estimate compiles the schema, generates a small sample of every column,
+measures its bytes and generation time and extrapolates them to
+``number_of_rows``. It also reports the memory held by reference sources and
+whether ``unique_values`` pools are large enough, without writing any output.
+"""
+from typing import Dict, List, Any, Optional
+import io
+import os
+import time
+import zlib
+from .data_generator import (
+    create_columns, derived_order, evaluate_derived, format_rows, format_value, get_column_names,
+    initialize_list
+)
+from .cache import estimate_size
+from .fixed_width import FixedWidthLayout
+from .warm_start import prepare_run
+from .logger import logger
+
+
+def _scale(value: float, sample_rows: int, row_count: int) -> float:
+    return value * row_count / sample_rows
+
+
+def parquet_sample_sizes(columns: List[Dict[str, Any]], batch: Dict[str, Any],
+                         compression: Optional[str]) -> Optional[Dict[str, int]]:
+    """
+    Measure the size of a sample written as Parquet.
+
+    Args:
+        columns (List[Dict[str, Any]]): Prepared column definitions.
+        batch (Dict[str, Any]): Sample returned by ``create_columns``.
+        compression (Optional[str]): Parquet compression codec.
+
+    Returns:
+        Optional[Dict[str, int]]: ``uncompressed`` and ``compressed`` bytes, or None
+        if pyarrow is not installed.
+    """
+    try:
+        import pyarrow.parquet as pq
+        from .parquet_writer import arrow_schema, to_record_batch
+    except ImportError:
+        return None
+    schema = arrow_schema(columns)
+    record_batch = to_record_batch(batch, schema)
+    sizes = {}
+    for key, codec in (("uncompressed", "none"), ("compressed", compression or "none")):
+        buffer = io.BytesIO()
+        with pq.ParquetWriter(buffer, schema, compression=codec) as writer:
+            writer.write_batch(record_batch)
+        sizes[key] = buffer.tell()
+    return sizes
+
+
+def estimate_run(config: Any, sample_rows: int = 1000, workers: int = 1,
+                 country_array: Optional[List[str]] = None,
+                 phone_array: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    """
+    Estimate the size and duration of a run from a sample.
+
+    Args:
+        config (Config): Configuration of the run.
+        sample_rows (int): Rows generated for the sample.
+        workers (int): Worker processes the run is split over.
+        country_array (Optional[List[str]]): Country codes to use instead of MongoDB.
+        phone_array (Optional[List[Dict[str, Any]]]): Phone information to use instead of MongoDB.
+
+    Returns:
+        Dict[str, Any]: The estimate, with per-column figures under ``columns``.
+    """
+    if sample_rows <= 0 or workers <= 0:
+        raise ValueError("sample_rows and workers must be positive integers")
+    row_count = config.get_row_count()
+    sample_rows = min(sample_rows, row_count) or 1
+    seed = config.get_seed()
+    separator = config.get_separator()
+    output_format = config.get_output_format()
+    columns, country_array, phone_array, my_file = prepare_run(config, country_array, phone_array)
+    names = get_column_names(columns)
+
+    layout = FixedWidthLayout(columns) if output_format == "fixed_width" else None
+    batch = {}
+    reports = {}
+    derived = derived_order(columns)
+    # Derived columns are computed from the sample of the columns they refer to
+    for i in [i for i, x in enumerate(columns) if x["datatype"] != "derived"] + derived:
+        name, x = names[i], columns[i]
+        start = time.perf_counter()
+        if x["datatype"] == "derived":
+            values = evaluate_derived(x, batch, sample_rows)
+        else:
+            values = next(iter(create_columns([x], sample_rows, country_array, phone_array,
+                                              my_file, seed=seed).values()))
+        elapsed = time.perf_counter() - start
+        if layout is not None:
+            field_bytes = layout.widths[i] * sample_rows
+        else:
+            field_bytes = sum(len(format_value(x, value).encode("utf8")) for value in values)
+        batch[name] = values
+        reports[i] = {
+            "name": name,
+            "datatype": x["datatype"],
+            "bytes_per_row": field_bytes / sample_rows,
+            "seconds_per_row": elapsed / sample_rows,
+        }
+    column_reports = [reports[i] for i in range(len(columns))]
+
+    start = time.perf_counter()
+    if layout is not None:
+        text = layout.encode_rows(batch)
+    else:
+        text = "".join(row + "\n" for row in format_rows(columns, batch, separator)).encode("utf8")
+    format_seconds = time.perf_counter() - start
+    generation_seconds = sum(c["seconds_per_row"] for c in column_reports) * sample_rows + format_seconds
+
+    if output_format == "parquet":
+        sizes = parquet_sample_sizes(columns, batch, config.get_compression())
+        if sizes is None:
+            logger.warning("pyarrow is not installed; Parquet sizes are estimated from CSV")
+    else:
+        sizes = None
+    if sizes is None:
+        sizes = {"uncompressed": len(text), "compressed": len(zlib.compress(text, 6))}
+
+    pools = []
+    for name, x in zip(names, columns):
+        if x["datatype"] != "unique_values" or not os.path.exists(x["file_path"]):
+            continue
+        pool_size = len(initialize_list(x["file_path"]))
+        pools.append({
+            "name": name,
+            "pool_size": pool_size,
+            "exhausted": pool_size < row_count,
+        })
+
+    seconds = _scale(generation_seconds, sample_rows, row_count) / workers
+    return {
+        "row_count": row_count,
+        "sample_rows": sample_rows,
+        "workers": workers,
+        "output_format": output_format,
+        "uncompressed_bytes": int(round(_scale(sizes["uncompressed"], sample_rows, row_count))),
+        "compressed_bytes": int(round(_scale(sizes["compressed"], sample_rows, row_count))),
+        "seconds": seconds,
+        "rows_per_second": row_count / seconds if seconds else float("inf"),
+        "reference_bytes": (sum(my_file.source_sizes().values()) +
+                            estimate_size(country_array) + estimate_size(phone_array)),
+        "cache_memory_budget": config.get_cache_memory_budget(),
+        "columns": column_reports,
+        "unique_pools": pools,
+    }
+
+
+def _human_bytes(size: float) -> str:
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(size) < 1024 or unit == "TB":
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def _human_seconds(seconds: float) -> str:
+    hours, rest = divmod(int(round(seconds)), 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours}h {minutes:02d}m {secs:02d}s"
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """
+    Format an estimate as a text report.
+
+    Args:
+        report (Dict[str, Any]): Estimate returned by ``estimate_run``.
+
+    Returns:
+        str: The report.
+    """
+    compressed_label = "compressed" if report["output_format"] == "parquet" else "gzip"
+    lines = [
+        f"Estimate for {report['row_count']:,} rows ({report['output_format']}, "
+        f"extrapolated from {report['sample_rows']:,} sample rows)",
+        f"  Output size:       {_human_bytes(report['uncompressed_bytes'])} uncompressed, "
+        f"{_human_bytes(report['compressed_bytes'])} {compressed_label}",
+        f"  Generation time:   {_human_seconds(report['seconds'])} with {report['workers']} "
+        f"worker(s) ({report['rows_per_second']:,.0f} rows/s, excluding disk I/O)",
+        f"  Reference sources: {_human_bytes(report['reference_bytes'])} in memory",
+    ]
+    budget = report["cache_memory_budget"]
+    if budget is not None and report["reference_bytes"] > budget:
+        lines.append(f"  Warning: reference sources exceed cache_memory_budget ({_human_bytes(budget)})")
+    lines.append("")
+    lines.append(f"  {'Column':<24} {'Datatype':<14} {'Bytes/row':>10} {'us/row':>10}")
+    for column in report["columns"]:
+        lines.append(
+            f"  {column['name']:<24} {column['datatype']:<14} "
+            f"{column['bytes_per_row']:>10.1f} {column['seconds_per_row'] * 1e6:>10.2f}"
+        )
+    for pool in report["unique_pools"]:
+        status = "runs out" if pool["exhausted"] else "is large enough"
+        lines.append(
+            f"  unique_values pool of '{pool['name']}' ({pool['pool_size']:,} values) {status} "
+            f"for {report['row_count']:,} rows"
+        )
+    return "\n".join(lines)
+
+
+def estimate(parameter_file: str, sample_rows: int = 1000, workers: int = 1) -> Dict[str, Any]:
+    """
+    Print a sizing estimate for the run described by a parameter file.
+
+    Args:
+        parameter_file (str): Path to the parameter JSON file.
+        sample_rows (int): Rows generated for the sample.
+        workers (int): Worker processes the run is split over.
+
+    Returns:
+        Dict[str, Any]: The estimate.
+    """
+    from .config import load_config
+
+    report = estimate_run(load_config(parameter_file), sample_rows, workers)
+    print(format_report(report))
+    return report
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Derived columns for Large Test Data Generator.
+
+A ``derived`` column computes its value from the other columns of the same
+row with an ``expression``, for example::
+
+    lower(fname) + "." + lower(lname) + "@example.com"
+
+Expressions use Python syntax restricted to literals, column names,
+arithmetic, comparisons, ``and``/``or``/``not``, conditional expressions,
+subscripts and calls of the functions in ``FUNCTIONS``. They are parsed with
+``ast`` and compiled once into closures: one evaluates a single row, the
+other whole columns of a batch, with NumPy operators when the operands are
+NumPy arrays. Nothing is ever passed to ``eval``.
+"""
+from typing import Dict, List, Any, Callable, Sequence, Tuple
+from datetime import date
+from itertools import repeat
+import ast
+import hashlib
+import operator
+import zlib
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - optional dependency
+    np = None
+
+# Evaluates an expression for one row, given the values of the row by column name
+RowFunction = Callable[[Dict[str, Any]], Any]
+# Evaluates an expression for a batch, given its columns and row count
+BatchFunction = Callable[[Dict[str, Sequence[Any]], int], Any]
+
+
+def years_between(start: Any, end: Any) -> int:
+    """
+    Count the full years between two dates, such as the age at a date.
+
+    Args:
+        start (Any): Earlier date or datetime.
+        end (Any): Later date or datetime.
+
+    Returns:
+        int: Number of anniversaries of ``start`` up to ``end``.
+    """
+    return end.year - start.year - ((end.month, end.day) < (start.month, start.day))
+
+
+def luhn_digit(value: Any) -> int:
+    """
+    Compute the Luhn check digit of a number.
+
+    Args:
+        value (Any): Digits the check digit is appended to.
+
+    Returns:
+        int: The check digit.
+    """
+    total = 0
+    for i, digit in enumerate(reversed(str(value))):
+        d = int(digit)
+        if i % 2 == 0:
+            d *= 2
+            if d > 9:
+                d -= 9
+        total += d
+    return (10 - total % 10) % 10
+
+
+def _substr(value: Any, start: int, length: Any = None) -> str:
+    value = str(value)
+    return value[start:] if length is None else value[start:start + length]
+
+
+def _coalesce(*values: Any) -> Any:
+    return next((value for value in values if value not in (None, "")), None)
+
+
+# Functions expressions can call
+FUNCTIONS: Dict[str, Callable[..., Any]] = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "len": len,
+    "abs": abs,
+    "round": round,
+    "min": min,
+    "max": max,
+    "lower": lambda value: str(value).lower(),
+    "upper": lambda value: str(value).upper(),
+    "title": lambda value: str(value).title(),
+    "strip": lambda value: str(value).strip(),
+    "replace": lambda value, old, new: str(value).replace(old, new),
+    "substr": _substr,
+    "concat": lambda *values: "".join(str(value) for value in values if value is not None),
+    "coalesce": _coalesce,
+    "year": lambda value: value.year,
+    "month": lambda value: value.month,
+    "day": lambda value: value.day,
+    "today": date.today,
+    "years_between": years_between,
+    "format_date": lambda value, date_format: value.strftime(date_format),
+    "crc32": lambda value: zlib.crc32(str(value).encode("utf8")),
+    "md5": lambda value: hashlib.md5(str(value).encode("utf8")).hexdigest(),
+    "luhn": luhn_digit,
+}
+
+# Functions applied to NumPy arrays as a whole
+VECTOR_FUNCTIONS: Dict[str, Callable[..., Any]] = {} if np is None else {
+    "abs": np.abs,
+    "min": np.minimum,
+    "max": np.maximum,
+}
+
+_BINARY_OPERATORS = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod,
+    ast.Pow: operator.pow,
+}
+
+_UNARY_OPERATORS = {
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos,
+    ast.Not: operator.not_,
+}
+
+_COMPARISONS = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b,
+}
+
+
+class _Constant:
+    """Value of a batch expression that is the same in every row."""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+def _is_array(value: Any) -> bool:
+    return np is not None and isinstance(value, np.ndarray)
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _iterate(value: Any, row_count: int) -> Any:
+    if isinstance(value, _Constant):
+        return repeat(value.value, row_count)
+    if _is_array(value):
+        # Python scalars, so that values outside NumPy keep their usual types
+        return value.tolist()
+    return value
+
+
+def _apply(function: Callable[..., Any], args: List[Any], row_count: int,
+           vector_function: Any = None) -> Any:
+    """Apply a function to batch values, as a whole when they are NumPy arrays."""
+    if all(isinstance(arg, _Constant) for arg in args):
+        return _Constant(function(*(arg.value for arg in args)))
+    if vector_function is not None and any(_is_array(arg) for arg in args) and all(
+        _is_array(arg) or (isinstance(arg, _Constant) and _is_number(arg.value)) for arg in args
+    ):
+        return vector_function(*(arg if _is_array(arg) else arg.value for arg in args))
+    return [function(*values) for values in zip(*(_iterate(arg, row_count) for arg in args))]
+
+
+def _per_row(row_function: RowFunction, names: List[str]) -> BatchFunction:
+    """Evaluate a subexpression row by row, for short-circuiting operators."""
+    def evaluate(columns: Dict[str, Sequence[Any]], row_count: int) -> Any:
+        if not names:
+            return _Constant(row_function({}))
+        values = zip(*(_iterate(columns[name], row_count) for name in names))
+        return [row_function(dict(zip(names, row))) for row in values]
+    return evaluate
+
+
+def _compile_function(function: Callable[..., Any], compiled: List[Tuple[RowFunction, BatchFunction]],
+                      vector_function: Any = None) -> Tuple[RowFunction, BatchFunction]:
+    row_functions = [row for row, _ in compiled]
+    batch_functions = [batch for _, batch in compiled]
+
+    # Most operators and functions take one or two arguments: call those directly
+    if len(row_functions) == 1:
+        first, = row_functions
+
+        def evaluate_row(row: Dict[str, Any]) -> Any:
+            return function(first(row))
+    elif len(row_functions) == 2:
+        first, second = row_functions
+
+        def evaluate_row(row: Dict[str, Any]) -> Any:
+            return function(first(row), second(row))
+    else:
+        def evaluate_row(row: Dict[str, Any]) -> Any:
+            return function(*[f(row) for f in row_functions])
+
+    def evaluate_batch(columns: Dict[str, Sequence[Any]], row_count: int) -> Any:
+        return _apply(function, [f(columns, row_count) for f in batch_functions], row_count,
+                      vector_function)
+
+    return evaluate_row, evaluate_batch
+
+
+def _compile(node: ast.AST) -> Tuple[RowFunction, BatchFunction]:
+    """
+    Compile an expression node into a row closure and a batch closure.
+
+    Raises:
+        ValueError: If the node is not allowed in expressions.
+    """
+    if isinstance(node, ast.Constant) and (node.value is None or
+                                           isinstance(node.value, (str, int, float, bool))):
+        value = node.value
+        return (lambda row: value), (lambda columns, row_count: _Constant(value))
+
+    if isinstance(node, ast.Name):
+        name = node.id
+        return (lambda row: row[name]), (lambda columns, row_count: columns[name])
+
+    if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPERATORS:
+        function = _BINARY_OPERATORS[type(node.op)]
+        return _compile_function(function, [_compile(node.left), _compile(node.right)], function)
+
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPERATORS:
+        function = _UNARY_OPERATORS[type(node.op)]
+        vector_function = None if isinstance(node.op, ast.Not) else function
+        return _compile_function(function, [_compile(node.operand)], vector_function)
+
+    if isinstance(node, ast.Compare) and len(node.ops) == 1 and type(node.ops[0]) in _COMPARISONS:
+        function = _COMPARISONS[type(node.ops[0])]
+        vector_function = None if isinstance(node.ops[0], (ast.In, ast.NotIn)) else function
+        return _compile_function(function, [_compile(node.left), _compile(node.comparators[0])],
+                                 vector_function)
+
+    if isinstance(node, ast.Subscript):
+        index = node.slice
+        if type(index).__name__ == "Index":  # Python < 3.9
+            index = index.value
+        if isinstance(index, ast.Slice):
+            bounds = [_compile(bound) if bound is not None else _compile(ast.Constant(None))
+                      for bound in (index.lower, index.upper, index.step)]
+            return _compile_function(lambda value, *args: value[slice(*args)],
+                                     [_compile(node.value)] + bounds)
+        return _compile_function(operator.getitem, [_compile(node.value), _compile(index)])
+
+    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+        name = node.func.id
+        if name not in FUNCTIONS:
+            raise ValueError(f"Unknown function '{name}' in expression")
+        if any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise ValueError("Starred arguments are not supported in expressions")
+        return _compile_function(FUNCTIONS[name], [_compile(arg) for arg in node.args],
+                                 VECTOR_FUNCTIONS.get(name))
+
+    if isinstance(node, ast.BoolOp):
+        operands = [_compile(value)[0] for value in node.values]
+        if isinstance(node.op, ast.And):
+            def evaluate_row(row: Dict[str, Any]) -> Any:
+                value = None
+                for operand in operands:
+                    value = operand(row)
+                    if not value:
+                        return value
+                return value
+        else:
+            def evaluate_row(row: Dict[str, Any]) -> Any:
+                value = None
+                for operand in operands:
+                    value = operand(row)
+                    if value:
+                        return value
+                return value
+        return evaluate_row, _per_row(evaluate_row, referenced_names(node))
+
+    if isinstance(node, ast.IfExp):
+        test, body, orelse = (_compile(part)[0] for part in (node.test, node.body, node.orelse))
+
+        def evaluate_row(row: Dict[str, Any]) -> Any:
+            return body(row) if test(row) else orelse(row)
+        return evaluate_row, _per_row(evaluate_row, referenced_names(node))
+
+    raise ValueError(f"Unsupported syntax in expression: {ast.dump(node)[:60]}")
+
+
+def referenced_names(node: ast.AST) -> List[str]:
+    """
+    Get the column names an expression node refers to.
+
+    Args:
+        node (ast.AST): Parsed expression.
+
+    Returns:
+        List[str]: Names other than function names, sorted.
+    """
+    functions = {id(call.func) for call in ast.walk(node) if isinstance(call, ast.Call)}
+    return sorted({
+        child.id for child in ast.walk(node)
+        if isinstance(child, ast.Name) and id(child) not in functions
+    })
+
+
+class Expression:
+    """An expression of a derived column, compiled once."""
+
+    def __init__(self, source: str):
+        """
+        Parse and compile an expression.
+
+        Args:
+            source (str): The expression.
+
+        Raises:
+            ValueError: If the expression is not valid or uses unsupported syntax.
+        """
+        try:
+            tree = ast.parse(source.strip(), mode="eval")
+        except SyntaxError as e:
+            raise ValueError(f"Invalid expression '{source}': {e.msg}") from None
+        self.source = source
+        self.names = referenced_names(tree.body)
+        self._evaluate_row, self._evaluate_batch = _compile(tree.body)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Compiled closures cannot be pickled; the source is compiled again instead
+        return {"source": self.source}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(state["source"])
+
+    def evaluate(self, row: Dict[str, Any]) -> Any:
+        """
+        Evaluate the expression for one row.
+
+        Args:
+            row (Dict[str, Any]): Values of the row by column name.
+
+        Returns:
+            Any: The value of the expression.
+        """
+        return self._evaluate_row(row)
+
+    def evaluate_batch(self, columns: Dict[str, Sequence[Any]], row_count: int) -> Sequence[Any]:
+        """
+        Evaluate the expression for every row of a batch.
+
+        Args:
+            columns (Dict[str, Sequence[Any]]): Values of the batch by column name.
+            row_count (int): Number of rows in the batch.
+
+        Returns:
+            Sequence[Any]: One value per row, as a NumPy array when the expression
+            was computed with NumPy.
+        """
+        values = self._evaluate_batch(columns, row_count)
+        if isinstance(values, _Constant):
+            return [values.value] * row_count
+        return values
+
+
+def dependency_order(expressions: Dict[str, Expression], names: Sequence[str]) -> List[str]:
+    """
+    Sort derived columns so that each comes after the derived columns it refers to.
+
+    Args:
+        expressions (Dict[str, Expression]): Expression of every derived column, by name.
+        names (Sequence[str]): Names of all columns.
+
+    Returns:
+        List[str]: Names of the derived columns, in evaluation order.
+
+    Raises:
+        ValueError: If an expression refers to an unknown column, or derived
+            columns refer to each other in a cycle.
+    """
+    known = set(names)
+    for name, expression in expressions.items():
+        unknown = [ref for ref in expression.names if ref not in known]
+        if unknown:
+            raise ValueError(f"Expression of '{name}' refers to unknown columns: {', '.join(unknown)}")
+
+    order: List[str] = []
+    state: Dict[str, int] = {}  # 1 while visiting, 2 once ordered
+
+    def visit(name: str, path: List[str]) -> None:
+        if state.get(name) == 2:
+            return
+        if state.get(name) == 1:
+            cycle = path[path.index(name):] + [name]
+            raise ValueError(f"Derived columns refer to each other: {' -> '.join(cycle)}")
+        state[name] = 1
+        for ref in expressions[name].names:
+            if ref in expressions:
+                visit(ref, path + [name])
+        state[name] = 2
+        order.append(name)
+
+    for name in names:
+        if name in expressions:
+            visit(name, [])
+    return order
+
+
+def to_python(values: Sequence[Any]) -> List[Any]:
+    """
+    Convert values computed by ``Expression.evaluate_batch`` to a list.
+
+    Args:
+        values (Sequence[Any]): List or NumPy array.
+
+    Returns:
+        List[Any]: The values, with NumPy scalars as Python scalars.
+    """
+    return values.tolist() if _is_array(values) else list(values)
+
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fixed-width output for Large Test Data Generator.
+
+With ``"output_format": "fixed_width"`` every column is written in a field of
+a fixed number of bytes and every record ends with a newline, so all records
+have the same size. The output file is allocated up front and row ranges are
+written at their computed offsets with ``os.pwrite``, by several worker
+processes when ``workers`` is set; no shards have to be concatenated
+afterwards, and ``read_row`` reads any record with a single positional read.
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+from datetime import datetime
+import os
+from .config import Config
+from .data_generator import (
+    CSV_BATCH_SIZE, STRING_CHARACTERS, ColumnDefinition, create_columns, get_column_names
+)
+from .logger import logger
+
+RECORD_SEPARATOR = b"\n"
+
+# Widths of columns whose values never exceed a known size
+DEFAULT_WIDTHS = {"uuid": 36, "ssn": 11, "country": 2}
+
+# Datatypes whose values are ASCII, one byte per character
+ASCII_DATATYPES = ("number", "uuid", "ssn", "country", "xdate")
+
+# Longest UTF-8 encoding of a character
+MAX_CHARACTER_BYTES = 4
+
+# Datatypes aligned to the right of their field, like numbers on mainframe feeds
+RIGHT_ALIGNED_DATATYPES = ("number",)
+
+# Prepared state of a worker process, set by _initialize_worker
+_worker = None
+
+
+def character_bytes(x: ColumnDefinition) -> int:
+    """
+    Get the number of bytes the widest character of a column takes in UTF-8.
+
+    Args:
+        x (ColumnDefinition): Column definition.
+
+    Returns:
+        int: Bytes per character: from the alphabet of ``string`` columns, 1 for
+        ASCII datatypes and the UTF-8 maximum for text read from sources.
+    """
+    if x["datatype"] == "string":
+        return max(len(c.encode("utf8")) for c in STRING_CHARACTERS)
+    if x["datatype"] in ASCII_DATATYPES:
+        return 1
+    return MAX_CHARACTER_BYTES
+
+
+def column_width(x: ColumnDefinition) -> int:
+    """
+    Get the width of a column in bytes.
+
+    Args:
+        x (ColumnDefinition): Column definition.
+
+    Returns:
+        int: ``width`` in bytes if set; otherwise ``length`` characters of the
+        widest character of the column, the largest value of a ``number``
+        column, the longest choice of a ``mychoice`` column, or the fixed size
+        of ``uuid``, ``ssn`` and ``country`` values.
+
+    Raises:
+        ValueError: If the width of the column is not known.
+    """
+    if "width" in x:
+        width = int(x["width"])
+    elif "length" in x:
+        width = int(x["length"]) * character_bytes(x)
+    elif x["datatype"] == "number":
+        width = int(x["max_range"])
+    elif x["datatype"] in DEFAULT_WIDTHS:
+        width = DEFAULT_WIDTHS[x["datatype"]]
+    elif x["datatype"] == "mychoice":
+        width = max(len(str(choice).encode("utf8")) for choice in x["choices"])
+    else:
+        raise ValueError(f"Fixed-width output needs a length or width for {x['datatype']} column "
+                         f"'{x.get('column_name', '')}'")
+    if width <= 0:
+        raise ValueError("Fixed-width column widths must be positive")
+    return width
+
+
+class FixedWidthLayout:
+    """Field widths and offsets of fixed-width records."""
+
+    def __init__(self, column_definitions: List[ColumnDefinition]):
+        """
+        Compute the layout of a list of columns.
+
+        Args:
+            column_definitions (List[ColumnDefinition]): List of column definitions, with
+                an optional ``align`` of ``left`` or ``right`` each.
+
+        Raises:
+            ValueError: If the width of a column is not known or an alignment is unsupported.
+        """
+        self.column_definitions = column_definitions
+        self.names = get_column_names(column_definitions)
+        self.widths = [column_width(x) for x in column_definitions]
+        self.right_aligned = []
+        for x in column_definitions:
+            align = x.get("align", "right" if x["datatype"] in RIGHT_ALIGNED_DATATYPES else "left")
+            if align not in ("left", "right"):
+                raise ValueError(f"Unsupported align '{align}', expected 'left' or 'right'")
+            self.right_aligned.append(align == "right")
+        self.offsets = [sum(self.widths[:i]) for i in range(len(self.widths))]
+        self.record_size = sum(self.widths) + len(RECORD_SEPARATOR)
+
+    def encode_field(self, i: int, value: Any) -> bytes:
+        """
+        Encode a value into the field of a column.
+
+        Values are rendered like CSV fields, without quotes and with None as an
+        empty field, and padded with spaces.
+
+        Args:
+            i (int): Position of the column.
+            value (Any): Value returned by ``create_columns``.
+
+        Returns:
+            bytes: The field, exactly as wide as the column.
+
+        Raises:
+            ValueError: If the value does not fit into the field.
+        """
+        x, width = self.column_definitions[i], self.widths[i]
+        if value is None:
+            return b" " * width
+        if isinstance(value, datetime):
+            value = value.strftime(x["date_format"]).upper()
+        data = str(value).encode("utf8")
+        if len(data) > width:
+            # A cut value would be a different value, e.g. a number without its last digits
+            raise ValueError(f"Value {str(value)!r} of column '{self.names[i]}' takes {len(data)} "
+                             f"bytes, more than its width of {width}")
+        return data.rjust(width) if self.right_aligned[i] else data.ljust(width)
+
+    def encode_rows(self, columns: Dict[str, Sequence[Any]]) -> bytes:
+        """
+        Encode a batch returned by ``create_columns`` as records.
+
+        Args:
+            columns (Dict[str, Sequence[Any]]): Column name to values.
+
+        Returns:
+            bytes: One record per batch row.
+        """
+        fields = [
+            [self.encode_field(i, value) for value in columns[name]]
+            for i, name in enumerate(self.names)
+        ]
+        return b"".join(b"".join(row) + RECORD_SEPARATOR for row in zip(*fields))
+
+    def decode_record(self, record: bytes) -> List[str]:
+        """
+        Split a record into its fields.
+
+        Args:
+            record (bytes): The record, with or without its separator.
+
+        Returns:
+            List[str]: One value per column, without padding.
+        """
+        return [
+            record[offset:offset + width].decode("utf8").strip()
+            for offset, width in zip(self.offsets, self.widths)
+        ]
+
+
+def _pwrite(fd: int, data: bytes, offset: int) -> None:
+    if hasattr(os, "pwrite"):
+        while data:
+            written = os.pwrite(fd, data, offset)
+            data, offset = data[written:], offset + written
+    else:  # pragma: no cover - Windows
+        os.lseek(fd, offset, os.SEEK_SET)
+        os.write(fd, data)
+
+
+def _pread(fd: int, size: int, offset: int) -> bytes:
+    if hasattr(os, "pread"):
+        return os.pread(fd, size, offset)
+    os.lseek(fd, offset, os.SEEK_SET)  # pragma: no cover - Windows
+    return os.read(fd, size)
+
+
+def allocate(filename: str, size: int) -> None:
+    """
+    Create the output file with its final size.
+
+    Args:
+        filename (str): Path of the file.
+        size (int): Size in bytes.
+    """
+    fd = os.open(filename, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o666)
+    try:
+        os.ftruncate(fd, size)
+        if size and hasattr(os, "posix_fallocate"):
+            try:
+                # Reserve the blocks, so a full disk fails now instead of halfway through
+                os.posix_fallocate(fd, 0, size)
+            except OSError:
+                pass
+    finally:
+        os.close(fd)
+
+
+def write_range(filename: str, layout: FixedWidthLayout, config: Config, state: Any,
+                start: int, stop: int) -> int:
+    """
+    Generate rows ``start`` to ``stop`` and write them at their offsets.
+
+    Args:
+        filename (str): Path of the allocated output file.
+        layout (FixedWidthLayout): Layout of the records.
+        config (Config): Configuration of the run.
+        state (RunState): Prepared columns and reference data.
+        start (int): Index of the first row.
+        stop (int): Index after the last row.
+
+    Returns:
+        int: Number of rows written.
+    """
+    seed = config.get_seed()
+    fd = os.open(filename, os.O_WRONLY)
+    try:
+        for batch_start in range(start, stop, CSV_BATCH_SIZE):
+            batch = create_columns(
+                state.columns, min(CSV_BATCH_SIZE, stop - batch_start), state.country_array,
+                state.phone_array, state.my_file, seed=seed, start_index=batch_start,
+            )
+            _pwrite(fd, layout.encode_rows(batch), batch_start * layout.record_size)
+    finally:
+        os.close(fd)
+    return stop - start
+
+
+def _initialize_worker(parameters: Dict[str, Any], country_array: List[str],
+                       phone_array: List[Dict[str, Any]]) -> None:
+    global _worker
+    from .warm_start import prepare_run
+    config = Config.from_dict(parameters)
+    state = prepare_run(config, country_array, phone_array)
+    _worker = (config, state, FixedWidthLayout(state.columns))
+
+
+def _write_worker_range(filename: str, start: int, stop: int) -> int:
+    config, state, layout = _worker
+    return write_range(filename, layout, config, state, start, stop)
+
+
+def split_rows(row_count: int, workers: int) -> List[Tuple[int, int]]:
+    """
+    Split the rows of a run into ranges for worker processes.
+
+    Ranges are a few per worker, so that workers finishing early pick up
+    the remaining ones, and whole batches where possible.
+
+    Args:
+        row_count (int): Number of rows.
+        workers (int): Number of worker processes.
+
+    Returns:
+        List[Tuple[int, int]]: Start and stop of every range.
+    """
+    size = max(CSV_BATCH_SIZE, -(-row_count // (workers * 4)))
+    size = -(-size // CSV_BATCH_SIZE) * CSV_BATCH_SIZE
+    return [(start, min(start + size, row_count)) for start in range(0, row_count, size)]
+
+
+def write_fixed_width(config: Config, state: Any, workers: Optional[int] = None) -> int:
+    """
+    Write the output of a run as fixed-width records.
+
+    Args:
+        config (Config): Configuration of the run.
+        state (RunState): Prepared columns and reference data.
+        workers (Optional[int]): Worker processes, ``workers`` from the configuration by default.
+
+    Returns:
+        int: Size of a record in bytes.
+
+    Raises:
+        ValueError: If a column has no known width, or several workers are
+            asked for in an unseeded run.
+    """
+    filename = config.get_output_filename()
+    row_count = config.get_row_count()
+    workers = config.get_workers() if workers is None else workers
+    layout = FixedWidthLayout(state.columns)
+    if workers > 1 and config.get_seed() is None:
+        # Workers would draw unique values from their own copy of the pools
+        raise ValueError("Fixed-width output with several workers requires a seed")
+    if workers > 1 and not hasattr(os, "pwrite"):  # pragma: no cover - Windows
+        logger.warning("Positional writes are not available; writing with a single process")
+        workers = 1
+
+    allocate(filename, row_count * layout.record_size)
+    logger.info(f"Writing {row_count} records of {layout.record_size} bytes with {workers} worker(s)")
+    if workers <= 1:
+        write_range(filename, layout, config, state, 0, row_count)
+        return layout.record_size
+
+    ranges = split_rows(row_count, workers)
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(ranges)), initializer=_initialize_worker,
+        initargs=(config.config, state.country_array, state.phone_array),
+    ) as executor:
+        futures = [executor.submit(_write_worker_range, filename, start, stop)
+                   for start, stop in ranges]
+        written = 0
+        for future in futures:
+            written += future.result()
+            logger.info(f"Written {written} rows...")
+    return layout.record_size
+
+
+def read_row(filename: str, index: int, layout: FixedWidthLayout) -> List[str]:
+    """
+    Read a single record of a fixed-width file.
+
+    Args:
+        filename (str): Path of the file.
+        index (int): Index of the row.
+        layout (FixedWidthLayout): Layout the file was written with.
+
+    Returns:
+        List[str]: One value per column, without padding.
+
+    Raises:
+        IndexError: If the file has no such row.
+    """
+    fd = os.open(filename, os.O_RDONLY)
+    try:
+        record = _pread(fd, layout.record_size, index * layout.record_size) if index >= 0 else b""
+    finally:
+        os.close(fd)
+    if len(record) != layout.record_size:
+        raise IndexError(f"Row {index} is not in '{filename}'")
+    return layout.decode_record(record)
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar Parquet output for Large Test Data Generator.
+
+Rows are generated one row group at a time and handed to Arrow column by
+column, so peak memory is bounded by a single row group.
+"""
+from typing import Dict, List, Any, Optional
+from .data_generator import INT64_DIGITS, ColumnDefinition, create_columns, get_column_names
+from .logger import logger
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+# Datatypes with a small set of repeating values are dictionary-encoded
+DICTIONARY_DATATYPES = ("country", "mychoice")
+
+# Digits of the largest Arrow decimal, used for numbers beyond int64
+DECIMAL128_DIGITS = 38
+
+
+def require_pyarrow() -> None:
+    """
+    Ensure that pyarrow is available.
+
+    Raises:
+        ImportError: If pyarrow is not installed.
+    """
+    if pa is None:
+        raise ImportError(
+            "Parquet output requires pyarrow. Install it with 'pip install pyarrow'."
+        )
+
+
+def arrow_type(x: ColumnDefinition) -> "pa.DataType":
+    """
+    Get the Arrow type used for a column.
+
+    Args:
+        x (ColumnDefinition): Column definition.
+
+    Returns:
+        pa.DataType: Arrow type of the column.
+
+    Raises:
+        ValueError: If the values of the column have no Arrow type.
+    """
+    require_pyarrow()
+    if x["datatype"] == "number":
+        return number_type(x)
+    if x.get("field_type") == "integer":
+        return pa.int64()
+    if x.get("field_type") == "float":
+        return pa.float64()
+    if x["datatype"] == "xdate":
+        return pa.timestamp("us")
+    if x["datatype"] == "mychoice":
+        return pa.dictionary(pa.int32(), choice_type(x))
+    if x["datatype"] in DICTIONARY_DATATYPES:
+        return pa.dictionary(pa.int32(), pa.string())
+    return pa.string()
+
+
+def number_type(x: ColumnDefinition) -> "pa.DataType":
+    """
+    Get the Arrow type of a ``number`` column.
+
+    Args:
+        x (ColumnDefinition): Column definition.
+
+    Returns:
+        pa.DataType: ``int64`` for up to 18 digits, otherwise a decimal with
+        ``max_range`` digits.
+
+    Raises:
+        ValueError: If the values have more digits than an Arrow decimal.
+    """
+    digits = int(x["max_range"])
+    if digits <= INT64_DIGITS:
+        return pa.int64()
+    if digits <= DECIMAL128_DIGITS:
+        return pa.decimal128(digits, 0)
+    raise ValueError(f"Number column '{x.get('column_name', '')}' has up to {digits} digits; "
+                     f"Parquet output supports at most {DECIMAL128_DIGITS}")
+
+
+def choice_type(x: ColumnDefinition) -> "pa.DataType":
+    """
+    Get the Arrow type of the choices of a ``mychoice`` column.
+
+    Args:
+        x (ColumnDefinition): Column definition.
+
+    Returns:
+        pa.DataType: Type shared by all choices, e.g. ``int64`` for integers.
+
+    Raises:
+        ValueError: If the choices do not share a type.
+    """
+    try:
+        value_type = pa.array(x["choices"]).type
+    except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+        raise ValueError(f"Choices of column '{x.get('column_name', '')}' mix types: {e}") from e
+    return pa.string() if pa.types.is_null(value_type) else value_type
+
+
+def arrow_schema(column_definitions: List[ColumnDefinition]) -> "pa.Schema":
+    """
+    Build the Arrow schema for a list of column definitions.
+
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+
+    Returns:
+        pa.Schema: Arrow schema with one field per column.
+    """
+    require_pyarrow()
+    names = get_column_names(column_definitions)
+    return pa.schema([
+        pa.field(name, arrow_type(x)) for name, x in zip(names, column_definitions)
+    ])
+
+
+def to_record_batch(columns: Dict[str, List[Any]], schema: "pa.Schema") -> "pa.RecordBatch":
+    """
+    Convert a columnar batch into an Arrow record batch.
+
+    Args:
+        columns (Dict[str, List[Any]]): Column name to list of values.
+        schema (pa.Schema): Schema of the batch.
+
+    Returns:
+        pa.RecordBatch: The record batch.
+    """
+    require_pyarrow()
+    arrays = [
+        pa.array(columns[field.name], type=field.type) for field in schema
+    ]
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+
+def write_parquet(filename: str, column_definitions: List[ColumnDefinition], row_count: int,
+                  country_array: List[str], phone_array: List[Dict[str, Any]],
+                  my_file: Dict[str, Any], row_group_size: int = 100000,
+                  compression: Optional[str] = "snappy", seed: Optional[int] = None) -> None:
+    """
+    Generate rows and stream them into a Parquet file one row group at a time.
+
+    Args:
+        filename (str): Path of the Parquet file to write.
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        row_count (int): Number of rows to generate.
+        country_array (List[str]): List of country codes.
+        phone_array (List[Dict[str, Any]]): List of phone information.
+        my_file (Dict[str, Any]): Dictionary storing various data.
+        row_group_size (int): Number of rows per row group.
+        compression (Optional[str]): Parquet compression codec.
+        seed (Optional[int]): Seed of the run, or None for an unseeded run.
+    """
+    require_pyarrow()
+    if row_group_size <= 0:
+        raise ValueError("row_group_size must be a positive integer")
+
+    schema = arrow_schema(column_definitions)
+    logger.info(
+        f"Writing {row_count} rows to Parquet file '{filename}' "
+        f"(row group size {row_group_size}, compression {compression})"
+    )
+
+    with pq.ParquetWriter(filename, schema, compression=compression) as writer:
+        written = 0
+        while written < row_count:
+            size = min(row_group_size, row_count - written)
+            columns = create_columns(column_definitions, size, country_array, phone_array,
+                                     my_file, seed=seed, start_index=written)
+            writer.write_batch(to_record_batch(columns, schema), row_group_size=size)
+            written += size
+            logger.info(f"Generated {written} rows...")
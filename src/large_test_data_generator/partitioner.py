@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Partitioned output for Large Test Data Generator.
+
+Rows are split over several files, rolling over to a new file after a number
+of rows or bytes, and optionally grouped into Hive-style directories by the
+value of one column (``country=CH/part-0001.csv``). A manifest listing every
+file with its row count and checksum is written when the output is closed.
+"""
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional
+import hashlib
+import json
+import os
+from .data_generator import (
+    CSV_BATCH_SIZE, ColumnDefinition, create_columns, format_rows, get_column_names
+)
+from .logger import logger
+
+MANIFEST_FILENAME = "manifest.json"
+
+
+class PartFile:
+    """A single output file of a partition."""
+
+    def __init__(self, path: str, partition: Optional[str]):
+        """
+        Initialize the part file.
+
+        Args:
+            path (str): Path of the file.
+            partition (Optional[str]): Partition value the file belongs to.
+        """
+        self.path = path
+        self.partition = partition
+        self.rows = 0
+        self.bytes = 0
+        self.checksum = hashlib.sha256()
+
+    def to_manifest(self, directory: str) -> Dict[str, Any]:
+        """
+        Describe the file for the manifest.
+
+        Args:
+            directory (str): Output directory the path is made relative to.
+
+        Returns:
+            Dict[str, Any]: Manifest entry of the file.
+        """
+        return {
+            "path": os.path.relpath(self.path, directory),
+            "partition": self.partition,
+            "rows": self.rows,
+            "bytes": self.bytes,
+            "sha256": self.checksum.hexdigest(),
+        }
+
+
+class OutputPartitioner:
+    """Write rows to a bounded number of open, rolling part files."""
+
+    def __init__(self, directory: str, extension: str = ".csv", max_rows: Optional[int] = None,
+                 max_bytes: Optional[int] = None, partition_column: Optional[str] = None,
+                 max_open_files: int = 16, buffer_size: int = 1024 * 1024):
+        """
+        Initialize the partitioner.
+
+        Args:
+            directory (str): Output directory.
+            extension (str): File extension of the part files.
+            max_rows (Optional[int]): Roll over to a new file after this many rows.
+            max_bytes (Optional[int]): Roll over to a new file after this many bytes.
+            partition_column (Optional[str]): Column whose value selects the partition.
+            max_open_files (int): Maximum number of files kept open at the same time.
+            buffer_size (int): Write buffer size of each open file.
+        """
+        if max_open_files < 1:
+            raise ValueError("max_open_files must be at least 1")
+        self.directory = directory
+        self.extension = extension
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.partition_column = partition_column
+        self.max_open_files = max_open_files
+        self.buffer_size = buffer_size
+        self.files: List[PartFile] = []
+        self._current: Dict[Optional[str], PartFile] = {}
+        self._counters: Dict[Optional[str], int] = {}
+        self._handles: "OrderedDict[str, Any]" = OrderedDict()
+        os.makedirs(directory, exist_ok=True)
+
+    def _partition_directory(self, partition: Optional[str]) -> str:
+        if partition is None:
+            return self.directory
+        value = partition.replace(os.sep, "_").replace("=", "_") or "__empty__"
+        return os.path.join(self.directory, f"{self.partition_column}={value}")
+
+    def _new_part(self, partition: Optional[str]) -> PartFile:
+        number = self._counters.get(partition, 0) + 1
+        self._counters[partition] = number
+        directory = self._partition_directory(partition)
+        os.makedirs(directory, exist_ok=True)
+        part = PartFile(os.path.join(directory, f"part-{number:04d}{self.extension}"), partition)
+        self.files.append(part)
+        self._current[partition] = part
+        return part
+
+    def _close_handle(self, path: str) -> None:
+        handle = self._handles.pop(path, None)
+        if handle is not None:
+            handle.close()
+
+    def _handle(self, part: PartFile) -> Any:
+        handle = self._handles.get(part.path)
+        if handle is not None:
+            self._handles.move_to_end(part.path)
+            return handle
+        while len(self._handles) >= self.max_open_files:
+            self._close_handle(next(iter(self._handles)))
+        # Reopening a file evicted earlier appends to what is already there
+        handle = open(part.path, "ab" if part.rows else "wb", buffering=self.buffer_size)
+        self._handles[part.path] = handle
+        return handle
+
+    def write(self, row: str, partition: Optional[str] = None) -> None:
+        """
+        Write a single row.
+
+        Args:
+            row (str): Row without trailing newline.
+            partition (Optional[str]): Partition value of the row.
+        """
+        data = (row + "\n").encode("utf8")
+        part = self._current.get(partition)
+        if part is None:
+            part = self._new_part(partition)
+        elif part.rows and ((self.max_rows and part.rows >= self.max_rows) or
+                            (self.max_bytes and part.bytes + len(data) > self.max_bytes)):
+            self._close_handle(part.path)
+            part = self._new_part(partition)
+
+        self._handle(part).write(data)
+        part.checksum.update(data)
+        part.rows += 1
+        part.bytes += len(data)
+
+    def close(self) -> Dict[str, Any]:
+        """
+        Close all files and write the manifest.
+
+        Returns:
+            Dict[str, Any]: The manifest.
+        """
+        self.abort()
+        manifest = {
+            "partition_column": self.partition_column,
+            "total_rows": sum(part.rows for part in self.files),
+            "files": [part.to_manifest(self.directory) for part in self.files],
+        }
+        with open(os.path.join(self.directory, MANIFEST_FILENAME), "w", encoding="utf8") as f:
+            json.dump(manifest, f, indent=2)
+        logger.info(f"Wrote {len(self.files)} files to '{self.directory}'")
+        return manifest
+
+    def abort(self) -> None:
+        """Close all files without writing a manifest."""
+        for path in list(self._handles):
+            self._close_handle(path)
+
+
+def write_partitioned(filename: str, partitioning: Dict[str, Any],
+                      column_definitions: List[ColumnDefinition], separator: str,
+                      row_count: int, country_array: List[str],
+                      phone_array: List[Dict[str, Any]], my_file: Dict[str, Any],
+                      seed: Optional[int] = None, start_index: int = 0) -> Dict[str, Any]:
+    """
+    Generate rows and write them into partitioned files.
+
+    The ``partitioning`` options are ``directory`` (defaults to ``filename``
+    without its extension), ``max_rows``, ``max_bytes``, ``column`` and
+    ``max_open_files``.
+
+    Args:
+        filename (str): Output filename from the configuration.
+        partitioning (Dict[str, Any]): Partitioning options.
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        separator (str): Separator between values.
+        row_count (int): Number of rows to generate.
+        country_array (List[str]): List of country codes.
+        phone_array (List[Dict[str, Any]]): List of phone information.
+        my_file (Dict[str, Any]): Dictionary storing various data.
+        seed (Optional[int]): Seed of the run, or None for an unseeded run.
+        start_index (int): Row index of the first row in a seeded run.
+
+    Returns:
+        Dict[str, Any]: The manifest.
+    """
+    stem, extension = os.path.splitext(filename)
+    partition_column = partitioning.get("column")
+    if partition_column is not None and partition_column not in get_column_names(column_definitions):
+        raise ValueError(f"Partition column '{partition_column}' is not defined")
+
+    partitioner = OutputPartitioner(
+        partitioning.get("directory", stem),
+        extension=extension or ".csv",
+        max_rows=partitioning.get("max_rows"),
+        max_bytes=partitioning.get("max_bytes"),
+        partition_column=partition_column,
+        max_open_files=partitioning.get("max_open_files", 16),
+    )
+
+    logger.info(f"Generating {row_count} rows of data into '{partitioner.directory}'")
+    try:
+        for start in range(0, row_count, CSV_BATCH_SIZE):
+            if start > 0:
+                logger.info(f"Generated {start} rows...")
+            batch = create_columns(column_definitions, min(CSV_BATCH_SIZE, row_count - start),
+                                   country_array, phone_array, my_file, seed=seed,
+                                   start_index=start_index + start)
+            partitions = batch[partition_column] if partition_column is not None else None
+            for i, row in enumerate(format_rows(column_definitions, batch, separator)):
+                partitioner.write(row, None if partitions is None else str(partitions[i]))
+    except Exception:
+        partitioner.abort()
+        raise
+    return partitioner.close()
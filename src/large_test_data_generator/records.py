@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Column groups for Large Test Data Generator.
+
+An ``address``, ``mongo_address`` or ``creditcard`` column with a ``field``
+outputs a single field of its source record: a column of the address file, a
+key of the MongoDB address document, or a key of the credit card BIN record
+(``number`` for the generated card number). Columns with the same ``group``
+share one sampled record per row, so street, city and postcode belong to the
+same address.
+
+Address files are parsed once when they are loaded and kept column by column:
+the header under ``("address", country)`` and the values of every field under
+``("address", country, field)``. A record is then just a row number, and each
+grouped column reads its field at that row.
+"""
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+import csv
+import io
+from .cache import store_source
+
+# Datatypes whose columns can output a field of their source record
+GROUP_DATATYPES = ("address", "mongo_address", "creditcard")
+
+# Conversions of field values, selected by ``field_type``
+FIELD_TYPES = {"string": str, "integer": int, "float": float}
+
+# Options every column of a credit card group must agree on
+CREDITCARD_OPTIONS = ("country", "bank_name", "card_type")
+
+
+def address_path(country: str) -> str:
+    """
+    Get the path of the address file of a country.
+
+    Args:
+        country (str): Country code.
+
+    Returns:
+        str: Path of the file.
+    """
+    return f"input/{country}.csv"
+
+
+def parse_records(lines: Sequence[str]) -> Tuple[List[str], Dict[str, List[str]]]:
+    """
+    Parse CSV lines with a header into columns.
+
+    Args:
+        lines (Sequence[str]): Lines of the file, starting with the header.
+
+    Returns:
+        Tuple[List[str], Dict[str, List[str]]]: Field names and the values of every field.
+    """
+    reader = csv.reader(lines)
+    fields = next(reader, [])
+    rows = [row for row in reader if row]
+    columns = {field: [row[i] if i < len(row) else "" for row in rows]
+               for i, field in enumerate(fields)}
+    return fields, columns
+
+
+def read_address_sources(country: str) -> List[Tuple[Any, List[str]]]:
+    """
+    Read the address file of a country as reference sources.
+
+    Args:
+        country (str): Country code.
+
+    Returns:
+        List[Tuple[Any, List[str]]]: Source keys and values: the header, then one
+        source per field.
+    """
+    with open(address_path(country), encoding="utf8", newline="") as f:
+        fields, columns = parse_records(f)
+    key = ("address", country)
+    return [(key, fields)] + [(key + (field,), columns[field]) for field in fields]
+
+
+def _load_addresses(country: str, my_file: Dict[str, Any]) -> Dict[Any, List[str]]:
+    sources = read_address_sources(country)
+    for key, values in sources:
+        store_source(my_file, key, values)
+    # Returned as well, as storing a large file may already have evicted parts of it
+    return dict(sources)
+
+
+def address_fields(country: str, my_file: Dict[str, Any]) -> Sequence[str]:
+    """
+    Get the field names of the address file of a country.
+
+    Args:
+        country (str): Country code.
+        my_file (Dict[str, Any]): Dictionary storing file contents.
+
+    Returns:
+        Sequence[str]: Field names, from the header of the file.
+    """
+    key = ("address", country)
+    if key in my_file:
+        return my_file[key]
+    return _load_addresses(country, my_file)[key]
+
+
+def address_column(country: str, field: str, my_file: Dict[str, Any]) -> Sequence[str]:
+    """
+    Get the values of one field of the address file of a country.
+
+    Args:
+        country (str): Country code.
+        field (str): Field name.
+        my_file (Dict[str, Any]): Dictionary storing file contents.
+
+    Returns:
+        Sequence[str]: The value of the field in every record.
+
+    Raises:
+        ValueError: If the file has no such field.
+    """
+    key = ("address", country, field)
+    if key in my_file:
+        return my_file[key]
+    if field not in address_fields(country, my_file):
+        raise ValueError(f"Address file of '{country}' has no field '{field}'")
+    return _load_addresses(country, my_file)[key]
+
+
+def sample_address(country: str, my_file: Dict[str, Any], rng: Any) -> Optional[int]:
+    """
+    Pick a record of the address file of a country.
+
+    Args:
+        country (str): Country code.
+        my_file (Dict[str, Any]): Dictionary storing file contents.
+        rng (Any): Random number generator.
+
+    Returns:
+        Optional[int]: Row number of the record, or None if the file has no records.
+    """
+    fields = address_fields(country, my_file)
+    if not fields:
+        return None
+    count = len(address_column(country, fields[0], my_file))
+    return rng.randrange(count) if count else None
+
+
+def address_line(country: str, index: int, my_file: Dict[str, Any]) -> str:
+    """
+    Rebuild the CSV line of an address record.
+
+    Args:
+        country (str): Country code.
+        index (int): Row number of the record.
+        my_file (Dict[str, Any]): Dictionary storing file contents.
+
+    Returns:
+        str: The record as a line of the address file.
+    """
+    line = io.StringIO()
+    csv.writer(line, lineterminator="").writerow(
+        address_column(country, field, my_file)[index] for field in address_fields(country, my_file)
+    )
+    return line.getvalue()
+
+
+def convert_field(value: Any, field_type: Optional[str]) -> Any:
+    """
+    Convert a field value to the type of its column.
+
+    Args:
+        value (Any): Value of the field.
+        field_type (Optional[str]): ``string``, ``integer`` or ``float``, or None to keep the value.
+
+    Returns:
+        Any: The converted value; empty or unparseable numbers become None.
+    """
+    if field_type is None or value is None:
+        return value
+    if field_type == "string":
+        return str(value)
+    try:
+        return FIELD_TYPES[field_type](value)
+    except (TypeError, ValueError):
+        return None
+
+
+def validate_groups(column_definitions: List[Dict[str, Any]]) -> None:
+    """
+    Check that column groups are consistent.
+
+    Args:
+        column_definitions (List[Dict[str, Any]]): List of column definitions.
+
+    Raises:
+        ValueError: If a grouped column has a datatype without records, the
+            columns of a group disagree on their source, or a field type is unknown.
+    """
+    groups: Dict[str, Dict[str, Any]] = {}
+    for x in column_definitions:
+        if x.get("field_type") is not None and x["field_type"] not in FIELD_TYPES:
+            raise ValueError(f"Unsupported field_type '{x['field_type']}', "
+                             f"expected one of {tuple(FIELD_TYPES)}")
+        if "group" not in x:
+            continue
+        if x["datatype"] not in GROUP_DATATYPES:
+            raise ValueError(f"Datatype '{x['datatype']}' does not support column groups")
+        first = groups.setdefault(x["group"], x)
+        if x["datatype"] != first["datatype"]:
+            raise ValueError(f"Columns of group '{x['group']}' must have the same datatype")
+        if x["datatype"] == "creditcard" and any(
+            x.get(option) != first.get(option) for option in CREDITCARD_OPTIONS
+        ):
+            raise ValueError(f"Columns of group '{x['group']}' must use the same card source")
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Deterministic seeding for Large Test Data Generator.
+
+When a parameter file sets a ``seed``, every row is generated with its own
+random number generator derived from the seed and the row index. Any row can
+then be regenerated on its own, without generating or reading the rows
+before it.
+
+Row generators are counter-based (splitmix64) rather than Mersenne Twisters,
+whose 2.5 KB state would have to be initialized again for every row.
+"""
+from functools import lru_cache
+from math import gcd
+from typing import Any, Optional, Tuple
+import hashlib
+import random
+
+MASK64 = (1 << 64) - 1
+
+_Random = random.Random
+
+
+def _splitmix64(x: int) -> int:
+    x = (x + 0x9E3779B97F4A7C15) & MASK64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+    return x ^ (x >> 31)
+
+
+def mix_seed(*parts: int) -> int:
+    """
+    Combine integers into a single well-mixed 64-bit seed.
+
+    Args:
+        *parts (int): Seed, row index and stream identifiers.
+
+    Returns:
+        int: The combined seed.
+    """
+    h = 0
+    for part in parts:
+        h = _splitmix64(h ^ (part & MASK64))
+    return h
+
+
+def stream_id(name: str) -> int:
+    """
+    Get a stable stream identifier for a name.
+
+    Unlike ``hash``, the result does not change between interpreter runs.
+
+    Args:
+        name (str): Name of the stream, e.g. a column name.
+
+    Returns:
+        int: 64-bit identifier of the stream.
+    """
+    return int.from_bytes(hashlib.blake2b(name.encode("utf8"), digest_size=8).digest(), "big")
+
+
+class RowRandom:
+    """
+    Counter-based random number generator with the ``random.Random`` interface.
+
+    Every draw is the splitmix64 hash of a 64-bit counter advanced by a constant, so
+    creating a generator costs no more than storing its seed. The sampling
+    methods are those of ``random.Random``, which only rely on ``random``,
+    ``getrandbits`` and ``_randbelow``.
+    """
+
+    __slots__ = ("_state", "gauss_next")
+
+    def __init__(self, seed: int):
+        """
+        Initialize the generator.
+
+        Args:
+            seed (int): 64-bit seed, usually from ``mix_seed``.
+        """
+        self._state = seed & MASK64
+        self.gauss_next = None
+
+    def _next(self) -> int:
+        x = self._state = (self._state + 0x9E3779B97F4A7C15) & MASK64
+        x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+        x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & MASK64
+        return x ^ (x >> 31)
+
+    def _randbelow(self, n: int) -> int:
+        # Multiply-shift instead of rejection sampling; the bias is below n / 2**64
+        return (self._next() * n) >> 64
+
+    def randrange(self, start: int, stop: Optional[int] = None, step: int = 1) -> int:
+        """
+        Get a random integer from ``range(start, stop, step)``.
+
+        Args:
+            start (int): Start of the range, or its end if ``stop`` is omitted.
+            stop (Optional[int]): End of the range (exclusive).
+            step (int): Step of the range.
+
+        Returns:
+            int: The random integer.
+        """
+        if stop is None:
+            start, stop = 0, start
+        if step == 1 and stop > start:
+            return start + self._randbelow(stop - start)
+        return _Random.randrange(self, start, stop, step)
+
+    def random(self) -> float:
+        """
+        Get the next float in ``[0.0, 1.0)``.
+
+        Returns:
+            float: 53 random bits as a float.
+        """
+        return (self._next() >> 11) * (1.0 / 9007199254740992.0)
+
+    def getrandbits(self, k: int) -> int:
+        """
+        Get an integer with ``k`` random bits.
+
+        Args:
+            k (int): Number of bits.
+
+        Returns:
+            int: The random integer.
+        """
+        if k <= 64:
+            return self._next() >> (64 - k)
+        value = 0
+        for _ in range((k + 63) // 64):
+            value = (value << 64) | self._next()
+        return value >> (-k % 64)
+
+    # Borrowed from random.Random; within the class body ``random`` is the method above
+    randint = _Random.randint
+    choice = _Random.choice
+    choices = _Random.choices
+    shuffle = _Random.shuffle
+    sample = _Random.sample
+    uniform = _Random.uniform
+    gauss = _Random.gauss
+    normalvariate = _Random.normalvariate
+    lognormvariate = _Random.lognormvariate
+    expovariate = _Random.expovariate
+
+
+@lru_cache(maxsize=16)
+def _seed_hash(seed: int) -> int:
+    return _splitmix64(seed & MASK64)
+
+
+def row_rng(seed: Optional[int], row_index: int, *streams: int) -> Any:
+    """
+    Get the random number generator of a row.
+
+    Args:
+        seed (Optional[int]): Seed of the run, or None for an unseeded run.
+        row_index (int): Index of the row.
+        *streams (int): Additional identifiers for independent streams of the row.
+
+    Returns:
+        Any: A ``RowRandom`` for seeded runs, the ``random`` module otherwise.
+    """
+    if seed is None:
+        return random
+    # Same as mix_seed(seed, row_index, *streams), with the seed part computed once
+    h = _splitmix64(_seed_hash(seed) ^ (row_index & MASK64))
+    for stream in streams:
+        h = _splitmix64(h ^ (stream & MASK64))
+    return RowRandom(h)
+
+
+@lru_cache(maxsize=128)
+def _permutation(size: int, seed: int) -> Tuple[int, int]:
+    a = mix_seed(seed, 1) % size or 1
+    while gcd(a, size) != 1:
+        a += 1
+    return a, mix_seed(seed, 2) % size
+
+
+def permute_index(index: int, size: int, seed: int) -> int:
+    """
+    Map an index onto a seeded permutation of ``0..size-1``.
+
+    Distinct indices below ``size`` always map to distinct positions.
+
+    Args:
+        index (int): Index to map.
+        size (int): Size of the permuted range.
+        seed (int): Seed selecting the permutation.
+
+    Returns:
+        int: Position of the index in the permutation.
+    """
+    a, b = _permutation(size, seed)
+    return (a * index + b) % size
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Hot-key and duplicate injection for Large Test Data Generator.
+
+A ``skew`` object on a ``unique_values``, ``file``, ``mychoice`` or ``uuid``
+column makes a fraction of the rows reuse a small table of hot keys, and
+another fraction repeat a recently generated value. Both tables are fixed in
+size, so the overhead is constant per row.
+
+In seeded runs the hot keys are drawn with their own generator, so every
+process builds the same table. Recent duplicates depend on the rows generated
+before and are therefore not available in seeded runs.
+"""
+from typing import Dict, List, Any, Callable, Optional
+import random
+
+# Datatypes that accept a skew specification
+SKEW_DATATYPES = ("unique_values", "file", "mychoice", "uuid")
+
+
+class SkewInjector:
+    """Replace generated values by hot keys or recent duplicates."""
+
+    def __init__(self, spec: Dict[str, Any], seed: Optional[int] = None):
+        """
+        Initialize the injector.
+
+        Args:
+            spec (Dict[str, Any]): The ``skew`` object of a column definition with
+                ``hot_keys`` (number of hot keys), ``hot_fraction`` (fraction of rows
+                using a hot key), ``duplicate_rate`` (fraction of rows repeating a
+                recent value) and ``duplicate_window`` (number of recent values kept).
+            seed (Optional[int]): Seed of the hot-key table in a seeded run.
+        """
+        self.hot_keys = int(spec.get("hot_keys", 0))
+        self.hot_fraction = float(spec.get("hot_fraction", 0.0))
+        self.duplicate_rate = float(spec.get("duplicate_rate", 0.0))
+        self.duplicate_window = int(spec.get("duplicate_window", 1024))
+        if self.hot_fraction and self.hot_keys < 1:
+            raise ValueError("hot_fraction requires at least one hot key")
+        if not 0.0 <= self.hot_fraction + self.duplicate_rate <= 1.0:
+            raise ValueError("hot_fraction and duplicate_rate must add up to at most 1")
+        if self.duplicate_rate and self.duplicate_window < 1:
+            raise ValueError("duplicate_rate requires a positive duplicate_window")
+        if self.duplicate_rate and seed is not None:
+            raise ValueError("duplicate_rate cannot be combined with a seed")
+        self.seed = seed
+        self.hot_table: List[Any] = []
+        self.recent: List[Any] = []
+        self._built = False
+        self._next = 0
+
+    def build_hot_table(self, generate: Callable[[Any], Any], rng: Any = random) -> None:
+        """
+        Draw the hot keys from the column source.
+
+        Args:
+            generate (Callable[[Any], Any]): Generates a regular value of the column
+                with the given random number generator.
+            rng (Any): Random number generator, replaced by a seeded one in seeded runs.
+        """
+        if self.seed is not None:
+            rng = random.Random(self.seed)
+        self.hot_table = [value for value in (generate(rng) for _ in range(self.hot_keys))
+                          if value is not None]
+        self._built = True
+
+    def apply(self, generate: Callable[[Any], Any], rng: Any = random) -> Any:
+        """
+        Get the next value of the column.
+
+        Args:
+            generate (Callable[[Any], Any]): Generates a regular value of the column
+                with the given random number generator.
+            rng (Any): Random number generator of the row.
+
+        Returns:
+            Any: A hot key, a recent duplicate or a regular value.
+        """
+        r = rng.random()
+        if r < self.hot_fraction:
+            if not self._built:
+                self.build_hot_table(generate, rng)
+            if self.hot_table:
+                return self.hot_table[int(rng.random() * len(self.hot_table))]
+        elif r < self.hot_fraction + self.duplicate_rate and self.recent:
+            return self.recent[int(rng.random() * len(self.recent))]
+
+        value = generate(rng)
+        if self.duplicate_rate and value is not None:
+            if len(self.recent) < self.duplicate_window:
+                self.recent.append(value)
+            else:
+                self.recent[self._next] = value
+                self._next = (self._next + 1) % self.duplicate_window
+        return value
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Continuous streaming producer for Large Test Data Generator.
+
+Rows are generated in batches with the same column generators as the CSV
+writer and written to stdout, a named pipe or a TCP socket at a target rate. A token
+bucket paces the producer, and a background thread writes batches from a
+bounded queue, so generation does not wait on I/O and the backlog can never
+grow beyond a few batches.
+"""
+from typing import Dict, List, Any, BinaryIO, Callable, Optional
+import logging
+import queue
+import socket
+import sys
+import threading
+import time
+from .data_generator import ColumnDefinition, create_columns, format_rows
+from .warm_start import prepare_run
+from .logger import logger
+
+# Number of batches that may wait for the writer thread
+QUEUE_BATCHES = 8
+
+
+class TokenBucket:
+    """Token bucket rate limiter."""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        Initialize the rate limiter.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (Optional[float]): Maximum burst size, one second of tokens by default.
+            clock (Callable[[], float]): Monotonic clock.
+            sleep (Callable[[float], None]): Sleep function.
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity is not None else max(self.rate, 1.0)
+        self.tokens = 0.0
+        self.clock = clock
+        self.sleep = sleep
+        self.last = clock()
+
+    def acquire(self, n: int) -> None:
+        """
+        Wait until ``n`` tokens are available and take them.
+
+        Requests larger than the capacity are granted once the bucket is full
+        and leave the bucket in debt, which later requests pay back.
+
+        Args:
+            n (int): Number of tokens.
+        """
+        need = min(float(n), self.capacity)
+        self._refill()
+        if self.tokens < need:
+            self.sleep((need - self.tokens) / self.rate)
+            self._refill()
+            # The sleep covered the deficit, even if rounding left the clock a hair short
+            self.tokens = max(self.tokens, need)
+        self.tokens -= n
+
+    def _refill(self) -> None:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.last) * self.rate)
+        self.last = now
+
+
+class BatchWriter:
+    """Write batches to a sink from a background thread."""
+
+    def __init__(self, sink: BinaryIO, max_batches: int = QUEUE_BATCHES):
+        """
+        Initialize the writer and start its thread.
+
+        Args:
+            sink (BinaryIO): Binary stream to write to.
+            max_batches (int): Number of batches that may wait to be written.
+        """
+        self.sink = sink
+        self.error: Optional[BaseException] = None
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=max_batches)
+        self._thread = threading.Thread(target=self._run, name="stream-writer", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            if self.error is not None:
+                continue
+            try:
+                self.sink.write(data)
+                self.sink.flush()
+            except BaseException as e:  # reported to the producer on its next submit
+                self.error = e
+
+    def pending(self) -> int:
+        """
+        Get the number of batches waiting to be written.
+
+        Returns:
+            int: Queue depth.
+        """
+        return self._queue.qsize()
+
+    def submit(self, data: bytes) -> None:
+        """
+        Queue a batch, waiting only if the queue is full.
+
+        Args:
+            data (bytes): Encoded rows.
+
+        Raises:
+            BaseException: The error that stopped the writer thread.
+        """
+        if self.error is not None:
+            raise self.error
+        self._queue.put(data)
+
+    def close(self) -> None:
+        """
+        Write the remaining batches and stop the thread.
+
+        Raises:
+            BaseException: The error that stopped the writer thread.
+        """
+        self._queue.put(None)
+        self._thread.join()
+        if self.error is not None:
+            raise self.error
+
+
+class StreamMetrics:
+    """Throughput and lag of a stream."""
+
+    def __init__(self, rate: Optional[float], report_interval: float = 10.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize the metrics.
+
+        Args:
+            rate (Optional[float]): Target rows per second, or None for unlimited.
+            report_interval (float): Seconds between two reports.
+            clock (Callable[[], float]): Monotonic clock.
+        """
+        self.rate = rate
+        self.report_interval = report_interval
+        self.clock = clock
+        self.start = clock()
+        self.rows = 0
+        self.bytes = 0
+        self._last_report = self.start
+        self._last_rows = 0
+
+    def lag(self) -> float:
+        """
+        Get the number of rows the stream is behind its target rate.
+
+        Returns:
+            float: Rows behind schedule, 0 when on schedule or unlimited.
+        """
+        if not self.rate:
+            return 0.0
+        return max(0.0, (self.clock() - self.start) * self.rate - self.rows)
+
+    def record(self, rows: int, size: int, pending: int = 0) -> None:
+        """
+        Record a written batch and report if the report interval has passed.
+
+        Args:
+            rows (int): Rows in the batch.
+            size (int): Bytes in the batch.
+            pending (int): Batches waiting to be written.
+        """
+        self.rows += rows
+        self.bytes += size
+        now = self.clock()
+        if now - self._last_report >= self.report_interval:
+            current = (self.rows - self._last_rows) / (now - self._last_report)
+            logger.info(
+                f"Streamed {self.rows} rows ({self.bytes} bytes): {current:.0f} rows/s, "
+                f"lag {self.lag():.0f} rows, {pending} batches pending"
+            )
+            self._last_report = now
+            self._last_rows = self.rows
+
+
+def open_sink(output: str) -> BinaryIO:
+    """
+    Open the output of a stream.
+
+    Args:
+        output (str): ``-`` for stdout, ``tcp://host:port`` for a TCP socket, or
+            the path of a named pipe or file.
+
+    Returns:
+        BinaryIO: Binary stream to write to.
+    """
+    if output == "-":
+        return sys.stdout.buffer
+    if output.startswith("tcp://"):
+        host, _, port = output[len("tcp://"):].rpartition(":")
+        connection = socket.create_connection((host or "localhost", int(port)))
+        sink = connection.makefile("wb")
+        # The socket is closed once the file returned for it is closed
+        connection.close()
+        return sink
+    return open(output, "wb")
+
+
+def stream_rows(column_definitions: List[ColumnDefinition], separator: str,
+                country_array: List[str], phone_array: List[Dict[str, Any]],
+                my_file: Dict[str, Any], sink: BinaryIO, rate: Optional[float] = None,
+                row_limit: Optional[int] = None, batch_size: int = 1000,
+                seed: Optional[int] = None, report_interval: float = 10.0) -> StreamMetrics:
+    """
+    Stream rows to a sink at a target rate.
+
+    Args:
+        column_definitions (List[ColumnDefinition]): Prepared column definitions.
+        separator (str): Separator between values.
+        country_array (List[str]): List of country codes.
+        phone_array (List[Dict[str, Any]]): List of phone information.
+        my_file (Dict[str, Any]): Dictionary storing various data.
+        sink (BinaryIO): Binary stream to write to.
+        rate (Optional[float]): Target rows per second, or None for unlimited.
+        row_limit (Optional[int]): Number of rows to stream, or None to stream forever.
+        batch_size (int): Maximum rows per write.
+        seed (Optional[int]): Seed of the run, or None for an unseeded run.
+        report_interval (float): Seconds between two metric reports.
+
+    Returns:
+        StreamMetrics: Metrics of the stream.
+    """
+    bucket = None
+    if rate:
+        bucket = TokenBucket(rate)
+        # About ten writes per second keep the output smooth at low rates
+        batch_size = max(1, min(batch_size, int(rate / 10)))
+    metrics = StreamMetrics(rate, report_interval)
+    writer = BatchWriter(sink)
+
+    row_index = 0
+    try:
+        while row_limit is None or row_index < row_limit:
+            n = batch_size if row_limit is None else min(batch_size, row_limit - row_index)
+            if bucket is not None:
+                bucket.acquire(n)
+            batch = create_columns(column_definitions, n, country_array, phone_array, my_file,
+                                   seed=seed, start_index=row_index)
+            rows = format_rows(column_definitions, batch, separator)
+            data = ("\n".join(rows) + "\n").encode("utf8")
+            writer.submit(data)
+            row_index += n
+            metrics.record(n, len(data), writer.pending())
+    finally:
+        writer.close()
+    return metrics
+
+
+def stream_data(parameter_file: str, output: str = "-", rate: Optional[float] = None,
+                forever: bool = False, batch_size: int = 1000,
+                report_interval: float = 10.0) -> None:
+    """
+    Stream rows described by a parameter file.
+
+    Args:
+        parameter_file (str): Path to the parameter JSON file.
+        output (str): ``-`` for stdout, ``tcp://host:port`` or a path.
+        rate (Optional[float]): Target rows per second, or None for unlimited.
+        forever (bool): Ignore ``number_of_rows`` and stream until interrupted.
+        batch_size (int): Maximum rows per write.
+        report_interval (float): Seconds between two metric reports.
+    """
+    from .config import load_config
+
+    if output == "-":
+        # Keep log messages out of the data stream
+        for handler in logger.handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+                handler.setStream(sys.stderr)
+
+    config = load_config(parameter_file)
+    seed = config.get_seed()
+    columns, country_array, phone_array, my_file = prepare_run(config)
+    row_limit = None if forever else config.get_row_count()
+
+    logger.info(
+        f"Streaming {'unlimited' if row_limit is None else row_limit} rows to '{output}' "
+        f"at {f'{rate:g} rows/s' if rate else 'full speed'}"
+    )
+    sink = open_sink(output)
+    try:
+        metrics = stream_rows(
+            columns, config.get_separator(), country_array, phone_array, my_file, sink,
+            rate=rate, row_limit=row_limit, batch_size=batch_size, seed=seed,
+            report_interval=report_interval,
+        )
+    finally:
+        if sink is not sys.stdout.buffer:
+            sink.close()
+    elapsed = max(time.monotonic() - metrics.start, 1e-9)
+    logger.info(f"Streamed {metrics.rows} rows in {elapsed:.1f}s ({metrics.rows / elapsed:.0f} rows/s)")
+    my_file.log_stats()
@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+UUID generation for Large Test Data Generator.
+
+Unseeded ``uuid`` columns are generated a batch at a time: the random bytes of
+the whole batch are read from ``os.urandom`` at once, the version and variant
+bits are set with a translation table and the hex digits are laid out into
+the dashed form with slice assignments, without creating ``uuid.UUID`` objects.
+
+Version 7 UUIDs (RFC 9562) start with a 48-bit Unix timestamp in milliseconds
+followed by a 12-bit sequence, so they sort in generation order and are
+appended at the end of B-tree indexes instead of splitting pages all over
+them. In seeded runs the timestamp and sequence are derived from the row index
+and the random bits from the row generator, so every row can be regenerated.
+"""
+from typing import List, Any, Optional
+from datetime import datetime, timezone
+import os
+import random
+import threading
+import time
+
+# Supported values of the ``version`` option of uuid columns
+UUID_VERSIONS = (4, 7)
+
+# Timestamp of the first row of seeded version 7 columns without ``from_date``
+DEFAULT_START_MS = int(datetime(2020, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+
+# Translation tables setting the version nibble and the RFC 4122 variant bits of a byte
+_VERSION_4 = bytes((b & 0x0F) | 0x40 for b in range(256))
+_VARIANT = bytes((b & 0x3F) | 0x80 for b in range(256))
+
+# Bytes 6 and 7 of a version 7 UUID for every 12-bit sequence number
+_SEQUENCE_HIGH = bytes(0x70 | (s >> 8) for s in range(4096))
+_SEQUENCE_LOW = bytes(s & 0xFF for s in range(4096))
+
+# Positions of the hex digits in the dashed form
+_DIGIT_POSITIONS = [p for p in range(36) if p not in (8, 13, 18, 23)]
+
+# Size of the buffer single UUIDs take their random bytes from
+_POOL_SIZE = 16 * 4096
+
+
+class _RandomPool(threading.local):
+    """Random bytes read from the OS in blocks, for UUIDs generated one at a time."""
+
+    def __init__(self):
+        self.buffer = b""
+        self.offset = 0
+
+    def take(self, size: int) -> bytes:
+        if self.offset + size > len(self.buffer):
+            self.buffer = os.urandom(max(_POOL_SIZE, size))
+            self.offset = 0
+        data = self.buffer[self.offset:self.offset + size]
+        self.offset += size
+        return data
+
+
+_pool = _RandomPool()
+_v7_lock = threading.Lock()
+_v7_last = 0
+
+
+def _reset_after_fork() -> None:
+    # A forked worker must not reuse the random bytes buffered by its parent
+    _pool.buffer = b""
+    _pool.offset = 0
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_after_fork)
+
+
+def format_uuids(data: bytes) -> List[str]:
+    """
+    Format consecutive 16-byte UUIDs in their dashed hex form.
+
+    Args:
+        data (bytes): The UUIDs, 16 bytes each.
+
+    Returns:
+        List[str]: One string per UUID.
+    """
+    count = len(data) // 16
+    digits = data.hex().encode("ascii")
+    out = bytearray(b"-" * (37 * count))
+    out[36::37] = b"\n" * count
+    for digit, position in enumerate(_DIGIT_POSITIONS):
+        out[position::37] = digits[digit::32]
+    values = out.decode("ascii").split("\n")
+    values.pop()
+    return values
+
+
+def format_uuid(value: int) -> str:
+    """
+    Format a 128-bit integer as a UUID string.
+
+    Args:
+        value (int): The UUID as an integer.
+
+    Returns:
+        str: The UUID in its dashed hex form.
+    """
+    h = f"{value:032x}"
+    return f"{h[:8]}-{h[8:12]}-{h[12:16]}-{h[16:20]}-{h[20:]}"
+
+
+def uuid4_strings(count: int) -> List[str]:
+    """
+    Generate random version 4 UUIDs.
+
+    Args:
+        count (int): Number of UUIDs.
+
+    Returns:
+        List[str]: The UUIDs.
+    """
+    data = bytearray(os.urandom(16 * count) if count > 1 else _pool.take(16 * count))
+    data[6::16] = data[6::16].translate(_VERSION_4)
+    data[8::16] = data[8::16].translate(_VARIANT)
+    return format_uuids(data)
+
+
+def _next_v7_counters(count: int) -> int:
+    """Reserve ``count`` consecutive timestamp and sequence values, returning the first."""
+    global _v7_last
+    with _v7_lock:
+        first = max((time.time_ns() // 1000000) << 12, _v7_last + 1)
+        _v7_last = first + count - 1
+    return first
+
+
+def uuid7_strings(count: int) -> List[str]:
+    """
+    Generate time-ordered version 7 UUIDs.
+
+    Within a process every UUID sorts after the ones generated before it: when
+    more than 4096 UUIDs are generated in a millisecond, the timestamp runs ahead
+    of the clock until it catches up.
+
+    Args:
+        count (int): Number of UUIDs.
+
+    Returns:
+        List[str]: The UUIDs.
+    """
+    data = bytearray(os.urandom(16 * count) if count > 1 else _pool.take(16 * count))
+    counter = _next_v7_counters(count)
+    row = 0
+    while row < count:
+        millis, sequence = divmod(counter, 4096)
+        size = min(4096 - sequence, count - row)
+        start, stop = 16 * row, 16 * (row + size)
+        for i, byte in enumerate(millis.to_bytes(6, "big")):
+            data[start + i:stop:16] = bytes((byte,)) * size
+        data[start + 6:stop:16] = _SEQUENCE_HIGH[sequence:sequence + size]
+        data[start + 7:stop:16] = _SEQUENCE_LOW[sequence:sequence + size]
+        row += size
+        counter += size
+    data[8::16] = data[8::16].translate(_VARIANT)
+    return format_uuids(data)
+
+
+class UuidGenerator:
+    """Generate the values of a ``uuid`` column."""
+
+    def __init__(self, version: int = 4, start_ms: Optional[int] = None):
+        """
+        Initialize the generator.
+
+        Args:
+            version (int): UUID version, 4 (random) or 7 (time-ordered).
+            start_ms (Optional[int]): Timestamp in milliseconds of row 0 of a seeded
+                version 7 column.
+
+        Raises:
+            ValueError: If the version is not supported.
+        """
+        if version not in UUID_VERSIONS:
+            raise ValueError(f"Unsupported UUID version {version}, expected one of {UUID_VERSIONS}")
+        self.version = version
+        self.start_ms = DEFAULT_START_MS if start_ms is None else start_ms
+
+    def generate(self, rng: Any = random, row_index: Optional[int] = None) -> str:
+        """
+        Generate a single UUID.
+
+        Args:
+            rng (Any): Random number generator of the row; the ``random`` module
+                in unseeded runs.
+            row_index (Optional[int]): Index of the row in a seeded run.
+
+        Returns:
+            str: The UUID.
+        """
+        if rng is random:
+            return self.generate_many(1)[0]
+        if self.version == 4:
+            value = rng.getrandbits(128) & ~(0xF << 76) & ~(0x3 << 62)
+            return format_uuid(value | (4 << 76) | (2 << 62))
+        # Seeded rows advance the sequence by one per row index, so values sort by row
+        if row_index is None:
+            counter = (self.start_ms << 12) | rng.getrandbits(12)
+        else:
+            counter = (self.start_ms << 12) + row_index
+        high = ((counter >> 12) << 16) | 0x7000 | (counter & 0xFFF)
+        return format_uuid((high << 64) | (2 << 62) | rng.getrandbits(62))
+
+    def generate_many(self, count: int) -> List[str]:
+        """
+        Generate UUIDs for an unseeded batch.
+
+        Args:
+            count (int): Number of UUIDs.
+
+        Returns:
+            List[str]: The UUIDs.
+        """
+        if self.version == 7:
+            return uuid7_strings(count)
+        return uuid4_strings(count)
@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Warm-start cache for Large Test Data Generator.
+
+Preparing a run compiles the column definitions and loads reference data:
+the country and phone lists from MongoDB, the files of ``file`` and
+``unique_values`` columns and the address file of every country. With a
+``warm_cache_dir`` in the parameter file, the result is stored in a directory
+keyed by a hash of the column definitions, the seed and the size and
+modification time of every source file. The next run with the same inputs
+loads the compiled columns from a pickle and memory-maps the reference lists
+instead of reading, deduplicating and sorting them again. Any change to an
+input produces a different key, so stale entries are never used.
+
+Data read from MongoDB cannot be checked for changes and is reloaded once an
+entry is older than ``warm_cache_max_age`` seconds.
+"""
+from collections.abc import Sequence
+from typing import Dict, List, Any, NamedTuple, Optional, Tuple
+import glob
+import hashlib
+import json
+import mmap
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import time
+from .data_generator import (
+    ColumnDefinition, initialize_country_list, initialize_list, initialize_phone_list,
+    prepare_columns
+)
+from .cache import ReferenceCache, store_source
+from .records import address_path, read_address_sources
+from .logger import logger
+
+# Bumped whenever the layout of an entry or of the compiled columns changes
+CACHE_VERSION = 4
+PLAN_FILENAME = "plan.pickle"
+ADDRESS_PATTERN = "input/*.csv"
+
+
+class RunState(NamedTuple):
+    """Everything a run needs before generating rows."""
+    columns: List[ColumnDefinition]
+    country_array: List[str]
+    phone_array: List[Dict[str, Any]]
+    my_file: ReferenceCache
+
+
+class MappedStrings(Sequence):
+    """
+    Read-only list of strings backed by a memory-mapped file.
+
+    The file holds the number of strings, their start offsets and the UTF-8
+    encoded strings, each followed by a newline, so any string is decoded on
+    access without loading the others and the whole list in one go.
+    """
+
+    def __init__(self, path: str):
+        """
+        Map a file written by ``write_strings``.
+
+        Args:
+            path (str): Path of the file.
+        """
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        (self._count,) = struct.unpack_from("Q", self._map, 0)
+        self._offsets = memoryview(self._map)[8:8 * (self._count + 2)].cast("Q")
+        self._data = 8 * (self._count + 2)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def nbytes(self) -> int:
+        """Size of the mapped file in bytes."""
+        return len(self._map)
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("MappedStrings index out of range")
+        start = self._data + self._offsets[index]
+        end = self._data + self._offsets[index + 1] - 1
+        return self._map[start:end].decode("utf8")
+
+    def tolist(self) -> List[str]:
+        """
+        Decode all strings at once.
+
+        Returns:
+            List[str]: The strings.
+        """
+        if self._count == 0:
+            return []
+        return self._map[self._data:].decode("utf8").split("\n")[:-1]
+
+
+def write_strings(path: str, values: List[str]) -> None:
+    """
+    Write strings in the format read by ``MappedStrings``.
+
+    Args:
+        path (str): Path of the file.
+        values (List[str]): Strings without newlines, such as the lines of a file.
+    """
+    encoded = [value.encode("utf8") + b"\n" for value in values]
+    if any(value.count(b"\n") > 1 for value in encoded):
+        raise ValueError("Mapped strings cannot contain newlines")
+    offsets = [0]
+    for value in encoded:
+        offsets.append(offsets[-1] + len(value))
+    with open(path, "wb") as f:
+        f.write(struct.pack("Q", len(encoded)))
+        f.write(struct.pack(f"{len(offsets)}Q", *offsets))
+        f.writelines(encoded)
+
+
+def source_files(column_definitions: List[ColumnDefinition]) -> List[str]:
+    """
+    Get the files the reference data of a run is read from.
+
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+
+    Returns:
+        List[str]: Sorted paths of list files, histograms and address files.
+    """
+    paths = set()
+    for x in column_definitions:
+        if x["datatype"] in ("file", "unique_values"):
+            paths.add(x["file_path"])
+        if "file_path" in x.get("distribution", {}):
+            paths.add(x["distribution"]["file_path"])
+        if x["datatype"] == "address":
+            paths.update(glob.glob(ADDRESS_PATTERN))
+    return sorted(paths)
+
+
+def cache_key(column_definitions: List[ColumnDefinition], seed: Optional[int],
+              country_array: Optional[List[str]] = None,
+              phone_array: Optional[List[Dict[str, Any]]] = None) -> str:
+    """
+    Hash the inputs a prepared run depends on.
+
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        seed (Optional[int]): Seed of the run.
+        country_array (Optional[List[str]]): Country codes given instead of MongoDB.
+        phone_array (Optional[List[Dict[str, Any]]]): Phone information given instead of MongoDB.
+
+    Returns:
+        str: Hexadecimal key of the cache entry.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(
+        {"version": CACHE_VERSION, "columns": column_definitions, "seed": seed,
+         "countries": country_array, "phones": phone_array},
+        sort_keys=True, default=str,
+    ).encode("utf8"))
+    for path in source_files(column_definitions):
+        try:
+            stat = os.stat(path)
+            digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\0".encode("utf8"))
+        except OSError:
+            digest.update(f"{path}\0missing\0".encode("utf8"))
+    return digest.hexdigest()[:32]
+
+
+def build_sources(column_definitions: List[ColumnDefinition], seed: Optional[int],
+                  country_array: List[str]) -> List[Tuple[Any, List[str], bool]]:
+    """
+    Load the reference lists of a run the way the column generators would.
+
+    Args:
+        column_definitions (List[ColumnDefinition]): List of column definitions.
+        seed (Optional[int]): Seed of the run.
+        country_array (List[str]): List of country codes.
+
+    Returns:
+        List[Tuple[Any, List[str], bool]]: Source key, values and whether the
+        values are consumed while generating (unseeded ``unique_values`` pools).
+    """
+    sources = {}
+    for x in column_definitions:
+        datatype = x["datatype"]
+        if datatype in ("file", "unique_values") and os.path.exists(x["file_path"]):
+            consumed = datatype == "unique_values" and seed is None
+            if x["file_path"] in sources:
+                _, values, already_consumed = sources[x["file_path"]]
+                sources[x["file_path"]] = (x["file_path"], values, consumed or already_consumed)
+            else:
+                sources[x["file_path"]] = (x["file_path"], initialize_list(x["file_path"]), consumed)
+        elif datatype == "address":
+            for country in sorted(set(country_array)):
+                if ("address", country) not in sources and os.path.exists(address_path(country)):
+                    for key, values in read_address_sources(country):
+                        sources[key] = (key, values, False)
+    return list(sources.values())
+
+
+class WarmCache:
+    """A directory of prepared runs, one entry per cache key."""
+
+    def __init__(self, directory: str, max_age: Optional[float] = 86400.0):
+        """
+        Initialize the cache.
+
+        Args:
+            directory (str): Cache directory, created when needed.
+            max_age (Optional[float]): Seconds after which an entry is rebuilt to pick
+                up changes in MongoDB, or None to keep entries forever.
+        """
+        self.directory = directory
+        self.max_age = max_age
+
+    def entry(self, key: str) -> str:
+        """
+        Get the directory of an entry.
+
+        Args:
+            key (str): Cache key.
+
+        Returns:
+            str: Path of the entry.
+        """
+        return os.path.join(self.directory, key)
+
+    def load(self, key: str, my_file: ReferenceCache) -> Optional[RunState]:
+        """
+        Load a prepared run and map its reference lists into ``my_file``.
+
+        Args:
+            key (str): Cache key.
+            my_file (ReferenceCache): Cache the reference lists are stored in.
+
+        Returns:
+            Optional[RunState]: The prepared run, or None if there is no usable entry.
+        """
+        path = os.path.join(self.entry(key), PLAN_FILENAME)
+        try:
+            with open(path, "rb") as f:
+                plan = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable warm cache entry '{self.entry(key)}': {e}")
+            return None
+        if self.max_age is not None and time.time() - plan["created"] > self.max_age:
+            logger.info(f"Warm cache entry '{self.entry(key)}' is older than {self.max_age:g}s")
+            return None
+
+        for source_key, filename, consumed in plan["sources"]:
+            values = MappedStrings(os.path.join(self.entry(key), filename))
+            if consumed:
+                # Pools shrink as values are used, so they need their own copy
+                store_source(my_file, source_key, values.tolist(), reloadable=False)
+            else:
+                store_source(my_file, source_key, values)
+        return RunState(plan["columns"], plan["country_array"], plan["phone_array"], my_file)
+
+    def save(self, key: str, columns: List[ColumnDefinition], country_array: List[str],
+             phone_array: List[Dict[str, Any]],
+             sources: List[Tuple[Any, List[str], bool]]) -> None:
+        """
+        Store a prepared run.
+
+        The entry is written to a temporary directory and renamed into place,
+        so concurrent runs never see a partial entry.
+
+        Args:
+            key (str): Cache key.
+            columns (List[ColumnDefinition]): Prepared column definitions.
+            country_array (List[str]): List of country codes.
+            phone_array (List[Dict[str, Any]]): List of phone information.
+            sources (List[Tuple[Any, List[str], bool]]): Reference lists from ``build_sources``.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix=f".{key}-", dir=self.directory)
+        try:
+            entries = []
+            for i, (source_key, values, consumed) in enumerate(sources):
+                filename = f"source-{i:04d}.bin"
+                write_strings(os.path.join(staging, filename), values)
+                entries.append((source_key, filename, consumed))
+            plan = {
+                "created": time.time(),
+                "columns": columns,
+                "country_array": country_array,
+                "phone_array": phone_array,
+                "sources": entries,
+            }
+            with open(os.path.join(staging, PLAN_FILENAME), "wb") as f:
+                pickle.dump(plan, f, protocol=pickle.HIGHEST_PROTOCOL)
+            if os.path.exists(self.entry(key)):
+                # Expired entry; runs that still map its files keep their mappings
+                shutil.rmtree(self.entry(key), ignore_errors=True)
+            self.prune()
+            try:
+                os.rename(staging, self.entry(key))
+            except OSError:
+                if not os.path.isdir(self.entry(key)):
+                    raise
+                # A concurrent run stored the same entry first
+                shutil.rmtree(staging, ignore_errors=True)
+        except (OSError, pickle.PicklingError, AttributeError, TypeError) as e:
+            # The run goes on without a cache entry, as if the cache were cold
+            logger.warning(f"Could not write warm cache entry '{self.entry(key)}': {e}")
+            shutil.rmtree(staging, ignore_errors=True)
+
+    def prune(self) -> None:
+        """Remove entries older than the maximum age, left behind when inputs changed."""
+        if self.max_age is None:
+            return
+        now = time.time()
+        for entry in os.scandir(self.directory):
+            if entry.name.startswith(".") or not entry.is_dir():
+                continue
+            try:
+                expired = now - os.stat(os.path.join(entry.path, PLAN_FILENAME)).st_mtime > self.max_age
+            except OSError:
+                continue
+            if expired:
+                logger.debug(f"Removing expired warm cache entry '{entry.path}'")
+                shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def prepare_run(config: Any, country_array: Optional[List[str]] = None,
+                phone_array: Optional[List[Dict[str, Any]]] = None) -> RunState:
+    """
+    Compile the columns and load the reference data of a run.
+
+    Uses the warm-start cache when the configuration sets ``warm_cache_dir``.
+
+    Args:
+        config (Config): Configuration of the run.
+        country_array (Optional[List[str]]): Country codes to use instead of MongoDB.
+        phone_array (Optional[List[Dict[str, Any]]]): Phone information to use instead of MongoDB.
+
+    Returns:
+        RunState: Compiled columns, reference lists and the reference cache.
+    """
+    seed = config.get_seed()
+    definitions = config.get_column_definitions()
+    my_file = ReferenceCache(config.get_cache_memory_budget())
+    directory = config.get_warm_cache_dir()
+
+    state = None
+    if directory is not None:
+        cache = WarmCache(directory, config.get_warm_cache_max_age())
+        key = cache_key(definitions, seed, country_array, phone_array)
+        start = time.monotonic()
+        state = cache.load(key, my_file)
+        if state is not None:
+            logger.info(f"Loaded warm cache entry {key} in {time.monotonic() - start:.3f}s")
+
+    if state is None:
+        columns = prepare_columns(definitions, seed)
+        countries = initialize_country_list() if country_array is None else country_array
+        phones = initialize_phone_list() if phone_array is None else phone_array
+        if directory is None:
+            state = RunState(columns, countries, phones, my_file)
+        else:
+            cache.save(key, columns, countries, phones, build_sources(definitions, seed, countries))
+            state = cache.load(key, my_file) or RunState(columns, countries, phones, my_file)
+            logger.info(f"Stored warm cache entry {key} in '{directory}'")
+
+    logger.info(f"Initialized country list with {len(state.country_array)} entries")
+    logger.info(f"Initialized phone list with {len(state.phone_array)} entries")
+    return state
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the in-process Python API.
+"""
+import unittest
+import json
+import os
+import tempfile
+from src.large_test_data_generator.api import iter_batches
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+
+CONFIG = {
+    "number_of_rows": 25,
+    "columns": [
+        {"column_name": "vote", "datatype": "mychoice", "choices": ["YES", "NO"]},
+        {"column_name": "savings", "datatype": "number", "min_range": "1", "max_range": "3"},
+        {"column_name": "birth", "datatype": "xdate", "from_date": "01.01.2000",
+         "until_date": "31.12.2000", "date_format": "%d.%m.%Y"},
+    ],
+}
+
+
+def batches(config=CONFIG, **kwargs):
+    return list(iter_batches(config, country_array=["CH"], phone_array=[], **kwargs))
+
+
+class TestIterBatches(unittest.TestCase):
+    """Test case for in-memory batches."""
+
+    def test_lists(self):
+        """Batches of lists cover number_of_rows."""
+        result = batches(batch_size=10)
+
+        self.assertEqual([len(b["vote"]) for b in result], [10, 10, 5])
+        self.assertTrue(all(isinstance(v, int) for b in result for v in b["savings"]))
+
+    def test_seeded_batches_are_reproducible(self):
+        """Seeded configurations yield the same batches independently of the batch size."""
+        config = dict(CONFIG, seed=5)
+        small = batches(config, batch_size=7)
+        large = batches(config, batch_size=100)
+
+        self.assertEqual(sum((b["savings"] for b in small), []), large[0]["savings"])
+
+    def test_parameter_file(self):
+        """A parameter file can be used instead of a dictionary."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "parameters.json")
+            with open(path, "w", encoding="utf8") as f:
+                json.dump(dict(CONFIG, filename="unused.csv", separator=","), f)
+            result = batches(path, row_count=3)
+
+        self.assertIn(result[0]["vote"][0], ("YES", "NO"))
+        self.assertEqual(len(result[0]["vote"]), 3)
+
+    def test_unknown_format(self):
+        """Unsupported formats are rejected."""
+        with self.assertRaises(ValueError):
+            batches(batch_format="xml")
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy(self):
+        """NumPy batches use typed arrays for numbers and dates."""
+        result = batches(batch_format="numpy")[0]
+
+        self.assertEqual(result["savings"].dtype, np.int64)
+        self.assertEqual(result["birth"].dtype, np.dtype("datetime64[us]"))
+        self.assertEqual(result["vote"].dtype, object)
+
+    @unittest.skipIf(np is None, "numpy is not installed")
+    def test_numpy_wide_numbers(self):
+        """Numbers beyond int64 are kept as Python integers."""
+        config = {"number_of_rows": 5, "columns": [
+            {"column_name": "account", "datatype": "number", "min_range": "19", "max_range": "20"},
+        ]}
+        result = batches(config, batch_format="numpy")[0]
+
+        self.assertEqual(result["account"].dtype, object)
+        self.assertTrue(all(10**19 <= v < 10**20 for v in result["account"]))
+
+    @unittest.skipIf(pd is None, "pandas is not installed")
+    def test_pandas(self):
+        """DataFrame batches have one column per definition."""
+        result = batches(batch_format="pandas")[0]
+
+        self.assertEqual(list(result.columns), ["vote", "savings", "birth"])
+        self.assertEqual(len(result), 25)
+
+    @unittest.skipIf(pa is None, "pyarrow is not installed")
+    def test_arrow(self):
+        """Arrow batches follow the Parquet schema."""
+        result = batches(batch_format="arrow", batch_size=20)
+
+        self.assertEqual([b.num_rows for b in result], [20, 5])
+        self.assertEqual(result[0].schema.field("savings").type, pa.int64())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the reference data cache.
+"""
+import unittest
+import os
+import sys
+import tempfile
+from src.large_test_data_generator.cache import PIN_AFTER_RELOADS, ReferenceCache, estimate_size
+from src.large_test_data_generator.data_generator import (
+    get_any_item_from_list, get_item_from_list
+)
+from src.large_test_data_generator.warm_start import MappedStrings, write_strings
+
+
+class TestReferenceCache(unittest.TestCase):
+    """Test case for the reference data cache."""
+
+    def test_evicts_least_recently_used(self):
+        """Reloadable sources are evicted in LRU order once over budget."""
+        values = ["x" * 100] * 10
+        cache = ReferenceCache(memory_budget=int(estimate_size(values) * 2.5))
+        cache["a"] = list(values)
+        cache["b"] = list(values)
+        self.assertIn("a", cache)
+        cache["c"] = list(values)
+
+        self.assertEqual(sorted(cache), ["a", "c"])
+        self.assertEqual(cache.evictions, 1)
+        self.assertLessEqual(cache.total_size, cache.memory_budget)
+
+    def test_pinned_sources_are_not_evicted(self):
+        """Sources that cannot be reloaded stay in the cache."""
+        cache = ReferenceCache(memory_budget=1)
+        cache.set("pool", ["a", "b"], reloadable=False)
+        cache["other"] = ["c"]
+        cache["third"] = ["d"]
+
+        self.assertIn("pool", cache)
+        self.assertNotIn("other", cache)
+        self.assertEqual(cache.evictions, 1)
+
+    def test_counts_hits_and_misses(self):
+        """Lookups are counted as hits or misses."""
+        cache = ReferenceCache()
+        self.assertNotIn("a", cache)
+        cache["a"] = []
+        self.assertIn("a", cache)
+
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.source_sizes()["a"], estimate_size([]))
+
+    def test_reloads_evicted_file_source(self):
+        """An evicted file source is loaded again while a unique pool is kept."""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = []
+            for name in ("pool", "first", "second"):
+                paths.append(os.path.join(tmp, f"{name}.txt"))
+                with open(paths[-1], "w", encoding="utf8") as f:
+                    f.write("one\ntwo\nthree\n")
+            pool, first, second = paths
+
+            cache = ReferenceCache(memory_budget=1)
+            self.assertIsNotNone(get_item_from_list(pool, cache))
+            get_any_item_from_list(first, cache)
+            get_any_item_from_list(second, cache)
+            self.assertEqual(sorted(cache), [pool, second])
+
+            self.assertIn(get_any_item_from_list(first, cache), ["one", "two", "three"])
+            self.assertEqual(len(cache[pool]), 2)
+            self.assertEqual(cache.evictions, 2)
+            self.assertEqual(cache.reloads, 1)
+
+    def test_thrashing_sources_are_pinned(self):
+        """Sources reloaded again and again are pinned instead of evicted, with a warning each."""
+        values = ["x" * 100] * 10
+        cache = ReferenceCache(memory_budget=int(estimate_size(values) * 1.5))
+        with self.assertLogs("large_test_data_generator", level="DEBUG") as logs:
+            for _ in range(5):
+                cache["a"] = list(values)
+                cache["b"] = list(values)
+
+        self.assertEqual(cache.reloads, 2 * PIN_AFTER_RELOADS)
+        self.assertEqual(cache.reloaded_bytes, 2 * PIN_AFTER_RELOADS * estimate_size(values))
+        self.assertEqual(sorted(cache), ["a", "b"])
+        warnings = [r.getMessage() for r in logs.records if r.levelname == "WARNING"]
+        self.assertEqual(len([w for w in warnings if "reloaded" in w]), 2)
+        self.assertEqual(len([w for w in warnings if "cannot be evicted" in w]), 1)
+        self.assertFalse([r for r in logs.records if r.levelname == "INFO"])
+
+    def test_mapped_strings_size(self):
+        """Memory-mapped string lists are sized by their mapping."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "values.bin")
+            write_strings(path, ["x" * 100] * 50)
+            strings = MappedStrings(path)
+
+            self.assertGreater(estimate_size(strings), 5000)
+            self.assertEqual(estimate_size(strings), sys.getsizeof(strings) + os.path.getsize(path))
+
+if __name__ == "__main__":
+    unittest.main()
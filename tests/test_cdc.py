@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for seeded generation and change-data-capture streams.
+"""
+import unittest
+import os
+import tempfile
+from src.large_test_data_generator.cdc import ChangeStream, write_changes, INSERT, UPDATE, DELETE
+from src.large_test_data_generator.data_generator import (
+    create_columns, create_row, generate_row_values, prepare_columns
+)
+from src.large_test_data_generator.seeding import permute_index, row_rng
+
+SEED = 1234
+COUNTRIES = ["CH", "US", "DE"]
+
+
+def make_columns(path):
+    return prepare_columns([
+        {"column_name": "id", "datatype": "unique_values", "file_path": path},
+        {"column_name": "ref", "datatype": "uuid"},
+        {"column_name": "domicile", "datatype": "country"},
+        {"column_name": "savings", "datatype": "number", "min_range": "1", "max_range": "6"},
+        {"column_name": "vote", "datatype": "mychoice", "choices": ["YES", "NO"]},
+    ], SEED)
+
+
+class TestSeededGeneration(unittest.TestCase):
+    """Test case for row-index seeded generation."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ids.txt")
+        with open(self.path, "w", encoding="utf8") as f:
+            f.write("\n".join(f"C{i:05d}" for i in range(1000)))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_rows_regenerate_from_index(self):
+        """A row is the same whether generated in sequence or on its own."""
+        columns = make_columns(self.path)
+        rows = [create_row(columns, ",", COUNTRIES, [], {}, row_rng(SEED, i), i) for i in range(50)]
+        again = create_row(make_columns(self.path), ",", COUNTRIES, [], {}, row_rng(SEED, 37), 37)
+
+        self.assertEqual(rows[37], again)
+        self.assertEqual(len(set(row.split(",")[0] for row in rows)), 50)
+
+    def test_seeded_columns_match_rows(self):
+        """Seeded batches contain the same values as seeded rows."""
+        columns = make_columns(self.path)
+        batch = create_columns(columns, 10, COUNTRIES, [], {}, seed=SEED, start_index=20)
+        row = create_row(columns, ",", COUNTRIES, [], {}, row_rng(SEED, 25), 25)
+
+        self.assertEqual(row.split(",")[0], f'"{batch["id"][5]}"')
+
+    def test_row_rng_is_reproducible(self):
+        """Row generators with the same seed and index draw the same values."""
+        first, second = row_rng(SEED, 7), row_rng(SEED, 7)
+        draws = [first.randrange(1000), first.random(), first.choice(COUNTRIES), first.getrandbits(128)]
+
+        self.assertEqual(draws, [second.randrange(1000), second.random(),
+                                 second.choice(COUNTRIES), second.getrandbits(128)])
+        self.assertNotEqual(row_rng(SEED, 8).random(), row_rng(SEED, 7).random())
+
+    def test_permute_index_is_a_permutation(self):
+        """Distinct indices map to distinct positions."""
+        self.assertEqual(sorted(permute_index(i, 97, SEED) for i in range(97)), list(range(97)))
+        self.assertEqual(sorted(permute_index(i, 100, SEED) for i in range(100)), list(range(100)))
+
+
+class TestChangeStream(unittest.TestCase):
+    """Test case for change-data-capture streams."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "ids.txt")
+        with open(self.path, "w", encoding="utf8") as f:
+            f.write("\n".join(f"C{i:05d}" for i in range(1000)))
+        self.columns = make_columns(self.path)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_stream(self, **cdc):
+        options = {"key_column": "id", "update_columns": ["savings", "vote"]}
+        options.update(cdc)
+        return ChangeStream(self.columns, SEED, 100, options, COUNTRIES, [], {})
+
+    def test_operations_follow_the_base_dataset(self):
+        """Updates keep the key of the base row and deletes are not touched again."""
+        stream = self.make_stream()
+        base = {}
+        deleted = set()
+        for operation, row_index, values in stream.operations(500):
+            if operation == INSERT:
+                self.assertGreaterEqual(row_index, 100)
+                base[row_index] = values
+                continue
+            self.assertNotIn(row_index, deleted)
+            if row_index not in base:
+                base[row_index] = create_row(
+                    self.columns, ",", COUNTRIES, [], {}, row_rng(SEED, row_index), row_index
+                ).replace('"', "").split(",")
+            self.assertEqual(values[0], base[row_index][0])
+            self.assertEqual(values[2], base[row_index][2])
+            if operation == DELETE:
+                deleted.add(row_index)
+
+    def test_ratios_and_output(self):
+        """Operation counts follow the configured ratios."""
+        stream = self.make_stream(insert_ratio=1, update_ratio=2, delete_ratio=1)
+        filename = os.path.join(self.tmp.name, "changes.csv")
+        counts = write_changes(filename, stream, 2000, ",")
+
+        self.assertEqual(sum(counts.values()), 2000)
+        self.assertAlmostEqual(counts[UPDATE] / 2000, 0.5, delta=0.05)
+        with open(filename, encoding="utf8") as f:
+            first = f.readline().split(",")
+        self.assertIn(first[0], ('"I"', '"U"', '"D"'))
+        self.assertEqual(first[1], '"0"')
+
+    def test_key_column_cannot_be_updated(self):
+        """Updating the key column or a unique_values column is rejected."""
+        with self.assertRaises(ValueError):
+            self.make_stream(update_columns=["ref"], key_column="ref")
+        with self.assertRaises(ValueError):
+            self.make_stream(update_columns=["id"], key_column=None)
+
+    def test_default_update_columns_keep_keys(self):
+        """Without update_columns, updates leave key-like columns alone."""
+        stream = ChangeStream(self.columns, SEED, 100, {"update_ratio": 1}, COUNTRIES, [], {})
+        self.assertEqual(stream.update_indexes, [2, 3, 4])
+        for operation, row_index, values in stream.operations(50):
+            if operation == UPDATE:
+                base = generate_row_values(self.columns, COUNTRIES, [], {}, row_rng(SEED, row_index), row_index)
+                self.assertEqual(values[:2], base[:2])
+
+
+if __name__ == "__main__":
+    unittest.main()
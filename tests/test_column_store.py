@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the column store.
+"""
+import unittest
+import copy
+import os
+import shutil
+import tempfile
+from src.large_test_data_generator.column_store import ColumnStore, write_with_column_store
+from src.large_test_data_generator.config import Config
+from src.large_test_data_generator.data_generator import prepare_columns
+from src.large_test_data_generator.warm_start import prepare_run
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:
+    pq = None
+
+
+class TestColumnStore(unittest.TestCase):
+    """Test case for the column store."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        os.mkdir("input")
+        with open("input/CH.csv", "w", encoding="utf8") as f:
+            f.write("NUMBER,CITY\n")
+            f.write("\n".join(f"{i},City {i}" for i in range(40)))
+        with open("ids.txt", "w", encoding="utf8") as f:
+            f.write("\n".join(f"C{i:05d}" for i in range(30000)))
+        self.parameters = {
+            "filename": "out.csv",
+            "separator": ",",
+            "number_of_rows": 25000,
+            "seed": 7,
+            "column_store": {"directory": "store"},
+            "columns": [
+                {"column_name": "id", "datatype": "unique_values", "file_path": "ids.txt"},
+                {"column_name": "amount", "datatype": "number", "min_range": "1", "max_range": "4"},
+                {"column_name": "day", "datatype": "xdate", "from_date": "2020-01-01",
+                 "until_date": "2021-01-01", "date_format": "%Y-%m-%d"},
+                {"column_name": "vote", "datatype": "mychoice", "choices": ["Y", "N"]},
+                {"column_name": "label", "datatype": "derived",
+                 "expression": "vote + str(amount) + str(year(day))"},
+                {"column_name": "number", "datatype": "address", "field": "NUMBER", "group": "home"},
+                {"column_name": "city", "datatype": "address", "field": "CITY", "group": "home"},
+            ],
+        }
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def run_store(self, parameters):
+        config = Config.from_dict(parameters)
+        generated = write_with_column_store(config, prepare_run(config, ["CH"], []))
+        with open(config.get_output_filename(), "rb") as f:
+            return generated, f.read()
+
+    def read_store(self):
+        files = {}
+        for filename in os.listdir("store"):
+            if filename.endswith(".jsonl"):
+                with open(os.path.join("store", filename), "rb") as f:
+                    files[filename] = f.read()
+        return files
+
+    def test_only_changed_columns_are_regenerated(self):
+        """A changed column and the derived columns using it are regenerated; the others are kept."""
+        generated, _ = self.run_store(self.parameters)
+        self.assertEqual(len(generated), 7)
+        before = self.read_store()
+        self.assertEqual(self.run_store(self.parameters)[0], [])
+
+        changed = copy.deepcopy(self.parameters)
+        changed["columns"][3]["choices"] = ["YES", "NO"]
+        generated, output = self.run_store(changed)
+        after = self.read_store()
+
+        self.assertEqual(generated, ["vote", "label"])
+        self.assertEqual(len(set(before.items()) & set(after.items())), 5)
+        self.assertEqual(len(after), 7)
+        shutil.rmtree("store")
+        self.assertEqual(self.run_store(changed)[1], output)
+
+    def test_changed_reference_files(self):
+        """Columns reading a changed address file are regenerated."""
+        self.run_store(self.parameters)
+        with open("input/CH.csv", "w", encoding="utf8") as f:
+            f.write("NUMBER,CITY\n")
+            f.write("\n".join(f"{i},Town {i}" for i in range(40)))
+        generated, output = self.run_store(self.parameters)
+
+        self.assertEqual(generated, ["number", "city"])
+        self.assertIn("Town", output.decode("utf8"))
+
+    def test_columns_are_independent(self):
+        """Adding a column leaves the values of the other columns unchanged."""
+        _, before = self.run_store(self.parameters)
+        added = copy.deepcopy(self.parameters)
+        added["columns"].insert(1, {"column_name": "ref", "datatype": "uuid"})
+        generated, after = self.run_store(added)
+
+        self.assertEqual(generated, ["ref"])
+        for old, new in zip(before.decode("utf8").splitlines(), after.decode("utf8").splitlines()):
+            fields = new.split(",")
+            self.assertEqual(old.split(","), fields[:1] + fields[2:])
+
+    def test_groups(self):
+        """Grouped columns still share one record per row."""
+        _, output = self.run_store(self.parameters)
+
+        for line in output.decode("utf8").splitlines():
+            fields = line.split(",")
+            self.assertEqual(fields[6], '"City %s"' % fields[5].strip('"'))
+
+    @unittest.skipIf(pq is None, "pyarrow is not installed")
+    def test_parquet(self):
+        """The store is merged into Parquet row groups."""
+        self.run_store(dict(self.parameters, output_format="parquet", filename="out.parquet",
+                            row_group_size=20000))
+        table = pq.read_table("out.parquet")
+
+        self.assertEqual(table.num_rows, 25000)
+        self.assertEqual(pq.ParquetFile("out.parquet").metadata.num_row_groups, 2)
+        self.assertEqual(table.column("day").type.unit, "us")
+
+    def test_requires_seed(self):
+        """Column stores are only built for seeded runs."""
+        with self.assertRaises(ValueError):
+            ColumnStore("store", prepare_columns(self.parameters["columns"]), None, 10, ["CH"], [], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -9,7 +9,8 @@ import json
 import tempfile
 from unittest.mock import patch, MagicMock
 from src.large_test_data_generator.data_generator import (
-    is_valid_card, random_date_between, create_row
+    is_valid_card, random_date_between, create_row, create_columns, format_rows,
+    prepare_columns
 )
 
 
@@ -71,6 +72,33 @@ class TestDataGenerator(unittest.TestCase):
         # Verify results
         self.assertEqual(result, '"aaaaa","42"')
 
+    def test_format_rows(self):
+        """Column batches are written as the same quoted rows as create_row."""
+        column_definitions = [
+            {"column_name": "vote", "datatype": "mychoice", "choices": ["YES"]},
+            {"column_name": "savings", "datatype": "number", "min_range": "1", "max_range": "2",
+             "distribution": {"type": "normal", "mean": 50, "stddev": 10}},
+        ]
+        batch = create_columns(column_definitions, 100, ["US"], [], {})
+        rows = format_rows(column_definitions, batch, ";")
+
+        self.assertEqual(len(rows), 100)
+        for row, savings in zip(rows, batch["savings"]):
+            self.assertEqual(row, f'"YES";"{savings}"')
+            self.assertTrue(10 <= savings < 100)
+
+
+    def test_duplicate_column_names(self):
+        """Columns with the same name, explicit or positional, are rejected."""
+        for column_definitions in (
+            [{"column_name": "a", "datatype": "country"}, {"column_name": "a", "datatype": "country"}],
+            [{"datatype": "country"}, {"column_name": "column_1", "datatype": "country"}],
+        ):
+            with self.assertRaises(ValueError):
+                create_columns(column_definitions, 1, ["US"], [], {})
+            with self.assertRaises(ValueError):
+                prepare_columns(column_definitions)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
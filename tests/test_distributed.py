@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for distributed generation.
+"""
+import unittest
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+from src.large_test_data_generator.config import Config
+from src.large_test_data_generator.data_generator import create_columns, format_rows, prepare_columns
+from src.large_test_data_generator.distributed import (
+    Coordinator, RangeScheduler, receive_message, run_worker, send_message
+)
+
+
+# Workers run in fresh interpreters, like on other nodes, instead of forks of the test process
+spawn = multiprocessing.get_context("spawn")
+
+
+def read_rows(directory, manifest):
+    rows = []
+    for entry in manifest["files"]:
+        with open(os.path.join(directory, entry["path"]), encoding="utf8") as f:
+            rows.extend(f.read().splitlines())
+    return rows
+
+
+class TestDistributed(unittest.TestCase):
+    """Test case for distributed generation."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ids = os.path.join(self.tmp.name, "ids.txt")
+        with open(self.ids, "w", encoding="utf8") as f:
+            f.write("\n".join(f"C{i:05d}" for i in range(1000)))
+        self.directory = os.path.join(self.tmp.name, "out")
+        self.config = Config.from_dict({
+            "filename": os.path.join(self.tmp.name, "data.csv"),
+            "separator": ",",
+            "number_of_rows": 950,
+            "seed": 11,
+            "partitioning": {"max_rows": 100},
+            "columns": [
+                {"column_name": "id", "datatype": "unique_values", "file_path": self.ids},
+                {"column_name": "amount", "datatype": "number", "min_range": "1", "max_range": "4"},
+                {"column_name": "ref", "datatype": "uuid", "version": 7},
+            ],
+        })
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_coordinator(self, **options):
+        return Coordinator(self.config, "127.0.0.1", 0, directory=self.directory, range_rows=200,
+                           country_array=["CH"], phone_array=[], **options)
+
+    def test_workers_match_single_process(self):
+        """Ranges written by several worker processes add up to the single-process output."""
+        coordinator = self.make_coordinator()
+        address = "127.0.0.1:%d" % coordinator.address[1]
+        workers = [spawn.Process(target=run_worker, args=(address, f"w{i}")) for i in range(3)]
+        for worker in workers:
+            worker.start()
+        manifest = coordinator.run(timeout=60)
+        for worker in workers:
+            worker.join(10)
+
+        columns = prepare_columns(self.config.get_column_definitions(), 11)
+        batch = create_columns(columns, 950, ["CH"], [], {}, seed=11)
+        self.assertEqual(read_rows(self.directory, manifest), format_rows(columns, batch, ","))
+        self.assertEqual(manifest["total_rows"], 950)
+        self.assertEqual([r["range_id"] for r in manifest["ranges"]], [0, 1, 2, 3, 4])
+        self.assertEqual(len(set(batch["id"])), 950)
+        with open(os.path.join(self.directory, "manifest.json"), encoding="utf8") as f:
+            self.assertEqual(json.load(f)["files"], manifest["files"])
+
+    def test_failed_range_is_retried(self):
+        """A range whose worker disconnects is handed to another worker."""
+        coordinator = self.make_coordinator()
+        address = "127.0.0.1:%d" % coordinator.address[1]
+        result = {}
+        thread = threading.Thread(target=lambda: result.update(coordinator.run(timeout=60)))
+        thread.start()
+
+        # Take a range and disconnect without answering, before the worker starts
+        with socket.create_connection(coordinator.address) as sock, sock.makefile("rwb") as stream:
+            send_message(stream, {"type": "hello", "worker": "flaky"})
+            receive_message(stream)
+            self.assertEqual(receive_message(stream)["range_id"], 0)
+        # Output of the abandoned attempt, as a worker that timed out would leave it
+        stale = os.path.join(self.directory, "range-000000.attempt-1")
+        os.makedirs(stale)
+        with open(os.path.join(stale, "data.csv"), "w", encoding="utf8") as f:
+            f.write("stale\n")
+        worker = spawn.Process(target=run_worker, args=(address, "steady"))
+        worker.start()
+        thread.join(60)
+        worker.join(10)
+
+        self.assertEqual(result["total_rows"], 950)
+        self.assertEqual({r["worker"] for r in result["ranges"]}, {"steady"})
+        self.assertEqual(result["ranges"][0]["attempts"], 2)
+        self.assertEqual(result["ranges"][0]["attempt"], 2)
+        self.assertFalse(os.path.exists(stale))
+        self.assertEqual(len(read_rows(self.directory, result)), 950)
+        self.assertTrue(all(entry["path"].startswith(f"range-{entry['range_id']:06d}.attempt-")
+                            for entry in result["files"]))
+
+    def test_stale_reply_is_rejected(self):
+        """A reply for an earlier attempt does not complete the current one."""
+        coordinator = self.make_coordinator()
+        task = {"range_id": 1, "start": 200, "stop": 400, "attempt": 2}
+        reply = {"type": "result", "range_id": 1, "attempt": 1, "manifest": {"total_rows": 200}}
+        coordinator.server.server_close()
+
+        self.assertIn("attempt 1", coordinator.check_result(task, reply))
+        self.assertIsNone(coordinator.check_result(task, dict(reply, attempt=2)))
+
+    def test_scheduler_gives_up(self):
+        """A range that fails max_attempts times fails the run."""
+        scheduler = RangeScheduler(10, range_rows=4, max_attempts=2)
+
+        self.assertEqual([r["stop"] for r in scheduler.ranges], [4, 8, 10])
+        task = scheduler.acquire()
+        scheduler.fail(task["range_id"], "boom")
+        self.assertFalse(scheduler.finished)
+        for _ in range(2):
+            scheduler.acquire()
+        task = scheduler.acquire()
+        self.assertEqual(task["attempt"], 2)
+        scheduler.fail(task["range_id"], "boom")
+        self.assertTrue(scheduler.wait(0))
+        self.assertIsNone(scheduler.acquire())
+        self.assertIn("failed 2 times", scheduler.error)
+
+    def test_requires_seed(self):
+        """Unseeded runs cannot be distributed."""
+        config = Config.from_dict(dict(self.config.config, seed=None))
+
+        with self.assertRaises(ValueError):
+            Coordinator(config, "127.0.0.1", 0, country_array=["CH"], phone_array=[])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for statistical distributions.
+"""
+import unittest
+import os
+import random
+import tempfile
+from collections import Counter
+from src.large_test_data_generator.distributions import (
+    Distribution, build_distribution, load_histogram, sample_integers, sample_proportions,
+    ZipfDistribution
+)
+from src.large_test_data_generator.data_generator import (
+    create_columns, generate_value, prepare_columns
+)
+
+
+class TestDistributions(unittest.TestCase):
+    """Test case for statistical distributions."""
+
+    def test_zipf_is_skewed(self):
+        """The first rank of a Zipf distribution is the most frequent."""
+        rng = random.Random(1)
+        counts = Counter(ZipfDistribution(s=1.2, n=100).sample(rng) for _ in range(5000))
+
+        self.assertEqual(counts.most_common(1)[0][0], 1.0)
+        self.assertGreater(counts[1.0], counts[2.0])
+        self.assertTrue(all(1 <= k <= 100 for k in counts))
+
+    def test_zipf_matches_probabilities(self):
+        """Zipf ranks follow ``k ** -s``, with and without NumPy, for any number of ranks."""
+        distribution = ZipfDistribution(s=1.2, n=10)
+        weights = [k ** -1.2 for k in range(1, 11)]
+        expected = [w / sum(weights) for w in weights]
+        rng = random.Random(3)
+        counts = Counter(distribution.sample(rng) for _ in range(50000))
+        batch = Counter(distribution.sample_batch(50000, random.Random(3)))
+
+        for k in range(1, 11):
+            self.assertAlmostEqual(counts[float(k)] / 50000, expected[k - 1], delta=0.01)
+            self.assertAlmostEqual(batch[float(k)] / 50000, expected[k - 1], delta=0.01)
+        huge = ZipfDistribution(s=1.1, n=10 ** 12)
+        self.assertTrue(all(1 <= huge.sample(rng) <= 10 ** 12 for _ in range(1000)))
+
+    def test_distribution_is_abstract(self):
+        """Distributions must implement both sampling methods."""
+        with self.assertRaises(TypeError):
+            Distribution()
+
+    def test_sample_integers_clips_to_range(self):
+        """Batch samples are rounded integers inside the column range."""
+        distribution = build_distribution({"type": "normal", "mean": 50, "stddev": 100})
+        values = sample_integers(distribution, 10, 100, 1000, random.Random(2))
+
+        self.assertEqual(len(values), 1000)
+        self.assertTrue(all(isinstance(v, int) and 10 <= v < 100 for v in values))
+        self.assertIn(10, values)
+        self.assertIn(99, values)
+
+    def test_sample_proportions_clips_to_unit_interval(self):
+        """Date proportions stay between 0 and 1."""
+        distribution = build_distribution({"type": "exponential", "scale": 0.5})
+        values = sample_proportions(distribution, 1000, random.Random(3))
+
+        self.assertTrue(all(0.0 <= v <= 1.0 for v in values))
+
+    def test_empirical_histogram(self):
+        """Values are drawn from the bins of a histogram file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "hist.csv")
+            with open(path, "w", encoding="utf8") as f:
+                f.write("# age bins\n18,30,1\n60,70,3\n")
+            distribution = load_histogram(path)
+            rng = random.Random(4)
+            samples = [distribution.sample(rng) for _ in range(1000)]
+
+        self.assertTrue(all(18 <= v < 30 or 60 <= v < 70 for v in samples))
+        self.assertGreater(sum(v >= 60 for v in samples), 600)
+
+    def test_unknown_distribution(self):
+        """An unsupported distribution type is rejected."""
+        with self.assertRaises(ValueError):
+            build_distribution({"type": "cauchy"})
+
+    def test_columns_use_distribution(self):
+        """Row and batch generation both honour the column distribution."""
+        column = {"column_name": "n", "datatype": "number", "min_range": "1", "max_range": "3",
+                  "distribution": {"type": "zipf", "s": 2.0, "n": 50}}
+        columns = prepare_columns([column])
+        values = create_columns(columns, 500, ["CH"], [], {})["n"]
+
+        self.assertNotIn("_distribution", column)
+        self.assertTrue(all(10 <= v < 60 for v in values))
+        self.assertEqual(Counter(values).most_common(1)[0][0], 10)
+        self.assertTrue(10 <= generate_value(column, "CH", [], {}) < 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for dry-run sizing estimates.
+"""
+import unittest
+import os
+import tempfile
+from src.large_test_data_generator.config import Config
+from src.large_test_data_generator.estimate import estimate_run, format_report
+
+
+class TestEstimate(unittest.TestCase):
+    """Test case for sizing estimates."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.ids = os.path.join(self.tmp.name, "ids.txt")
+        with open(self.ids, "w", encoding="utf8") as f:
+            f.write("\n".join(f"C{i:04d}" for i in range(500)))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def make_config(self, row_count, **options):
+        return Config.from_dict(dict({
+            "number_of_rows": row_count,
+            "separator": ",",
+            "columns": [
+                {"column_name": "vote", "datatype": "mychoice", "choices": ["YES"]},
+                {"column_name": "id", "datatype": "unique_values", "file_path": self.ids},
+            ],
+        }, **options), required_fields=())
+
+    def test_sizes_are_extrapolated(self):
+        """Fixed-size rows are extrapolated exactly."""
+        report = estimate_run(self.make_config(1000000), sample_rows=100, country_array=["CH"], phone_array=[])
+
+        # "YES","C0123" and a newline
+        self.assertEqual(report["uncompressed_bytes"], 14 * 1000000)
+        self.assertLess(report["compressed_bytes"], report["uncompressed_bytes"])
+        self.assertEqual([c["bytes_per_row"] for c in report["columns"]], [5.0, 7.0])
+        self.assertGreater(report["reference_bytes"], 0)
+
+    def test_unique_pools(self):
+        """Pools smaller than the row count are reported as running out."""
+        small = estimate_run(self.make_config(400), sample_rows=10, country_array=["CH"], phone_array=[])
+        large = estimate_run(self.make_config(600), sample_rows=10, country_array=["CH"], phone_array=[])
+
+        self.assertFalse(small["unique_pools"][0]["exhausted"])
+        self.assertTrue(large["unique_pools"][0]["exhausted"])
+        self.assertIn("runs out", format_report(large))
+
+    def test_workers_divide_time(self):
+        """The duration is divided over the workers."""
+        report = estimate_run(self.make_config(1000, seed=1), sample_rows=50, workers=4,
+                              country_array=["CH"], phone_array=[])
+
+        self.assertAlmostEqual(report["rows_per_second"] * report["seconds"], 1000)
+        self.assertEqual(report["workers"], 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
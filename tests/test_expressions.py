@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for derived columns.
+"""
+import unittest
+from datetime import date, datetime
+from src.large_test_data_generator.cdc import ChangeStream
+from src.large_test_data_generator.data_generator import (
+    create_columns, format_rows, generate_row_values, prepare_columns
+)
+from src.large_test_data_generator.expressions import Expression, luhn_digit, years_between
+from src.large_test_data_generator.seeding import row_rng
+
+
+COLUMNS = [
+    {"column_name": "email", "datatype": "derived",
+     "expression": "lower(fname) + '.' + lower(lname) + '@example.com'"},
+    {"column_name": "fname", "datatype": "mychoice", "choices": ["Ann", "Bob"]},
+    {"column_name": "lname", "datatype": "mychoice", "choices": ["Smith", "Doe"]},
+    {"column_name": "amount", "datatype": "number", "min_range": "1", "max_range": "4"},
+    {"column_name": "double", "datatype": "derived", "expression": "amount * 2",
+     "field_type": "integer"},
+    {"column_name": "size", "datatype": "derived",
+     "expression": "'big' if double > 1000 else 'small'"},
+]
+
+
+class TestExpressions(unittest.TestCase):
+    """Test case for derived columns."""
+
+    def test_expression(self):
+        """Expressions compute the same values row by row and for a batch."""
+        expression = Expression("substr(upper(name), 0, 2) + str(n % 7) if n > 3 else concat(name, '-')")
+        columns = {"name": ["ab", "cd", "ef"], "n": [10, 2, 5]}
+
+        self.assertEqual(expression.names, ["n", "name"])
+        self.assertEqual(expression.evaluate_batch(columns, 3), ["AB3", "cd-", "EF5"])
+        self.assertEqual([expression.evaluate({"name": name, "n": n})
+                          for name, n in zip(columns["name"], columns["n"])], ["AB3", "cd-", "EF5"])
+        self.assertEqual(Expression("'x' * 2").evaluate_batch({}, 2), ["xx", "xx"])
+
+    def test_functions(self):
+        """Date and checksum helpers."""
+        self.assertEqual(years_between(datetime(2000, 5, 10), date(2020, 5, 9)), 19)
+        self.assertEqual(years_between(datetime(2000, 5, 10), date(2020, 5, 10)), 20)
+        self.assertEqual(luhn_digit("7992739871"), 3)
+
+    def test_unsafe_expressions(self):
+        """Only the expression language is accepted."""
+        for source in ("__import__('os')", "amount.real", "(lambda: 1)()", "[1, 2]", "1 +"):
+            with self.assertRaises(ValueError):
+                Expression(source)
+
+    def test_columns(self):
+        """Derived columns follow their dependencies, in seeded and unseeded runs."""
+        columns = prepare_columns(COLUMNS)
+        for seed in (None, 4):
+            batch = create_columns(columns, 200, ["CH"], [], {}, seed=seed)
+
+            self.assertEqual(list(batch), [x["column_name"] for x in COLUMNS])
+            for row in zip(*batch.values()):
+                email, fname, lname, amount, double, size = row
+                self.assertEqual(email, f"{fname.lower()}.{lname.lower()}@example.com")
+                self.assertEqual(double, amount * 2)
+                self.assertIsInstance(double, int)
+                self.assertEqual(size, "big" if double > 1000 else "small")
+
+        batch = create_columns(columns, 5, ["CH"], [], {}, seed=4)
+        rows = [generate_row_values(columns, ["CH"], [], {}, row_rng(4, i), i) for i in range(5)]
+        self.assertEqual(format_rows(columns, batch, ","),
+                         [",".join(f'"{value}"' for value in row) for row in rows])
+
+    def test_invalid_columns(self):
+        """Unknown columns and cycles are rejected when the columns are prepared."""
+        with self.assertRaises(ValueError):
+            prepare_columns([{"column_name": "a", "datatype": "derived", "expression": "b + 1"}])
+        with self.assertRaises(ValueError):
+            prepare_columns([
+                {"column_name": "a", "datatype": "derived", "expression": "b + 1"},
+                {"column_name": "b", "datatype": "derived", "expression": "a + 1"},
+            ])
+
+    def test_cdc_updates(self):
+        """Updated rows recompute their derived columns."""
+        columns = prepare_columns(COLUMNS, 8)
+        stream = ChangeStream(columns, 8, 20, {"update_ratio": 1}, ["CH"], [], {})
+
+        for _, _, values in stream.operations(20):
+            self.assertEqual(values[0], f"{values[1].lower()}.{values[2].lower()}@example.com")
+            self.assertEqual(values[4], values[3] * 2)
+        with self.assertRaises(ValueError):
+            ChangeStream(columns, 8, 20, {"update_columns": ["email"]}, ["CH"], [], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for fixed-width output.
+"""
+import unittest
+import os
+import tempfile
+from datetime import datetime
+from src.large_test_data_generator.config import Config
+from src.large_test_data_generator.data_generator import create_columns
+from src.large_test_data_generator.fixed_width import (
+    FixedWidthLayout, read_row, split_rows, write_fixed_width
+)
+from src.large_test_data_generator.warm_start import prepare_run
+
+
+class TestFixedWidth(unittest.TestCase):
+    """Test case for fixed-width output."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        ids = os.path.join(self.tmp.name, "ids.txt")
+        with open(ids, "w", encoding="utf8") as f:
+            f.write("\n".join(f"C{i:05d}" for i in range(30000)))
+        self.parameters = {
+            "filename": os.path.join(self.tmp.name, "data.dat"),
+            "separator": ",",
+            "number_of_rows": 25000,
+            "seed": 3,
+            "output_format": "fixed_width",
+            "columns": [
+                {"column_name": "id", "datatype": "unique_values", "file_path": ids, "length": 6},
+                {"column_name": "amount", "datatype": "number", "min_range": "1", "max_range": "5"},
+                {"column_name": "ref", "datatype": "uuid"},
+                {"column_name": "vote", "datatype": "mychoice", "choices": ["YES", "NO"], "length": 3},
+            ],
+        }
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def write(self, workers, **parameters):
+        config = Config.from_dict(dict(self.parameters, **parameters))
+        state = prepare_run(config, ["CH"], [])
+        write_fixed_width(config, state, workers)
+        with open(config.get_output_filename(), "rb") as f:
+            return state, f.read()
+
+    def test_encode_field(self):
+        """Fields are sized in bytes, padded and aligned, and values that do not fit are rejected."""
+        layout = FixedWidthLayout([
+            {"column_name": "s", "datatype": "string", "length": 3},
+            {"column_name": "n", "datatype": "number", "min_range": "1", "max_range": "4"},
+            {"column_name": "d", "datatype": "xdate", "date_format": "%d%b%Y", "length": 9},
+            {"column_name": "c", "datatype": "mychoice", "choices": ["A", "BÄR"], "width": 4},
+        ])
+
+        self.assertEqual(layout.widths, [6, 4, 9, 4])
+        self.assertEqual(layout.encode_field(0, "ab"), b"ab    ")
+        self.assertEqual(layout.encode_field(0, "äöü"), "äöü".encode("utf8"))
+        self.assertEqual(layout.encode_field(0, None), b"      ")
+        self.assertEqual(layout.encode_field(1, 42), b"  42")
+        self.assertEqual(layout.encode_field(2, datetime(2020, 3, 1)), b"01MAR2020")
+        self.assertEqual(layout.encode_field(3, "BÄR"), "BÄR".encode("utf8"))
+        self.assertEqual(layout.decode_record(b"ab      42" + b"01MAR2020A   \n"), ["ab", "42", "01MAR2020", "A"])
+        with self.assertRaises(ValueError):
+            layout.encode_field(1, 12345)
+        with self.assertRaises(ValueError):
+            layout.encode_field(0, "abcdefg")
+
+    def test_multibyte_strings(self):
+        """Strings of multibyte characters are written and read back whole."""
+        parameters = dict(self.parameters, number_of_rows=2000, columns=[
+            {"column_name": "name", "datatype": "string", "length": 8,
+             "is_variable_length": False, "is_null": False},
+            {"column_name": "amount", "datatype": "number", "min_range": "1", "max_range": "5"},
+        ])
+        config = Config.from_dict(parameters)
+        state = prepare_run(config, ["CH"], [])
+        write_fixed_width(config, state, 1)
+        layout = FixedWidthLayout(state.columns)
+        batch = create_columns(state.columns, 2000, ["CH"], [], state.my_file, seed=3)
+
+        self.assertTrue(any(len(value.encode("utf8")) > len(value) for value in batch["name"]))
+        for index in range(2000):
+            self.assertEqual(read_row(parameters["filename"], index, layout),
+                             [batch["name"][index], str(batch["amount"][index])])
+
+    def test_parallel_write(self):
+        """Workers write their row ranges into one file, identical to a single process."""
+        state, single = self.write(1)
+        _, parallel = self.write(3)
+        layout = FixedWidthLayout(state.columns)
+
+        self.assertEqual(parallel, single)
+        self.assertEqual(len(single), 25000 * layout.record_size)
+        batch = create_columns(state.columns, 25000, ["CH"], [], state.my_file, seed=3)
+        filename = self.parameters["filename"]
+        for index in (0, 12345, 24999):
+            self.assertEqual(read_row(filename, index, layout),
+                             [str(batch[name][index]) for name in layout.names])
+        with self.assertRaises(IndexError):
+            read_row(filename, 25000, layout)
+
+    def test_split_rows(self):
+        """Ranges cover all rows in whole batches."""
+        ranges = split_rows(95000, 2)
+
+        self.assertEqual(ranges, [(0, 20000), (20000, 40000), (40000, 60000),
+                                  (60000, 80000), (80000, 95000)])
+
+    def test_invalid(self):
+        """Columns need a width, and several workers need a seed."""
+        with self.assertRaises(ValueError):
+            FixedWidthLayout([{"column_name": "f", "datatype": "file"}])
+        with self.assertRaises(ValueError):
+            self.write(2, seed=None)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the Parquet writer.
+"""
+import unittest
+import os
+import tempfile
+from datetime import datetime
+from src.large_test_data_generator.data_generator import create_columns
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    from src.large_test_data_generator.parquet_writer import arrow_schema, write_parquet
+except ImportError:
+    pa = None
+
+
+COLUMNS = [
+    {"column_name": "id", "datatype": "uuid"},
+    {"column_name": "savings", "datatype": "number", "min_range": "1", "max_range": "3"},
+    {"column_name": "birth", "datatype": "xdate", "from_date": "01.01.2000",
+     "until_date": "31.12.2000", "date_format": "%d.%m.%Y"},
+    {"column_name": "domicile", "datatype": "country"},
+    {"column_name": "vote", "datatype": "mychoice", "choices": ["YES", "NO"]},
+]
+
+
+class TestCreateColumns(unittest.TestCase):
+    """Test case for columnar batch creation."""
+
+    def test_create_columns_keeps_types(self):
+        """Numbers stay integers and dates stay datetimes."""
+        columns = create_columns(COLUMNS, 10, ["CH"], [], {})
+
+        self.assertEqual(list(columns), ["id", "savings", "birth", "domicile", "vote"])
+        self.assertTrue(all(isinstance(v, int) for v in columns["savings"]))
+        self.assertTrue(all(isinstance(v, datetime) for v in columns["birth"]))
+        self.assertEqual(columns["domicile"], ["CH"] * 10)
+
+
+@unittest.skipIf(pa is None, "pyarrow is not installed")
+class TestParquetWriter(unittest.TestCase):
+    """Test case for the Parquet writer."""
+
+    def test_arrow_schema(self):
+        """Columns are mapped to typed and dictionary-encoded Arrow fields."""
+        schema = arrow_schema(COLUMNS)
+
+        self.assertEqual(schema.field("savings").type, pa.int64())
+        self.assertEqual(schema.field("birth").type, pa.timestamp("us"))
+        self.assertTrue(pa.types.is_dictionary(schema.field("domicile").type))
+        self.assertTrue(pa.types.is_dictionary(schema.field("vote").type))
+        self.assertEqual(schema.field("id").type, pa.string())
+
+    def test_wide_numbers_and_typed_choices(self):
+        """Numbers beyond int64 become decimals and choices keep their type."""
+        columns = [
+            {"column_name": "account", "datatype": "number", "min_range": "19", "max_range": "22"},
+            {"column_name": "level", "datatype": "mychoice", "choices": [1, 2, 3]},
+        ]
+        schema = arrow_schema(columns)
+
+        self.assertEqual(schema.field("account").type, pa.decimal128(22, 0))
+        self.assertEqual(schema.field("level").type, pa.dictionary(pa.int32(), pa.int64()))
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "out.parquet")
+            write_parquet(filename, columns, 50, ["CH"], [], {}, seed=1)
+            table = pq.read_table(filename)
+        expected = create_columns(columns, 50, ["CH"], [], {}, seed=1)
+        self.assertEqual([int(v) for v in table.column("account").to_pylist()], expected["account"])
+        self.assertEqual(table.column("level").to_pylist(), expected["level"])
+        with self.assertRaises(ValueError):
+            arrow_schema([{"column_name": "n", "datatype": "number", "min_range": "1", "max_range": "39"}])
+        with self.assertRaises(ValueError):
+            arrow_schema([{"column_name": "c", "datatype": "mychoice", "choices": ["A", 1]}])
+
+    def test_write_parquet_row_groups(self):
+        """Rows are written in row groups of the configured size."""
+        with tempfile.TemporaryDirectory() as tmp:
+            filename = os.path.join(tmp, "out.parquet")
+            write_parquet(filename, COLUMNS, 25, ["CH", "US"], [], {},
+                          row_group_size=10, compression="zstd")
+
+            parquet_file = pq.ParquetFile(filename)
+            self.assertEqual(parquet_file.metadata.num_rows, 25)
+            self.assertEqual(parquet_file.metadata.num_row_groups, 3)
+            self.assertEqual(parquet_file.metadata.row_group(0).column(0).compression, "ZSTD")
+            table = parquet_file.read()
+            self.assertEqual(table.column_names, ["id", "savings", "birth", "domicile", "vote"])
+
+
+if __name__ == "__main__":
+    unittest.main()
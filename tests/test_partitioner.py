@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the output partitioner.
+"""
+import unittest
+import hashlib
+import json
+import os
+import tempfile
+from src.large_test_data_generator.partitioner import (
+    OutputPartitioner, write_partitioned, MANIFEST_FILENAME
+)
+
+
+class TestOutputPartitioner(unittest.TestCase):
+    """Test case for the output partitioner."""
+
+    def test_rolls_over_by_row_count(self):
+        """A new part file is started after max_rows rows."""
+        with tempfile.TemporaryDirectory() as tmp:
+            partitioner = OutputPartitioner(tmp, max_rows=4)
+            for i in range(10):
+                partitioner.write(f'"{i}"')
+            manifest = partitioner.close()
+
+            self.assertEqual([f["rows"] for f in manifest["files"]], [4, 4, 2])
+            self.assertEqual(manifest["files"][0]["path"], "part-0001.csv")
+            self.assertEqual(manifest["total_rows"], 10)
+
+    def test_rolls_over_by_bytes(self):
+        """A part file never exceeds max_bytes unless a single row does."""
+        with tempfile.TemporaryDirectory() as tmp:
+            partitioner = OutputPartitioner(tmp, max_bytes=10)
+            for _ in range(5):
+                partitioner.write("abcd")
+            manifest = partitioner.close()
+
+            self.assertEqual([f["bytes"] for f in manifest["files"]], [10, 10, 5])
+
+    def test_partitions_by_value_with_bounded_open_files(self):
+        """Rows go to Hive-style directories and checksums match the files."""
+        with tempfile.TemporaryDirectory() as tmp:
+            partitioner = OutputPartitioner(tmp, partition_column="country", max_open_files=1)
+            for country in ["CH", "US", "CH", "DE", "US", "CH"]:
+                partitioner.write(f'"{country}"', country)
+                self.assertLessEqual(len(partitioner._handles), 1)
+            manifest = partitioner.close()
+
+            rows = {f["partition"]: f["rows"] for f in manifest["files"]}
+            self.assertEqual(rows, {"CH": 3, "US": 2, "DE": 1})
+            for entry in manifest["files"]:
+                with open(os.path.join(tmp, entry["path"]), "rb") as f:
+                    self.assertEqual(hashlib.sha256(f.read()).hexdigest(), entry["sha256"])
+            self.assertTrue(os.path.exists(os.path.join(tmp, "country=CH", "part-0001.csv")))
+
+    def test_write_partitioned_writes_manifest(self):
+        """Generated rows are partitioned by a column value."""
+        columns = [
+            {"column_name": "domicile", "datatype": "country"},
+            {"column_name": "vote", "datatype": "mychoice", "choices": ["YES", "NO"]},
+        ]
+        with tempfile.TemporaryDirectory() as tmp:
+            directory = os.path.join(tmp, "out")
+            write_partitioned(os.path.join(tmp, "out.csv"), {"column": "domicile", "max_rows": 5},
+                              columns, ",", 20, ["CH", "US"], [], {})
+
+            with open(os.path.join(directory, MANIFEST_FILENAME), encoding="utf8") as f:
+                manifest = json.load(f)
+            self.assertEqual(manifest["total_rows"], 20)
+            for entry in manifest["files"]:
+                with open(os.path.join(directory, entry["path"]), encoding="utf8") as f:
+                    for line in f:
+                        self.assertTrue(line.startswith(f'"{entry["partition"]}",'))
+
+
+if __name__ == "__main__":
+    unittest.main()
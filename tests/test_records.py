@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for column groups.
+"""
+import unittest
+import csv
+import json
+import os
+import tempfile
+from src.large_test_data_generator.cache import ReferenceCache
+from src.large_test_data_generator.data_generator import (
+    create_columns, format_rows, is_valid_card, prepare_columns
+)
+from src.large_test_data_generator.records import parse_records
+
+
+ADDRESS_COLUMNS = [
+    {"column_name": "street", "datatype": "address", "field": "STREET", "group": "home"},
+    {"column_name": "number", "datatype": "address", "field": "NUMBER", "group": "home",
+     "field_type": "integer"},
+    {"column_name": "city", "datatype": "address", "field": "CITY", "group": "home"},
+    {"column_name": "line", "datatype": "address"},
+]
+
+
+class TestRecords(unittest.TestCase):
+    """Test case for column groups."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+        os.mkdir("input")
+        with open("input/CH.csv", "w", encoding="utf8") as f:
+            f.write("NUMBER,STREET,CITY\n")
+            for i in range(50):
+                f.write(f'{i},"Street {i}, Lane",City {i}\n')
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_parse_records(self):
+        """Records are parsed into columns, with quoted separators kept."""
+        fields, columns = parse_records(["A,B", '1,"x, y"', "", "2"])
+
+        self.assertEqual(fields, ["A", "B"])
+        self.assertEqual(columns, {"A": ["1", "2"], "B": ["x, y", ""]})
+
+    def test_address_group(self):
+        """Grouped address columns describe the same record in every row."""
+        columns = prepare_columns(ADDRESS_COLUMNS)
+        for seed in (None, 5):
+            batch = create_columns(columns, 200, ["CH"], [], ReferenceCache(), seed=seed)
+
+            for street, number, city in zip(batch["street"], batch["number"], batch["city"]):
+                self.assertEqual(street, f"Street {number}, Lane")
+                self.assertEqual(city, f"City {number}")
+            self.assertIsInstance(batch["number"][0], int)
+            self.assertNotIn("NUMBER,STREET,CITY", batch["line"])
+            self.assertTrue(all(line.endswith(",City " + line.split(",")[0]) for line in batch["line"]))
+
+    def test_mongo_address_group(self):
+        """One address document is consumed per row and split into columns."""
+        my_file = {"CH": [{"street": f"S{i}", "zip": f"{i}"} for i in range(10)]}
+        columns = prepare_columns([
+            {"column_name": "street", "datatype": "mongo_address", "field": "street", "group": "a"},
+            {"column_name": "zip", "datatype": "mongo_address", "field": "zip", "group": "a"},
+            {"column_name": "document", "datatype": "mongo_address"},
+        ])
+        batch = create_columns(columns, 3, ["CH"], [], my_file)
+
+        self.assertEqual(batch["street"], ["S0", "S1", "S2"])
+        self.assertEqual(batch["zip"], ["0", "1", "2"])
+        self.assertEqual(json.loads(batch["document"][0]), {"street": "S3", "zip": "3"})
+        self.assertEqual(len(my_file["CH"]), 4)
+        row = format_rows(columns, batch, ",")[0]
+        self.assertEqual(next(csv.reader([row])), ["S0", "0", json.dumps({"street": "S3", "zip": "3"},
+                                                                      sort_keys=True)])
+
+    def test_creditcard_group(self):
+        """Card numbers come with the fields of their BIN record."""
+        source = {"country": "CH", "bank_name": "UBS", "card_type": "credit"}
+        my_file = {"CHUBScredit": [
+            {"bin_range": "4111", "number_length": 16, "scheme": "VISA"},
+            {"bin_range": "5500", "number_length": 16, "scheme": "MASTERCARD"},
+        ]}
+        columns = prepare_columns([
+            dict(source, column_name="number", datatype="creditcard", field="number", group="card"),
+            dict(source, column_name="scheme", datatype="creditcard", field="scheme", group="card"),
+        ])
+        batch = create_columns(columns, 50, ["CH"], [], my_file, seed=3)
+
+        for number, scheme in zip(batch["number"], batch["scheme"]):
+            self.assertTrue(is_valid_card(number))
+            self.assertEqual(scheme, "VISA" if number.startswith("4111") else "MASTERCARD")
+
+    def test_invalid_groups(self):
+        """Groups must share a datatype that has records."""
+        with self.assertRaises(ValueError):
+            prepare_columns([{"datatype": "uuid", "group": "g"}])
+        with self.assertRaises(ValueError):
+            prepare_columns([{"datatype": "address", "field": "CITY", "group": "g"},
+                             {"datatype": "mongo_address", "field": "city", "group": "g"}])
+        with self.assertRaises(ValueError):
+            prepare_columns([{"datatype": "address", "field": "CITY", "field_type": "date"}])
+        with self.assertRaises(ValueError):
+            create_columns([{"column_name": "x", "datatype": "address", "field": "ZIP"}],
+                           1, ["CH"], [], {})
+
+
+if __name__ == "__main__":
+    unittest.main()
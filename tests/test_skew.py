@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for hot-key and duplicate injection.
+"""
+import unittest
+import itertools
+import os
+import random
+import tempfile
+from collections import Counter
+from src.large_test_data_generator.skew import SkewInjector
+from src.large_test_data_generator.data_generator import (
+    create_columns, generate_value, prepare_columns
+)
+
+
+class TestSkewInjector(unittest.TestCase):
+    """Test case for hot-key and duplicate injection."""
+
+    def test_hot_keys_take_their_fraction(self):
+        """The hot keys account for about hot_fraction of the rows."""
+        counter = itertools.count()
+        injector = SkewInjector({"hot_keys": 5, "hot_fraction": 0.8})
+        rng = random.Random(1)
+        values = [injector.apply(lambda r: next(counter), rng) for _ in range(10000)]
+
+        hot = sum(1 for v in values if v in injector.hot_table)
+        self.assertEqual(len(injector.hot_table), 5)
+        self.assertAlmostEqual(hot / len(values), 0.8, delta=0.02)
+
+    def test_duplicate_rate(self):
+        """About duplicate_rate of the rows repeat a recent value."""
+        counter = itertools.count()
+        injector = SkewInjector({"duplicate_rate": 0.1, "duplicate_window": 100})
+        rng = random.Random(2)
+        values = [injector.apply(lambda r: next(counter), rng) for _ in range(10000)]
+
+        duplicates = len(values) - len(set(values))
+        self.assertAlmostEqual(duplicates / len(values), 0.1, delta=0.02)
+        self.assertEqual(len(injector.recent), 100)
+
+    def test_invalid_fractions(self):
+        """Fractions adding up to more than one are rejected."""
+        with self.assertRaises(ValueError):
+            SkewInjector({"hot_keys": 1, "hot_fraction": 0.7, "duplicate_rate": 0.5})
+
+    def test_unique_values_column_with_hot_keys(self):
+        """A unique_values column repeats only its hot keys."""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "ids.txt")
+            with open(path, "w", encoding="utf8") as f:
+                f.write("\n".join(str(i) for i in range(5000)))
+            columns = prepare_columns([{
+                "column_name": "id", "datatype": "unique_values", "file_path": path,
+                "skew": {"hot_keys": 3, "hot_fraction": 0.5},
+            }])
+            values = create_columns(columns, 1000, ["CH"], [], {})["id"]
+
+        repeated = [v for v, n in Counter(values).items() if n > 1]
+        self.assertEqual(sorted(repeated), sorted(columns[0]["_skew"].hot_table))
+
+    def test_skew_requires_prepared_columns(self):
+        """Skew is rejected on unprepared columns and unsupported datatypes."""
+        with self.assertRaises(ValueError):
+            generate_value({"datatype": "uuid", "skew": {"duplicate_rate": 0.1}}, "CH", [], {})
+        with self.assertRaises(ValueError):
+            prepare_columns([{"datatype": "ssn", "skew": {"duplicate_rate": 0.1}}])
+
+
+if __name__ == "__main__":
+    unittest.main()
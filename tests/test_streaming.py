@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the streaming producer.
+"""
+import unittest
+import io
+from src.large_test_data_generator.streaming import (
+    BatchWriter, StreamMetrics, TokenBucket, stream_rows
+)
+
+
+class FakeClock:
+    """Clock that only advances when sleeping."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class BrokenSink(io.BytesIO):
+    """Sink whose reader has gone away."""
+
+    def write(self, data):
+        raise BrokenPipeError("reader closed")
+
+
+class TestTokenBucket(unittest.TestCase):
+    """Test case for the token bucket rate limiter."""
+
+    def test_paces_to_rate(self):
+        """Acquiring tokens takes as long as the rate requires."""
+        clock = FakeClock()
+        bucket = TokenBucket(100, clock=clock, sleep=clock.sleep)
+        for _ in range(50):
+            bucket.acquire(10)
+
+        self.assertAlmostEqual(clock.now, 5.0, places=6)
+
+    def test_large_requests_go_into_debt(self):
+        """Requests above the capacity do not wait forever."""
+        clock = FakeClock()
+        bucket = TokenBucket(10, capacity=5, clock=clock, sleep=clock.sleep)
+        bucket.acquire(20)
+        bucket.acquire(1)
+
+        self.assertAlmostEqual(clock.now, 2.1, places=6)
+
+
+class TestStreaming(unittest.TestCase):
+    """Test case for the streaming producer."""
+
+    def test_stream_rows_up_to_limit(self):
+        """All rows are written to the sink in batches."""
+        columns = [{"column_name": "vote", "datatype": "mychoice", "choices": ["YES"]}]
+        sink = io.BytesIO()
+        metrics = stream_rows(columns, ",", ["CH"], [], {}, sink, row_limit=2500, batch_size=1000)
+
+        self.assertEqual(sink.getvalue().decode("utf8").splitlines(), ['"YES"'] * 2500)
+        self.assertEqual(metrics.rows, 2500)
+
+    def test_writer_error_stops_producer(self):
+        """A failing sink is reported to the producer."""
+        writer = BatchWriter(BrokenSink())
+        writer.submit(b"row\n")
+        with self.assertRaises(BrokenPipeError):
+            writer.close()
+
+    def test_lag(self):
+        """Lag is the number of rows behind the target rate."""
+        clock = FakeClock()
+        metrics = StreamMetrics(100, clock=clock)
+        clock.sleep(2)
+        metrics.record(150, 1500)
+
+        self.assertEqual(metrics.lag(), 50)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for UUID generation.
+"""
+import unittest
+import uuid
+from src.large_test_data_generator.data_generator import create_columns, prepare_columns
+from src.large_test_data_generator.seeding import row_rng
+from src.large_test_data_generator.uuids import (
+    UuidGenerator, format_uuid, uuid4_strings, uuid7_strings
+)
+
+
+class TestUuids(unittest.TestCase):
+    """Test case for UUID generation."""
+
+    def test_uuid4_strings(self):
+        """Bulk version 4 UUIDs are valid, distinct and formatted like the uuid module."""
+        values = uuid4_strings(5000)
+
+        self.assertEqual(len(values), 5000)
+        self.assertEqual(len(set(values)), 5000)
+        for value in values[:100]:
+            parsed = uuid.UUID(value)
+            self.assertEqual(parsed.version, 4)
+            self.assertEqual(parsed.variant, uuid.RFC_4122)
+            self.assertEqual(str(parsed), value)
+        self.assertEqual(uuid4_strings(0), [])
+
+    def test_uuid7_strings_are_ordered(self):
+        """Version 7 UUIDs sort in generation order, across batches and sequence rollovers."""
+        values = uuid7_strings(10000) + uuid7_strings(1) + uuid7_strings(3)
+
+        self.assertEqual(values, sorted(values))
+        self.assertEqual(len(set(values)), len(values))
+        parsed = uuid.UUID(values[-1])
+        self.assertEqual(parsed.version, 7)
+        self.assertEqual(parsed.variant, uuid.RFC_4122)
+
+    def test_seeded_uuids_are_reproducible(self):
+        """Seeded UUIDs depend only on the seed and the row index."""
+        for version in (4, 7):
+            generator = UuidGenerator(version)
+            first = [generator.generate(row_rng(7, i), i) for i in range(100)]
+            again = [generator.generate(row_rng(7, i), i) for i in range(100)]
+
+            self.assertEqual(first, again)
+            self.assertEqual({uuid.UUID(value).version for value in first}, {version})
+        ordered = [UuidGenerator(7).generate(row_rng(7, i), i) for i in range(5000)]
+        self.assertEqual(ordered, sorted(ordered))
+
+    def test_format_uuid(self):
+        """Integers are formatted like the uuid module."""
+        value = uuid.uuid4()
+
+        self.assertEqual(format_uuid(value.int), str(value))
+
+    def test_columns(self):
+        """uuid columns are generated in bulk, with the configured version."""
+        columns = prepare_columns([
+            {"column_name": "v4", "datatype": "uuid"},
+            {"column_name": "v7", "datatype": "uuid", "version": 7},
+        ])
+        batch = create_columns(columns, 50, ["CH"], [], {})
+
+        self.assertEqual(uuid.UUID(batch["v4"][0]).version, 4)
+        self.assertEqual(uuid.UUID(batch["v7"][0]).version, 7)
+        with self.assertRaises(ValueError):
+            prepare_columns([{"datatype": "uuid", "version": 1}])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Unit tests for the warm-start cache.
+"""
+import unittest
+import os
+import tempfile
+from src.large_test_data_generator.config import Config
+from src.large_test_data_generator.data_generator import create_columns
+from src.large_test_data_generator.warm_start import (
+    MappedStrings, cache_key, prepare_run, write_strings
+)
+
+
+class TestWarmStart(unittest.TestCase):
+    """Test case for the warm-start cache."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.names = os.path.join(self.tmp.name, "names.txt")
+        with open(self.names, "w", encoding="utf8") as f:
+            f.write("Zoë\nAnna\nBen\nAnna\n")
+        self.columns = [
+            {"column_name": "name", "datatype": "file", "file_path": self.names},
+            {"column_name": "id", "datatype": "unique_values", "file_path": self.names},
+            {"column_name": "savings", "datatype": "number", "min_range": "1", "max_range": "3",
+             "distribution": {"type": "normal", "mean": 50, "stddev": 5}},
+        ]
+        self.config = Config.from_dict({
+            "columns": self.columns,
+            "warm_cache_dir": os.path.join(self.tmp.name, "cache"),
+        }, required_fields=())
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_mapped_strings(self):
+        """Mapped strings read back as written."""
+        path = os.path.join(self.tmp.name, "strings.bin")
+        values = ["", "Zoë", "a,b", "x" * 1000]
+        write_strings(path, values)
+        mapped = MappedStrings(path)
+
+        self.assertEqual(len(mapped), 4)
+        self.assertEqual(list(mapped), values)
+        self.assertEqual(mapped.tolist(), values)
+        self.assertEqual(mapped[-1], values[-1])
+        with self.assertRaises(IndexError):
+            mapped[4]
+
+    def test_second_run_loads_entry(self):
+        """A second run with the same inputs reuses the prepared columns and sources."""
+        first = prepare_run(self.config, ["CH"], [])
+        second = prepare_run(self.config, ["CH"], [])
+
+        self.assertEqual(len(os.listdir(self.config.get_warm_cache_dir())), 1)
+        self.assertIn("_distribution", second.columns[2])
+        self.assertIsInstance(second.my_file[self.names], list)
+        self.assertEqual(sorted(second.my_file[self.names]), ["Anna", "Ben", "Zoë"])
+        self.assertEqual(first.country_array, second.country_array)
+
+    def test_file_sources_are_mapped(self):
+        """Sources that are only read are memory-mapped."""
+        config = Config.from_dict({
+            "columns": self.columns[:1],
+            "warm_cache_dir": self.config.get_warm_cache_dir(),
+        }, required_fields=())
+        state = prepare_run(config, ["CH"], [])
+
+        self.assertIsInstance(state.my_file[self.names], MappedStrings)
+
+    def test_derived_columns(self):
+        """Compiled expressions of derived columns are stored and compiled again on load."""
+        config = Config.from_dict({
+            "columns": self.columns[:1] + [
+                {"column_name": "greeting", "datatype": "derived", "expression": "'Hi ' + name"},
+            ],
+            "warm_cache_dir": self.config.get_warm_cache_dir(),
+        }, required_fields=())
+        prepare_run(config, ["CH"], [])
+        state = prepare_run(config, ["CH"], [])
+
+        key = cache_key(config.get_column_definitions(), None, ["CH"], [])
+        self.assertEqual(os.listdir(config.get_warm_cache_dir()), [key])
+        batch = create_columns(state.columns, 20, ["CH"], [], state.my_file)
+        self.assertEqual(batch["greeting"], ["Hi " + name for name in batch["name"]])
+
+    def test_changed_source_invalidates(self):
+        """Changing a source file changes the cache key."""
+        before = cache_key(self.columns, None)
+        stat = os.stat(self.names)
+        os.utime(self.names, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+        self.assertNotEqual(cache_key(self.columns, None), before)
+        self.assertNotEqual(cache_key(self.columns, 1), cache_key(self.columns, None))
+
+
+if __name__ == "__main__":
+    unittest.main()